@@ -0,0 +1,461 @@
+"""
+Arquivos compactados no modo lote
+Specs dentro de .zip/.tar(.gz/.bz2/.xz) entram no lote como caminhos
+virtuais "<arquivo>!/<membro>" e são lidos direto do pacote para a memória,
+sem pasta de extração; $refs entre membros do mesmo pacote são resolvidos
+lendo os outros membros. Na saída, cada Markdown renderizado (stdout do
+Widdershins) é gravado direto em um único .zip/.tar, publicado de forma
+atômica ao final:
+
+    python archive_io.py specs.zip -o docs.zip --config config.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from compile_cache import enable_compile_cache
+from openapi_validator import validate_document
+from postman_converter import ExampleLimits, PostmanToOpenAPIConverter
+from ref_resolver import EXTERNAL_REF_PATTERN, RefResolutionError, RefResolver, parse_document
+from render_pipeline import build_command, find_widdershins, prepare_spec, run_widdershins
+from spec_filter import apply_filters
+
+
+MEMBER_SEPARATOR = "!/"
+# Também aceita "!\\" (caminhos montados pelo pathlib no Windows)
+SEPARATOR_PATTERN = re.compile(r'!(?:/|\\)')
+ZIP_SUFFIXES = (".zip",)
+TAR_MODES = {
+    ".tar": "", ".tar.gz": "gz", ".tgz": "gz", ".tar.bz2": "bz2", ".tbz2": "bz2",
+    ".tar.xz": "xz", ".txz": "xz",
+}
+ARCHIVE_SUFFIXES = ZIP_SUFFIXES + tuple(TAR_MODES)
+# Membros maiores que isso não são lidos (proteção contra bombas de compressão)
+MAX_MEMBER_SIZE = 256 * 1024 * 1024
+
+
+class ArchiveError(Exception):
+    """Arquivo compactado ilegível ou membro inválido"""
+
+
+def archive_suffix(path: str) -> Optional[str]:
+    name = path.lower()
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)), None)
+
+
+def is_archive(path: str) -> bool:
+    return archive_suffix(path) is not None
+
+
+def join_member(archive: str, member: str) -> str:
+    return f"{archive}{MEMBER_SEPARATOR}{member}"
+
+
+def split_member(path: str) -> Optional[Tuple[str, str]]:
+    """(arquivo, membro) de um caminho virtual, ou None para um caminho comum"""
+    for match in SEPARATOR_PATTERN.finditer(path):
+        archive = path[:match.start()]
+        if is_archive(archive) and os.path.isfile(archive):
+            return archive, path[match.end():].replace('\\', '/')
+    return None
+
+
+def is_member_path(path: str) -> bool:
+    return split_member(path) is not None
+
+
+def member_fingerprint(member_path: str) -> str:
+    """fingerprint de um caminho virtual "<pacote>!/<membro>" (abre o pacote)"""
+    location = split_member(member_path)
+    if location is None:
+        raise ArchiveError(f"Não é um membro de arquivo compactado: {member_path}")
+    with ArchiveReader(location[0]) as reader:
+        return reader.fingerprint(location[1])
+
+
+def unique_name(name: str, taken: set) -> str:
+    """name ou <nome>-2<extensão>, -3... ainda não usado; o escolhido entra em taken"""
+    stem, extension = posixpath.splitext(name)
+    candidate = name
+    counter = 2
+    while candidate in taken:
+        candidate = f"{stem}-{counter}{extension}"
+        counter += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _normalize_member(member: str) -> Optional[str]:
+    """Nome relativo normalizado; None para nomes absolutos ou que saem do pacote"""
+    member = posixpath.normpath(member.replace('\\', '/'))
+    if member.startswith(('/', '../')) or member in ('.', '..'):
+        return None
+    return member
+
+
+class ArchiveReader:
+    """Leitura de membros de um .zip/.tar sem extrair para o disco"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        self._members: Dict[str, Any] = {}
+        try:
+            if archive_suffix(path) in ZIP_SUFFIXES:
+                self._zip = zipfile.ZipFile(path)
+                entries = [(info.filename, info) for info in self._zip.infolist() if not info.is_dir()]
+            else:
+                self._tar = tarfile.open(path, "r:*")
+                entries = [(info.name, info) for info in self._tar.getmembers() if info.isfile()]
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            raise ArchiveError(f"Não foi possível abrir {Path(path).name}: {e}")
+        for name, info in entries:
+            name = _normalize_member(name)
+            if name is not None:
+                self._members[name] = info
+
+    def names(self) -> List[str]:
+        """Membros (arquivos) na ordem do pacote"""
+        return list(self._members)
+
+    def read(self, member: str) -> bytes:
+        name = _normalize_member(member)
+        info = self._members.get(name) if name else None
+        if info is None:
+            raise ArchiveError(f"{member} não existe em {Path(self.path).name}")
+        size = info.file_size if self._zip is not None else info.size
+        if size > MAX_MEMBER_SIZE:
+            raise ArchiveError(f"{member} excede {MAX_MEMBER_SIZE // (1024 * 1024)} MB")
+        # Os objetos de zip/tar não são seguros para leitura concorrente
+        with self._lock:
+            try:
+                if self._zip is not None:
+                    return self._zip.read(info)
+                stream = self._tar.extractfile(info)
+                return stream.read() if stream is not None else b""
+            except (OSError, zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+                raise ArchiveError(f"Erro ao ler {member}: {e}")
+
+    def size(self, member: str) -> int:
+        """Tamanho descompactado do membro (sem lê-lo)"""
+        info = self._members.get(_normalize_member(member) or "")
+        if info is None:
+            raise ArchiveError(f"{member} não existe em {Path(self.path).name}")
+        return info.file_size if self._zip is not None else info.size
+
+    def fingerprint(self, member: str) -> str:
+        """Identificação do conteúdo pelos metadados (CRC do zip; tamanho e mtime do tar), sem ler o membro"""
+        info = self._members.get(_normalize_member(member) or "")
+        if info is None:
+            raise ArchiveError(f"{member} não existe em {Path(self.path).name}")
+        if self._zip is not None:
+            parts = [member, info.file_size, info.CRC]
+        else:
+            parts = [member, info.size, info.mtime]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveSet:
+    """Pacotes abertos sob demanda durante um lote (um leitor por pacote)"""
+
+    def __init__(self):
+        self._readers: Dict[str, ArchiveReader] = {}
+        self._lock = threading.Lock()
+
+    def reader(self, archive: str) -> ArchiveReader:
+        key = os.path.realpath(archive)
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is None:
+                reader = self._readers[key] = ArchiveReader(archive)
+            return reader
+
+    def read(self, member_path: str) -> bytes:
+        location = split_member(member_path)
+        if location is None:
+            raise ArchiveError(f"Não é um membro de arquivo compactado: {member_path}")
+        return self.reader(location[0]).read(location[1])
+
+    def size(self, member_path: str) -> int:
+        location = split_member(member_path)
+        if location is None:
+            raise ArchiveError(f"Não é um membro de arquivo compactado: {member_path}")
+        return self.reader(location[0]).size(location[1])
+
+    def close(self):
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+
+    def __enter__(self) -> "ArchiveSet":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveRefResolver(RefResolver):
+    """
+    RefResolver que lê os documentos referenciados de dentro dos pacotes.
+    $refs que saem do pacote (para o disco) são recusados.
+    """
+
+    def __init__(self, archives: ArchiveSet):
+        super().__init__()
+        self.archives = archives
+        self._member_digests: Dict[str, str] = {}
+
+    def resolve(self, file_path: str, dereference: bool = False) -> Dict[str, Any]:
+        location = split_member(file_path)
+        if location is not None:
+            # Caminho absoluto do pacote: os alvos dos $refs são montados a partir dele
+            file_path = join_member(os.path.abspath(location[0]), location[1])
+        return super().resolve(file_path, dereference)
+
+    def _digest(self, file_path: str) -> str:
+        location = split_member(file_path)
+        if location is None:
+            raise RefResolutionError(f"$ref fora do arquivo compactado: {file_path}")
+        with self._lock:
+            cached = self._member_digests.get(file_path)
+        if cached is not None:
+            return cached
+        try:
+            data = self.archives.read(file_path)
+        except ArchiveError as e:
+            raise RefResolutionError(f"Arquivo referenciado não encontrado: {e}")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = digest in self._documents
+        if not known:
+            # Já lido: o parse acontece agora, sem reler o membro em _document
+            document = _parse_member(data, location[1])
+            with self._lock:
+                self._documents[digest] = document
+                self.stats["documents_loaded"] += 1
+        with self._lock:
+            self._member_digests[file_path] = digest
+        return digest
+
+
+def _parse_member(data: bytes, name: str) -> Any:
+    try:
+        return parse_document(data.decode('utf-8-sig'), name)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise RefResolutionError(f"Erro ao ler {name}: {e}")
+
+
+def prepare_member(member_path: str, options: Dict[str, Any], archives: ArchiveSet,
+                   resolver: Optional[ArchiveRefResolver] = None,
+                   log: Optional[Callable[[str], None]] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    Equivalente a prepare_spec para um membro de pacote: o spec sempre fica
+    em memória. Collections do Postman são convertidas; $refs para outros
+    membros são incorporados (com opt_dereference, todos).
+    """
+    log = log or (lambda message: None)
+    location = split_member(member_path)
+    if location is None:
+        raise ArchiveError(f"Não é um membro de arquivo compactado: {member_path}")
+    data = archives.read(member_path)
+    output_stem = Path(location[1]).stem
+
+    converter = PostmanToOpenAPIConverter(ExampleLimits.from_options(options))
+    document = _parse_member(data, location[1])
+    if converter.is_postman_data(document):
+        log("  📦 Convertendo Postman Collection...\n")
+        spec = converter.convert_data(document)
+        log("  ✅ Conversão concluída\n")
+        if converter.trim_report:
+            log(f"  {converter.trim_summary()}\n")
+        return apply_filters(spec, options, log), output_stem + "_openapi"
+
+    if options.get("opt_dereference") or EXTERNAL_REF_PATTERN.search(data):
+        resolver = resolver or ArchiveRefResolver(archives)
+        document = resolver.resolve(member_path, dereference=bool(options.get("opt_dereference")))
+        log(f"🔗 $refs resolvidos dentro de {Path(location[0]).name}\n")
+    if not isinstance(document, dict):
+        raise ArchiveError(f"{location[1]} não é um documento OpenAPI")
+    return apply_filters(document, options, log), output_stem
+
+
+def stdout_markdown(stdout: str) -> bytes:
+    """Markdown do stdout do Widdershins, igual ao que ele gravaria com -o (sem a quebra do console.log)"""
+    if stdout.endswith("\n"):
+        stdout = stdout[:-1]
+    return stdout.encode('utf-8')
+
+
+class ArchiveWriter:
+    """
+    Saídas gravadas direto em um .zip/.tar. O pacote é montado em um
+    temporário irmão e só substitui o destino em close(); nomes repetidos
+    recebem um sufixo (-2, -3...).
+    """
+
+    def __init__(self, path: str):
+        suffix = archive_suffix(path)
+        if suffix is None:
+            raise ArchiveError(f"Formato de saída não suportado: {Path(path).name}")
+        self.path = path
+        self.count = 0
+        self._temp_path = f"{path}.{os.getpid()}.tmp"
+        self._names: set = set()
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if suffix in ZIP_SUFFIXES:
+                self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(self._temp_path, 'w', zipfile.ZIP_DEFLATED)
+                self._tar: Optional[tarfile.TarFile] = None
+            else:
+                self._zip = None
+                # Modo de stream ("w|"): nada é relido nem reposicionado
+                self._tar = tarfile.open(self._temp_path, f"w|{TAR_MODES[suffix]}")
+        except (OSError, tarfile.TarError) as e:
+            raise ArchiveError(f"Não foi possível criar {Path(path).name}: {e}")
+
+    def add(self, name: str, data: bytes) -> str:
+        """Grava um membro; retorna o nome usado"""
+        with self._lock:
+            name = self._unique(_normalize_member(name) or Path(name).name)
+            if self._zip is not None:
+                info = zipfile.ZipInfo(name, time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                self._zip.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                info.mode = 0o644
+                self._tar.addfile(info, _BytesReader(data))
+            self.count += 1
+            return name
+
+    def _unique(self, name: str) -> str:
+        return unique_name(name, self._names)
+
+    def close(self, commit: bool = True):
+        """Fecha o pacote e o publica (commit) ou descarta o temporário"""
+        with self._lock:
+            try:
+                if self._zip is not None:
+                    self._zip.close()
+                else:
+                    self._tar.close()
+                if commit:
+                    os.replace(self._temp_path, self.path)
+            finally:
+                if os.path.exists(self._temp_path):
+                    os.remove(self._temp_path)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(commit=exc_type is None)
+
+
+class _BytesReader:
+    """Objeto de arquivo mínimo para tarfile.addfile sem copiar os dados"""
+
+    def __init__(self, data: bytes):
+        self._view = memoryview(data)
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size < 0 else min(len(self._view), self._position + size)
+        chunk = self._view[self._position:end].tobytes()
+        self._position = end
+        return chunk
+
+
+def convert_archive(inputs: List[str], output_archive: str, options: Dict[str, Any],
+                    widdershins_path: Optional[str] = None,
+                    log: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """Renderiza specs (arquivos, pastas ou pacotes) direto para um pacote de saída"""
+    from file_discovery import discover
+
+    log = log or (lambda message: None)
+    widdershins_path = widdershins_path or find_widdershins()
+    summary = {"total": 0, "written": 0, "failed": 0}
+    with ExitStack() as stack:
+        archives = stack.enter_context(ArchiveSet())
+        member_resolver = ArchiveRefResolver(archives)
+        resolver = RefResolver()
+        writer = stack.enter_context(ArchiveWriter(output_archive))
+        for input_file, _ in discover(inputs):
+            summary["total"] += 1
+            name = Path(input_file).name
+            try:
+                if is_member_path(input_file):
+                    spec, output_stem = prepare_member(input_file, options, archives, member_resolver, log)
+                else:
+                    spec, output_stem = prepare_spec(input_file, options, resolver, log)
+                if spec is not None:
+                    validation = validate_document(spec, None if is_member_path(input_file) else input_file)
+                    if not validation.is_valid:
+                        raise ArchiveError(f"spec inválido ({validation.errors[0]})")
+                result = run_widdershins(build_command(widdershins_path, input_file, None, options), spec)
+                if result.returncode != 0:
+                    raise ArchiveError(result.stderr.strip())
+                member = writer.add(output_stem + "_docs.md", stdout_markdown(result.stdout))
+                log(f"  ✅ {name} → {member}\n")
+                summary["written"] += 1
+            except (ArchiveError, RefResolutionError, OSError, ValueError) as e:
+                log(f"  ❌ {name}: {e}\n")
+                summary["failed"] += 1
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Converte specs (inclusive dentro de .zip/.tar) para um pacote de saída")
+    parser.add_argument("inputs", nargs="+", help="Arquivos, pastas ou pacotes .zip/.tar(.gz)")
+    parser.add_argument("-o", "--output", required=True, help="Pacote de saída (.zip, .tar, .tar.gz...)")
+    parser.add_argument("--config", help="config.json com as opções de geração")
+    args = parser.parse_args(argv)
+
+    enable_compile_cache()
+    try:
+        options: Dict[str, Any] = {}
+        if args.config:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                options = json.load(f)
+        summary = convert_archive(args.inputs, args.output, options, log=lambda message: print(message, end=''))
+    except (ArchiveError, OSError, ValueError) as e:
+        print(f"Erro: {e}")
+        return 1
+
+    print(f"{summary['written']} de {summary['total']} gravados em {args.output} ({summary['failed']} erros)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
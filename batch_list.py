@@ -0,0 +1,271 @@
+"""
+Lista virtualizada do modo lote
+Modelo com o estado de cada arquivo (atualizado por eventos vindos do thread
+do lote e aplicados em blocos no main thread) e uma visão que desenha apenas
+as linhas visíveis, com filtro incremental pelo caminho
+"""
+
+import tkinter as tk
+from collections import deque
+from pathlib import Path
+from tkinter import ttk
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from file_discovery import PathIndex
+
+
+STATE_QUEUED = "queued"
+STATE_CONVERTING = "converting"
+STATE_RENDERING = "rendering"
+STATE_CACHED = "cached"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+# Estado -> (ícone, rótulo, cor)
+STATE_STYLES = {
+    STATE_QUEUED: ("⏳", "na fila", "#666666"),
+    STATE_CONVERTING: ("🔄", "convertendo", "#1f5fbf"),
+    STATE_RENDERING: ("⚙️", "renderizando", "#1f5fbf"),
+    STATE_CACHED: ("💾", "inalterado", "#2e7d32"),
+    STATE_DONE: ("✅", "concluído", "#2e7d32"),
+    STATE_FAILED: ("❌", "falhou", "#c62828"),
+}
+
+EVENT_POLL_MS = 150
+NAME_WIDTH = 48
+
+
+class BatchEntry:
+    """Um arquivo do lote e seu estado atual"""
+
+    __slots__ = ('path', 'name', 'key', 'state', 'duration', 'message')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = Path(path).name
+        self.key = path.casefold()
+        self.state = STATE_QUEUED
+        self.duration: Optional[float] = None
+        self.message = ""
+
+
+class BatchListModel:
+    """
+    Arquivos do lote em ordem de inclusão (deduplicados pelo PathIndex) com
+    estado por arquivo. Só o main thread altera o modelo; threads de trabalho
+    enviam eventos com post(), aplicados em blocos por apply_events().
+    """
+
+    def __init__(self):
+        self._index = PathIndex()
+        self._entries: List[BatchEntry] = []
+        self._rows: Dict[str, int] = {}
+        self._events: Deque[Tuple[str, str, Optional[float], str]] = deque()
+        self._filter = ""
+        self._view: Optional[List[int]] = None
+        self._counts = dict.fromkeys(STATE_STYLES, 0)
+        # Incrementado a cada mudança visível (a visão redesenha quando muda)
+        self.version = 0
+
+    # --- Arquivos ---
+
+    def extend(self, items: Iterable[Tuple[str, str]]) -> List[str]:
+        """Adiciona pares (caminho, chave resolvida); retorna os caminhos novos"""
+        added = self._index.extend(items)
+        for path in added:
+            row = len(self._entries)
+            entry = BatchEntry(path)
+            self._entries.append(entry)
+            self._rows[path] = row
+            self._counts[STATE_QUEUED] += 1
+            if self._view is not None and self._filter in entry.key:
+                self._view.append(row)
+        if added:
+            self.version += 1
+        return added
+
+    def clear(self):
+        self._index.clear()
+        self._entries = []
+        self._rows = {}
+        self._events.clear()
+        self._counts = dict.fromkeys(STATE_STYLES, 0)
+        if self._view is not None:
+            self._view = []
+        self.version += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._index
+
+    # --- Estados ---
+
+    def post(self, path: str, state: str, duration: Optional[float] = None, message: str = ""):
+        """Registra uma mudança de estado (qualquer thread; deque.append é atômico)"""
+        self._events.append((path, state, duration, message))
+
+    def apply_events(self) -> int:
+        """Aplica os eventos pendentes (main thread); retorna quantos foram aplicados"""
+        applied = 0
+        while self._events:
+            path, state, duration, message = self._events.popleft()
+            row = self._rows.get(path)
+            if row is None:
+                continue
+            entry = self._entries[row]
+            self._counts[entry.state] -= 1
+            self._counts[state] += 1
+            entry.state, entry.duration, entry.message = state, duration, message
+            applied += 1
+        if applied:
+            self.version += 1
+        return applied
+
+    def reset_states(self):
+        """Volta todos os arquivos para "na fila" (início de um novo lote)"""
+        self._events.clear()
+        for entry in self._entries:
+            entry.state, entry.duration, entry.message = STATE_QUEUED, None, ""
+        self._counts = dict.fromkeys(STATE_STYLES, 0)
+        self._counts[STATE_QUEUED] = len(self._entries)
+        self.version += 1
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    # --- Filtro e janela visível ---
+
+    def set_filter(self, text: str):
+        """Filtra pelo caminho (sem distinguir maiúsculas). Refinar o texto
+        anterior filtra apenas as linhas já visíveis."""
+        text = text.strip().casefold()
+        if text == self._filter:
+            return
+        if not text:
+            self._view = None
+        elif self._view is not None and text.startswith(self._filter):
+            self._view = [row for row in self._view if text in self._entries[row].key]
+        else:
+            self._view = [row for row, entry in enumerate(self._entries) if text in entry.key]
+        self._filter = text
+        self.version += 1
+
+    @property
+    def visible_count(self) -> int:
+        return len(self._entries) if self._view is None else len(self._view)
+
+    def visible_rows(self, start: int, count: int) -> List[BatchEntry]:
+        if self._view is None:
+            return self._entries[start:start + count]
+        return [self._entries[row] for row in self._view[start:start + count]]
+
+
+class BatchListView(ttk.Frame):
+    """Text somente-leitura que desenha apenas as linhas visíveis do modelo"""
+
+    def __init__(self, parent: tk.Widget, model: BatchListModel, height: int = 6):
+        super().__init__(parent)
+        self.model = model
+        self.top_row = 0
+        self._last_version = -1
+
+        filter_frame = ttk.Frame(self)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=tk.EW)
+        ttk.Label(filter_frame, text="🔍 Filtrar:").pack(side=tk.LEFT)
+        self.filter_text = tk.StringVar()
+        self.filter_text.trace_add("write", lambda *args: self.model.set_filter(self.filter_text.get()))
+        ttk.Entry(filter_frame, textvariable=self.filter_text).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.text = tk.Text(self, height=height, wrap=tk.NONE, cursor="arrow")
+        self.vscroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        for state, (_, _, color) in STATE_STYLES.items():
+            self.text.tag_configure(state, foreground=color)
+        self.text.configure(state=tk.DISABLED)
+
+        self.status = tk.StringVar()
+        self.text.grid(row=1, column=0, sticky=tk.NSEW)
+        self.vscroll.grid(row=1, column=1, sticky=tk.NS)
+        ttk.Label(self, textvariable=self.status, font=("TkDefaultFont", 8)).grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_wheel)
+        self.text.bind("<Prior>", lambda e: self._scroll_rows(-self.visible_rows))
+        self.text.bind("<Next>", lambda e: self._scroll_rows(self.visible_rows))
+        self.text.bind("<Configure>", lambda e: self.refresh())
+
+        self._poll_events()
+
+    @property
+    def visible_rows(self) -> int:
+        line_height = max(1, int(self.text.tk.call("font", "metrics", self.text.cget("font"), "-linespace")))
+        return max(1, self.text.winfo_height() // line_height)
+
+    def refresh(self):
+        """Redesenha apenas as linhas da janela visível"""
+        total = self.model.visible_count
+        visible = self.visible_rows
+        self.top_row = max(0, min(self.top_row, total - visible))
+        entries = self.model.visible_rows(self.top_row, visible)
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for line, entry in enumerate(entries):
+            icon, label, _ = STATE_STYLES[entry.state]
+            duration = f"{entry.duration:6.1f}s" if entry.duration is not None else ""
+            name = entry.name if len(entry.name) <= NAME_WIDTH else entry.name[:NAME_WIDTH - 1] + "…"
+            row = f"{icon} {name:<{NAME_WIDTH}} {label:<13}{duration}"
+            self.text.insert(tk.END, ("\n" if line else "") + row, entry.state)
+        self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.vscroll.set(self.top_row / total, min(1.0, (self.top_row + visible) / total))
+        else:
+            self.vscroll.set(0.0, 1.0)
+        self._update_status(total)
+
+    def _update_status(self, visible_total: int):
+        total = len(self.model)
+        if not total:
+            self.status.set("")
+            return
+        counts = self.model.counts()
+        summary = " · ".join(f"{STATE_STYLES[state][1]}: {count}" for state, count in counts.items() if count)
+        shown = f" ({visible_total} visíveis)" if visible_total != total else ""
+        self.status.set(f"{total} arquivos{shown} — {summary}")
+
+    def _scroll_rows(self, delta: int):
+        self.top_row += delta
+        self.refresh()
+        return "break"
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            return self._scroll_rows(-3)
+        return self._scroll_rows(3)
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None):
+        if action == tk.MOVETO:
+            self.top_row = int(float(value) * self.model.visible_count)
+            self.refresh()
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == "pages" else 1
+            self._scroll_rows(int(value) * step)
+
+    def _poll_events(self):
+        """Aplica em bloco os eventos do lote e redesenha uma vez se algo mudou"""
+        try:
+            self.model.apply_events()
+            if self.model.version != self._last_version:
+                self._last_version = self.model.version
+                self.refresh()
+            self.after(EVENT_POLL_MS, self._poll_events)
+        except tk.TclError:
+            # Janela foi fechada
+            pass
@@ -0,0 +1,136 @@
+"""
+Cache de compilação do Node para os processos do Widdershins
+Define NODE_COMPILE_CACHE (Node 22.1+) para que o código compilado do
+widdershins e de suas dependências em node_modules seja persistido em disco e
+reaproveitado pelos próximos processos. Versões anteriores do Node ignoram a
+variável. O aquecimento faz uma renderização descartável de um spec mínimo
+em background e mede a primeira renderização fria e quente
+"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from render_pipeline import MEMFD_NAME, build_command, run_widdershins
+
+
+ENV_VAR = "NODE_COMPILE_CACHE"
+DISABLE_VAR = "NODE_DISABLE_COMPILE_CACHE"
+CACHE_DIR = Path(__file__).parent / ".node_compile_cache"
+# Última medição fria (o cache já existente impede medir de novo)
+BENCHMARK_FILE = "benchmark.json"
+WARMUP_TIMEOUT = 60
+
+WARMUP_SPEC: Dict[str, Any] = {
+    "openapi": "3.0.0",
+    "info": {"title": "warmup", "version": "1.0.0"},
+    "paths": {"/ping": {"get": {"responses": {"200": {"description": "ok"}}}}},
+}
+
+
+def enable_compile_cache(cache_dir: Path = CACHE_DIR) -> Optional[str]:
+    """
+    Ativa o cache para todos os processos filhos (herdam o ambiente). Um
+    NODE_COMPILE_CACHE já definido pelo usuário é respeitado. Retorna a pasta
+    em uso, ou None se desativado.
+    """
+    if os.environ.get(DISABLE_VAR):
+        return None
+    if os.environ.get(ENV_VAR):
+        return os.environ[ENV_VAR]
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    os.environ[ENV_VAR] = str(cache_dir)
+    return str(cache_dir)
+
+
+def cache_entries(cache_dir: Path) -> int:
+    """Arquivos de cache gravados pelo Node (subpastas por versão do V8)"""
+    try:
+        return sum(len(files) for _, _, files in os.walk(cache_dir)) - int((cache_dir / BENCHMARK_FILE).exists())
+    except OSError:
+        return 0
+
+
+def timed_render(widdershins_path: str) -> Optional[float]:
+    """Duração de uma renderização do spec mínimo (None se falhou)"""
+    try:
+        command = build_command(widdershins_path, MEMFD_NAME, None, {})
+        result = run_widdershins(command, WARMUP_SPEC, WARMUP_TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.duration if result.returncode == 0 else None
+
+
+def warm_up(widdershins_path: str) -> Dict[str, Any]:
+    """
+    Aquece o cache e mede a primeira renderização (chamar em background).
+
+    Com o cache vazio, a primeira renderização é fria (e grava o cache) e uma
+    segunda mede o tempo quente. Com o cache já preenchido, só a quente é
+    medida; a fria vem da última medição gravada em benchmark.json.
+    Retorna {"cold", "warm", "supported", "enabled"} (tempos em segundos ou None).
+    """
+    cache = os.environ.get(ENV_VAR)
+    report: Dict[str, Any] = {"cold": None, "warm": None, "supported": False, "enabled": bool(cache)}
+    if not cache:
+        report["warm"] = timed_render(widdershins_path)
+        return report
+
+    cache_dir = Path(cache)
+    benchmark_path = cache_dir / BENCHMARK_FILE
+    if cache_entries(cache_dir):
+        report["supported"] = True
+        report["warm"] = timed_render(widdershins_path)
+        if report["warm"] is not None:
+            report["cold"] = _load_benchmark(benchmark_path).get("cold")
+        return report
+
+    report["cold"] = timed_render(widdershins_path)
+    if report["cold"] is None:
+        return report
+    # Node sem suporte (anterior ao 22.1) não grava nada na pasta
+    report["supported"] = bool(cache_entries(cache_dir))
+    if report["supported"]:
+        report["warm"] = timed_render(widdershins_path)
+        _save_benchmark(benchmark_path, {"cold": report["cold"]})
+    return report
+
+
+def describe(report: Dict[str, Any]) -> str:
+    """Linha de log com o resultado do aquecimento"""
+    cold, warm = report["cold"], report["warm"]
+    if cold is None and warm is None:
+        return "⚠️ Aquecimento do Widdershins falhou (a primeira geração será mais lenta)\n"
+    if report["enabled"] and not report["supported"]:
+        return (f"⚡ Primeira renderização: {cold:.2f}s "
+                f"(cache de compilação requer Node 22.1+; sem ganho nesta versão)\n")
+    if warm is None:
+        return f"⚡ Primeira renderização: {cold:.2f}s\n"
+    if not report["enabled"]:
+        return f"⚡ Primeira renderização: {warm:.2f}s (cache de compilação do Node desativado)\n"
+    if cold is None:
+        return f"⚡ Cache de compilação do Node: primeira renderização quente {warm:.2f}s\n"
+    gain = f" ({(warm - cold) / cold:+.0%})" if cold else ""
+    return f"⚡ Cache de compilação do Node: primeira renderização fria {cold:.2f}s, quente {warm:.2f}s{gain}\n"
+
+
+def _load_benchmark(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_benchmark(path: Path, data: Dict[str, Any]):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    except OSError:
+        pass
@@ -0,0 +1,257 @@
+"""
+Saída em várias páginas
+Divide o Markdown gerado em uma página por tag (h1 do Widdershins) mais uma
+página índice, reescreve os links entre páginas e grava um manifesto JSON
+compacto (operação -> página#âncora) para que visualizadores carreguem só a
+página necessária
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from render_pipeline import write_if_changed
+
+
+MANIFEST_NAME = "manifest.json"
+INDEX_PAGE = "index.md"
+
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+H1_PATTERN = re.compile(r'^(?:#\s+(?P<md>.+?)\s*#*\s*$|<h1\s+id="(?P<id>[^"]*)"[^>]*>(?P<html>.*?)</h1>)')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+ANCHOR_PATTERN = re.compile(r'<(?:a|h[1-6]|span|div)\s[^>]*?(?:id|name)="([^"]+)"')
+OPERATION_PATTERN = re.compile(r'^`(GET|PUT|POST|DELETE|OPTIONS|HEAD|PATCH|TRACE) ([^`]+)`\s*$')
+LINK_PATTERN = re.compile(r'(\]\(|href=")#([^)"\s]+)')
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+class Page:
+    """Uma página da saída dividida"""
+
+    def __init__(self, file_name: str, title: str, anchor: str):
+        self.file_name = file_name
+        self.title = title
+        self.anchor = anchor
+        self.lines: List[str] = []
+        self.anchors: set = set()
+
+
+def split_enabled(options: Dict[str, Any]) -> bool:
+    return bool(options.get("opt_split_pages"))
+
+
+def pages_dir(output_file: str) -> Path:
+    """Pasta das páginas: <pasta da saída>/<nome da saída sem extensão>/"""
+    path = Path(output_file)
+    return path.with_name(path.stem)
+
+
+def services_dir(output_file: str) -> Path:
+    """Pasta das páginas por serviço de um documento combinado: <saída sem extensão>_services/"""
+    path = Path(output_file)
+    return path.with_name(path.stem + "_services")
+
+
+def needs_split(output_file: str, output_changed: Optional[bool]) -> bool:
+    """Só divide de novo se a saída mudou ou se as páginas ainda não existem"""
+    if output_changed is None or not os.path.exists(output_file):
+        return False
+    return output_changed or not (pages_dir(output_file) / MANIFEST_NAME).exists()
+
+
+def slugify(text: str) -> str:
+    """Âncora no estilo GitHub/Slate para headings Markdown"""
+    text = TAG_PATTERN.sub('', text).strip().lower()
+    text = re.sub(r'[^\w\- ]', '', text)
+    return re.sub(r'\s', '-', text)
+
+
+def _split_front_matter(lines: List[str]) -> Tuple[List[str], List[str]]:
+    if lines and lines[0].strip() == '---':
+        for index in range(1, len(lines)):
+            if lines[index].strip() == '---':
+                return lines[:index + 1], lines[index + 1:]
+    return [], lines
+
+
+def _unique_name(base: str, used: set) -> str:
+    base = re.sub(r'[^\w\-]+', '-', base).strip('-').lower() or "pagina"
+    name = f"{base}.md"
+    counter = 2
+    while name in used:
+        name = f"{base}-{counter}.md"
+        counter += 1
+    used.add(name)
+    return name
+
+
+def split_markdown(text: str) -> Tuple[List[str], List[Page]]:
+    """Divide o Markdown nos h1; retorna (front matter, páginas). A primeira página é o índice."""
+    front_matter, body = _split_front_matter(text.splitlines())
+    index = Page(INDEX_PAGE, "", "")
+    pages = [index]
+    used = {INDEX_PAGE}
+    current = index
+    in_fence = False
+
+    for line in body:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = H1_PATTERN.match(line)
+            if match:
+                title = TAG_PATTERN.sub('', match.group('md') or match.group('html') or '').strip()
+                anchor = match.group('id') or slugify(title)
+                if not index.title:
+                    # Primeiro h1: título do documento, permanece no índice
+                    index.title, index.anchor = title, anchor
+                else:
+                    current = Page(_unique_name(anchor or title, used), title, anchor)
+                    pages.append(current)
+        current.lines.append(line)
+
+    return front_matter, pages
+
+
+def group_pages(pages: List[Page], group_of: Callable[[str], Optional[str]]) -> List[Page]:
+    """
+    Junta as páginas (uma por tag) em uma página por grupo, na ordem em que
+    os grupos aparecem. Seções sem grupo (ex.: Schemas) ficam no índice.
+    """
+    index = pages[0]
+    grouped = [index]
+    by_group: Dict[str, Page] = {}
+    used = {INDEX_PAGE}
+    for page in pages[1:]:
+        group = group_of(page.title)
+        if group is None:
+            index.lines.extend(page.lines)
+            continue
+        target = by_group.get(group)
+        if target is None:
+            target = by_group[group] = Page(_unique_name(group, used), group, page.anchor)
+            grouped.append(target)
+        target.lines.extend(page.lines)
+    return grouped
+
+
+def _collect_anchors(pages: List[Page]) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    """Mapeia âncora -> página e coleta as operações (método, path, página, âncora)"""
+    anchors: Dict[str, str] = {}
+    operations: List[Dict[str, str]] = []
+
+    for page in pages:
+        in_fence = False
+        operation_anchor = ""
+        for line in page.lines:
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+                continue
+            if in_fence:
+                continue
+
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                slug = slugify(heading.group(2))
+                page.anchors.add(slug)
+                anchors.setdefault(slug, page.file_name)
+                if len(heading.group(1)) == 2:
+                    operation_anchor = slug
+
+            for anchor in ANCHOR_PATTERN.findall(line):
+                page.anchors.add(anchor)
+                anchors.setdefault(anchor, page.file_name)
+                if anchor.startswith("opId"):
+                    operation_anchor = anchor
+
+            operation = OPERATION_PATTERN.match(line)
+            if operation and operation_anchor:
+                operations.append({
+                    "method": operation.group(1),
+                    "path": operation.group(2),
+                    "page": page.file_name,
+                    "anchor": operation_anchor,
+                })
+                operation_anchor = ""
+
+    return anchors, operations
+
+
+def _rewrite_links(page: Page, anchors: Dict[str, str]) -> List[str]:
+    """Links #âncora que apontam para outra página viram pagina.md#âncora"""
+    def replace(match: re.Match) -> str:
+        target = anchors.get(match.group(2))
+        # Âncoras repetidas (ex.: "parameters") resolvem primeiro na própria página
+        if target is None or match.group(2) in page.anchors:
+            return match.group(0)
+        return f"{match.group(1)}{target}#{match.group(2)}"
+
+    lines = []
+    in_fence = False
+    for line in page.lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        lines.append(line if in_fence else LINK_PATTERN.sub(replace, line))
+    return lines
+
+
+def split_document(output_file: str, target_dir: Optional[Path] = None,
+                   group_of: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Divide a saída em páginas dentro de target_dir (padrão: pages_dir(output_file))
+    e grava o manifesto. Com group_of (título da tag -> grupo) as tags são
+    agrupadas em uma página por grupo. Páginas iguais às existentes não são
+    regravadas; páginas de uma divisão anterior que deixaram de existir são removidas.
+    """
+    with open(output_file, 'r', encoding='utf-8') as f:
+        front_matter, pages = split_markdown(f.read())
+    if group_of is not None:
+        pages = group_pages(pages, group_of)
+
+    anchors, operations = _collect_anchors(pages)
+
+    index = pages[0]
+    if len(pages) > 1:
+        index.lines.extend(["", "## Páginas", ""])
+        index.lines.extend(f"- [{page.title}]({page.file_name})" for page in pages[1:])
+
+    target_dir = target_dir or pages_dir(output_file)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest(target_dir)
+
+    changed = 0
+    for page in pages:
+        content = "\n".join(front_matter + _rewrite_links(page, anchors)) + "\n"
+        changed += write_if_changed(str(target_dir / page.file_name), content.encode('utf-8'))
+
+    current_files = {page.file_name for page in pages}
+    for stale in previous.get("pages", []):
+        if stale.get("file") not in current_files:
+            try:
+                os.remove(target_dir / Path(stale["file"]).name)
+            except OSError:
+                pass
+
+    manifest = {
+        "title": index.title,
+        "source": Path(output_file).name,
+        "index": INDEX_PAGE,
+        "pages": [{"file": page.file_name, "title": page.title, "anchor": page.anchor} for page in pages],
+        "operations": operations,
+    }
+    write_if_changed(
+        str(target_dir / MANIFEST_NAME),
+        json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    )
+
+    return {"directory": str(target_dir), "pages": len(pages), "changed": changed, "operations": len(operations)}
+
+
+def _read_manifest(directory: Path) -> Dict[str, Any]:
+    try:
+        with open(directory / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
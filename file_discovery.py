@@ -0,0 +1,172 @@
+"""
+Descoberta de specs para o modo lote
+Varre pastas recursivamente com os.scandir (uma chamada por diretório, sem
+stat extra por arquivo), aplicando globs de inclusão/exclusão, e mantém um
+índice ordenado de caminhos com deduplicação O(1) pelo caminho resolvido.
+Pacotes .zip/.tar são listados como membros "<pacote>!/<membro>" (archive_io)
+"""
+
+import os
+import re
+import threading
+from fnmatch import fnmatch
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from archive_io import MEMBER_SEPARATOR, ArchiveError, ArchiveReader, is_archive, join_member, split_member
+
+
+DEFAULT_INCLUDE = ("*.json", "*.yaml", "*.yml")
+# Também ignora as pastas geradas ao lado das saídas: índice de busca (<saída>_search),
+# páginas divididas (<nome>_docs, com manifest.json) e páginas por serviço (<saída>_services)
+DEFAULT_EXCLUDE = ("node_modules", ".git", "__pycache__", "*_search", "*_docs", "*_services",
+                   ".widdershins_build.json")
+CHUNK_SIZE = 500
+
+PATTERN_SEPARATOR = re.compile(r'\s*[,;]\s*')
+
+
+def parse_patterns(text: str) -> List[str]:
+    """Globs separados por vírgula ou ponto e vírgula"""
+    return [pattern for pattern in PATTERN_SEPARATOR.split(text.strip()) if pattern]
+
+
+def path_key(path: str) -> str:
+    """Chave de deduplicação: caminho resolvido (links seguidos, caixa normalizada no Windows)"""
+    location = split_member(path)
+    if location is not None:
+        return path_key(location[0]) + MEMBER_SEPARATOR + location[1]
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _matches(name: str, relative: str, patterns: Sequence[str]) -> bool:
+    # Globs com barra comparam o caminho relativo; sem barra, apenas o nome
+    return any(fnmatch(relative if '/' in pattern else name, pattern) for pattern in patterns)
+
+
+def discover(paths: Iterable[str], include: Sequence[str] = DEFAULT_INCLUDE,
+             exclude: Sequence[str] = DEFAULT_EXCLUDE,
+             cancel: Optional[threading.Event] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Gera (caminho, chave) para cada arquivo encontrado. Arquivos passados
+    diretamente entram sempre; pastas são varridas recursivamente, filtrando
+    os arquivos por include e descartando arquivos e pastas que casem com
+    exclude. Links para pastas não são seguidos (evita ciclos). Pacotes
+    passados diretamente são listados como as pastas, sem extração.
+    """
+    for path in paths:
+        if cancel is not None and cancel.is_set():
+            return
+        if is_archive(path) and os.path.isfile(path):
+            yield from _scan_archive(path, include, exclude, cancel)
+        elif os.path.isfile(path):
+            yield path, path_key(path)
+        elif os.path.isdir(path):
+            yield from _scan(path, include, exclude, cancel)
+
+
+def _scan(root: str, include: Sequence[str], exclude: Sequence[str],
+          cancel: Optional[threading.Event]) -> Iterator[Tuple[str, str]]:
+    # Links para pastas não são seguidos: abaixo da raiz resolvida, a chave só
+    # precisa de realpath para arquivos que são links (is_symlink usa a entrada)
+    real_root = os.path.realpath(root)
+    pending = [root]
+    while pending:
+        if cancel is not None and cancel.is_set():
+            return
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative = os.path.relpath(entry.path, root).replace(os.sep, '/')
+            if _matches(entry.name, relative, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file() and _matches(entry.name, relative, include):
+                    if entry.is_symlink():
+                        yield entry.path, path_key(entry.path)
+                    else:
+                        yield entry.path, os.path.normcase(os.path.join(real_root, relative.replace('/', os.sep)))
+            except OSError:
+                continue
+        # Pilha em ordem reversa: subpastas visitadas em ordem alfabética
+        pending.extend(reversed(subdirectories))
+
+
+def _scan_archive(archive: str, include: Sequence[str], exclude: Sequence[str],
+                  cancel: Optional[threading.Event]) -> Iterator[Tuple[str, str]]:
+    try:
+        with ArchiveReader(archive) as reader:
+            members = reader.names()
+    except ArchiveError:
+        return
+    archive_key = path_key(archive)
+    for member in members:
+        if cancel is not None and cancel.is_set():
+            return
+        parts = member.split('/')
+        # Exclusões valem para o membro e para cada pasta acima dele
+        if any(_matches(part, '/'.join(parts[:index + 1]), exclude) for index, part in enumerate(parts)):
+            continue
+        if _matches(parts[-1], member, include):
+            yield join_member(archive, member), archive_key + MEMBER_SEPARATOR + member
+
+
+def discover_in_chunks(paths: Iterable[str], on_chunk: Callable[[List[Tuple[str, str]]], None],
+                       include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = DEFAULT_EXCLUDE,
+                       cancel: Optional[threading.Event] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Executa discover entregando os resultados em blocos; retorna o total encontrado"""
+    chunk: List[Tuple[str, str]] = []
+    total = 0
+    for item in discover(paths, include, exclude, cancel):
+        chunk.append(item)
+        total += 1
+        if len(chunk) >= chunk_size:
+            on_chunk(chunk)
+            chunk = []
+    if chunk and not (cancel is not None and cancel.is_set()):
+        on_chunk(chunk)
+    return total
+
+
+class PathIndex:
+    """Lista ordenada de caminhos com deduplicação O(1) pela chave resolvida"""
+
+    def __init__(self):
+        self._paths: List[str] = []
+        self._keys = set()
+
+    def add(self, path: str, key: Optional[str] = None) -> bool:
+        """Adiciona o caminho se ainda não estiver no índice; retorna se foi adicionado"""
+        key = key or path_key(path)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._paths.append(path)
+        return True
+
+    def extend(self, items: Iterable[Tuple[str, str]]) -> List[str]:
+        """Adiciona pares (caminho, chave); retorna os caminhos realmente novos"""
+        return [path for path, key in items if self.add(path, key)]
+
+    def clear(self):
+        self._paths.clear()
+        self._keys.clear()
+
+    def __contains__(self, path: str) -> bool:
+        return path_key(path) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __getitem__(self, index: int) -> str:
+        return self._paths[index]
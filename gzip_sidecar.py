@@ -0,0 +1,107 @@
+"""
+Sidecars .gz pré-comprimidos das saídas geradas
+Servidores estáticos (ex.: nginx gzip_static) entregam o .gz sem comprimir a
+cada requisição. A compressão roda em um thread de fundo e só acontece quando
+a saída mudou (ou o sidecar ainda não existe)
+"""
+
+import gzip
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from render_pipeline import staging_path
+
+
+GZIP_SUFFIX = ".gz"
+DEFAULT_LEVEL = 9
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def gzip_level(options: Dict[str, Any]) -> Optional[int]:
+    """Nível de compressão configurado, ou None se os sidecars estão desligados"""
+    if not options.get("opt_gzip"):
+        return None
+    try:
+        return min(9, max(1, int(options.get("gzip_level", DEFAULT_LEVEL))))
+    except (TypeError, ValueError):
+        return DEFAULT_LEVEL
+
+
+def sidecar_path(output_file: str) -> str:
+    return output_file + GZIP_SUFFIX
+
+
+def needs_sidecar(output_file: str, output_changed: Optional[bool]) -> bool:
+    """Só recomprime se a saída mudou ou se o sidecar não existe"""
+    if output_changed is None or not os.path.exists(output_file):
+        return False
+    return output_changed or not os.path.exists(sidecar_path(output_file))
+
+
+def write_sidecar(output_file: str, level: int = DEFAULT_LEVEL) -> str:
+    """Comprime a saída em <saída>.gz (temporário + rename atômico); retorna o caminho"""
+    target = sidecar_path(output_file)
+    staged = staging_path(target)
+    mtime = os.path.getmtime(output_file)
+    try:
+        with open(output_file, 'rb') as source, open(staged, 'wb') as raw:
+            # mtime da saída no cabeçalho: mesmo conteúdo gera o mesmo .gz
+            with gzip.GzipFile(filename=Path(output_file).name, mode='wb', compresslevel=level,
+                               fileobj=raw, mtime=int(mtime)) as compressed:
+                shutil.copyfileobj(source, compressed, COPY_CHUNK_SIZE)
+        os.utime(staged, (mtime, mtime))
+        os.replace(staged, target)
+    finally:
+        try:
+            os.remove(staged)
+        except OSError:
+            pass
+    return target
+
+
+class SidecarWriter:
+    """
+    Gera sidecars em um thread de fundo, fora do caminho da renderização.
+    Só os agendados entre begin() e wait() (um lote) entram no resumo; fora
+    disso o chamador acompanha o Future devolvido por submit().
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gzip-sidecar")
+        self._pending: Optional[List[Future]] = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Inicia um lote: os sidecars agendados a partir daqui entram no próximo wait()"""
+        with self._lock:
+            self._pending = []
+
+    def submit(self, output_file: str, output_changed: Optional[bool], level: Optional[int]) -> Optional[Future]:
+        """Agenda a compressão quando necessária; retorna o Future ou None"""
+        if level is None or not needs_sidecar(output_file, output_changed):
+            return None
+        future = self._executor.submit(write_sidecar, output_file, level)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(future)
+        return future
+
+    def wait(self) -> Dict[str, Any]:
+        """Aguarda os sidecars do lote e o encerra; retorna {"written": n, "errors": [...]}"""
+        with self._lock:
+            pending, self._pending = self._pending or [], None
+        summary: Dict[str, Any] = {"written": 0, "errors": []}
+        for future in pending:
+            try:
+                future.result()
+                summary["written"] += 1
+            except Exception as e:
+                summary["errors"].append(str(e))
+        return summary
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
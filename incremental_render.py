@@ -0,0 +1,587 @@
+"""
+Renderização incremental por operação
+Guarda ao lado da saída o hash de cada operação e de cada schema da última
+renderização, incluindo os components que cada um alcança. Na renderização
+seguinte só as operações e schemas alterados ou novos são renderizados, em
+um spec parcial e uma única chamada do Widdershins. Suas seções substituem
+as antigas no Markdown existente e as removidas saem do documento.
+
+Qualquer mudança fora das operações leva à renderização completa: info,
+servidores, tags, securitySchemes, opções ou versão do Widdershins. O mesmo
+vale para uma estrutura que não possa ser remontada com segurança.
+
+    python incremental_render.py api.yaml -o docs/api.md --verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from doc_splitter import FENCE_PATTERN, H1_PATTERN, OPERATION_PATTERN
+from ref_resolver import RefResolutionError, file_digest, has_external_refs, load_document
+from render_pipeline import (
+    DEFAULT_TIMEOUT, RenderProcess, build_command, find_widdershins, prepare_spec, run_widdershins,
+    widdershins_version, write_if_changed
+)
+from spec_filter import HTTP_METHODS
+
+
+STATE_VERSION = 1
+# Acima desta fração de seções a renderizar, a renderização completa compensa
+MAX_CHANGED_FRACTION = 0.5
+# Schema extra no fim do spec parcial: garante que nenhuma seção útil seja a última
+# do documento parcial (a última absorve o rodapé do template)
+SENTINEL_SCHEMA = "zzWiddershinsIncrementalEnd"
+
+SECTION_PATTERN = re.compile(r'^(?:##\s|<h2 id="tocS_)')
+SCHEMA_PATTERN = re.compile(r'^<h2 id="tocS_(?P<name>[^"]+)">')
+
+OP = "op"
+SCHEMA = "schema"
+Key = Tuple[str, str]
+
+
+def incremental_enabled(options: Dict[str, Any]) -> bool:
+    return bool(options.get("opt_incremental"))
+
+
+def state_path(output_file: str) -> Path:
+    """Estado da última renderização: .<saída>.incremental.json na pasta da saída"""
+    path = Path(output_file)
+    return path.with_name(f".{path.name}.incremental.json")
+
+
+def _digest(value: Any) -> str:
+    # Sem sort_keys: a ordem das propriedades aparece na documentação
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class UnsupportedSpec(Exception):
+    """Spec fora do que a renderização incremental sabe dividir"""
+
+
+class SpecModel:
+    """Operações e schemas do spec, com a ordem e o hash de cada um"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or not str(spec.get("openapi", "")).startswith("3"):
+            raise UnsupportedSpec("apenas OpenAPI 3")
+        self.spec = spec
+        self.components: Dict[str, Any] = spec.get("components") or {}
+        self._direct_refs: Dict[str, Set[str]] = {}
+
+        # (método, path) -> (path, método); a ordem segue a iteração do Widdershins
+        self.operations: Dict[str, Tuple[str, str]] = {}
+        for path, item in (spec.get("paths") or {}).items():
+            if not isinstance(item, dict):
+                continue
+            for method in item:
+                if method in HTTP_METHODS and isinstance(item[method], dict):
+                    self.operations[f"{method.upper()} {path}"] = (path, method)
+        self.schemas: List[str] = list(self.components.get("schemas") or {})
+        if SENTINEL_SCHEMA in self.schemas:
+            raise UnsupportedSpec(f"schema reservado {SENTINEL_SCHEMA}")
+
+        self.order: Dict[Key, int] = {}
+        for index, key in enumerate(self.operations):
+            self.order[(OP, key)] = index
+        for index, name in enumerate(self.schemas):
+            self.order[(SCHEMA, name)] = index
+
+        self.hashes: Dict[Key, str] = {}
+        for key in self.operations:
+            self.hashes[(OP, key)] = _digest(self._operation_payload(key))
+        for name in self.schemas:
+            self.hashes[(SCHEMA, name)] = _digest(self._schema_payload(name))
+
+    def frame_digest(self) -> str:
+        """Tudo o que aparece fora das seções de operações e schemas"""
+        frame = {key: value for key, value in self.spec.items() if key not in ("paths", "components")}
+        frame["securitySchemes"] = self.components.get("securitySchemes")
+        return _digest(frame)
+
+    def _shared(self, path: str) -> Dict[str, Any]:
+        """Campos do path item comuns às operações (parameters, servers, summary...)"""
+        item = self.spec["paths"][path]
+        return {key: value for key, value in item.items() if key not in HTTP_METHODS}
+
+    def _operation_payload(self, key: str) -> List[Any]:
+        path, method = self.operations[key]
+        node = [self._shared(path), self.spec["paths"][path][method]]
+        return [key, node, self._reached(node)]
+
+    def _schema_payload(self, name: str) -> List[Any]:
+        schema = self.components["schemas"][name]
+        return [name, schema, self._reached(schema, exclude=f"schemas/{name}")]
+
+    def _reached(self, node: Any, exclude: str = "") -> List[Any]:
+        """Definições (ordenadas) de todos os components alcançados a partir de node"""
+        closure = self.closure(_local_refs(node))
+        closure.discard(exclude)
+        return [[ref, self._component(ref)] for ref in sorted(closure)]
+
+    def closure(self, refs: Set[str]) -> Set[str]:
+        """Fecho transitivo de referências 'tipo/nome' dentro de components"""
+        seen: Set[str] = set()
+        pending = list(refs)
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            direct = self._direct_refs.get(ref)
+            if direct is None:
+                direct = self._direct_refs[ref] = _local_refs(self._component(ref))
+            pending.extend(direct - seen)
+        return seen
+
+    def _component(self, ref: str) -> Any:
+        kind, _, name = ref.partition('/')
+        section = self.components.get(kind)
+        if not isinstance(section, dict) or name not in section:
+            raise UnsupportedSpec(f"$ref local não encontrado: #/components/{ref}")
+        return section[name]
+
+    def partial_spec(self, keys: List[Key]) -> Dict[str, Any]:
+        """Spec só com as operações/schemas pedidos e os components que eles alcançam"""
+        partial = {key: value for key, value in self.spec.items() if key not in ("paths", "components")}
+        paths: Dict[str, Dict[str, Any]] = {}
+        refs: Set[str] = set()
+        for kind, name in keys:
+            if kind == OP:
+                path, method = self.operations[name]
+                item = paths.setdefault(path, self._shared(path))
+                item[method] = self.spec["paths"][path][method]
+                refs |= _local_refs(item)
+            else:
+                refs.add(f"schemas/{name}")
+        partial["paths"] = paths
+
+        components: Dict[str, Dict[str, Any]] = {}
+        if "securitySchemes" in self.components:
+            components["securitySchemes"] = self.components["securitySchemes"]
+        for ref in sorted(self.closure(refs)):
+            kind, _, name = ref.partition('/')
+            components.setdefault(kind, {})[name] = self.components[kind][name]
+        components.setdefault("schemas", {})[SENTINEL_SCHEMA] = {"type": "string"}
+        partial["components"] = components
+        return partial
+
+
+def _local_refs(node: Any) -> Set[str]:
+    """Referências locais ('tipo/nome') em $ref e nos mappings de discriminator"""
+    refs: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if key == "$ref" and isinstance(value, str):
+                    refs.add(_component_ref(value))
+                elif key == "discriminator" and isinstance(value, dict):
+                    mapping = value.get("mapping")
+                    if isinstance(mapping, dict):
+                        refs.update(_component_ref(target) for target in mapping.values()
+                                    if isinstance(target, str) and target.startswith('#'))
+                    stack.append(value)
+                else:
+                    stack.append(value)
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+def _component_ref(ref: str) -> str:
+    parts = [part.replace('~1', '/').replace('~0', '~') for part in ref.split('/')]
+    if len(parts) < 4 or parts[0] != '#' or parts[1] != "components":
+        raise UnsupportedSpec(f"$ref fora de components: {ref}")
+    return f"{parts[2]}/{parts[3]}"
+
+
+class Section:
+    """Seção de uma operação ou schema: linhas até a última não vazia + linhas em branco seguintes"""
+
+    __slots__ = ('key', 'body', 'gap')
+
+    def __init__(self, key: Key, body: List[str], gap: List[str]):
+        self.key = key
+        self.body = body
+        self.gap = gap
+
+    @classmethod
+    def from_lines(cls, key: Key, lines: List[str]) -> "Section":
+        end = len(lines)
+        while end and not lines[end - 1].strip():
+            end -= 1
+        return cls(key, lines[:end], lines[end:])
+
+
+class Block:
+    """Trecho entre dois h1 (tag, Schemas): cabeçalho + seções"""
+
+    def __init__(self, heading: str):
+        self.heading = heading
+        self.header: List[str] = []
+        self.sections: List[Section] = []
+
+
+class RenderedDocument:
+    """Markdown do Widdershins dividido em blocos (h1) e seções (operações e schemas)"""
+
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+        self.locations: Dict[Key, Tuple[Block, Section]] = {}
+        for block in blocks:
+            for section in block.sections:
+                if section.key in self.locations:
+                    raise UnsupportedSpec(f"seção repetida: {section.key[1]}")
+                self.locations[section.key] = (block, section)
+
+    @classmethod
+    def parse(cls, text: str) -> "RenderedDocument":
+        blocks = [Block("")]
+        raw: List[List[str]] = []
+        current = blocks[0].header
+        in_fence = False
+
+        def close_block():
+            block = blocks[-1]
+            for lines in raw:
+                key = _section_key(lines)
+                if key is not None:
+                    block.sections.append(Section.from_lines(key, lines))
+                elif block.sections:
+                    # '## ' de uma descrição: continua a seção anterior
+                    previous = block.sections.pop()
+                    block.sections.append(Section.from_lines(previous.key, previous.body + previous.gap + lines))
+                else:
+                    block.header.extend(lines)
+            raw.clear()
+
+        for line in text.splitlines(keepends=True):
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            elif not in_fence:
+                if H1_PATTERN.match(line):
+                    close_block()
+                    blocks.append(Block(line.strip()))
+                    current = blocks[-1].header
+                elif SECTION_PATTERN.match(line):
+                    current = []
+                    raw.append(current)
+            current.append(line)
+        close_block()
+
+        document = cls(blocks)
+        if document.text() != text:
+            raise UnsupportedSpec("divisão do Markdown não reversível")
+        return document
+
+    def keys(self, kind: str) -> Set[str]:
+        return {name for section_kind, name in self.locations if section_kind == kind}
+
+    def text(self) -> str:
+        parts: List[str] = []
+        for block in self.blocks:
+            parts.extend(block.header)
+            for section in block.sections:
+                parts.extend(section.body)
+                parts.extend(section.gap)
+        return "".join(parts)
+
+    def inner_gap(self, kind: str) -> Optional[List[str]]:
+        """Separador entre seções consecutivas do mesmo tipo (None se desconhecido ou não uniforme)"""
+        gaps = {"".join(section.gap) for block in self.blocks for section in block.sections[:-1]
+                if section.key[0] == kind}
+        if len(gaps) != 1:
+            return None
+        return gaps.pop().splitlines(keepends=True)
+
+
+def _section_key(lines: List[str]) -> Optional[Key]:
+    schema = SCHEMA_PATTERN.match(lines[0])
+    if schema:
+        return SCHEMA, schema.group('name')
+    in_fence = False
+    for line in lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            operation = OPERATION_PATTERN.match(line)
+            if operation:
+                return OP, f"{operation.group(1)} {operation.group(2)}"
+    return None
+
+
+class IncrementalRenderer:
+    """
+    Renderização incremental de um comando do Widdershins com saída (-o).
+
+    patch() tenta atualizar a saída existente e retorna None quando é preciso
+    renderizar tudo; depois de uma renderização completa bem-sucedida,
+    record() grava o estado para a próxima vez.
+    """
+
+    def __init__(self, command: List[str], spec: Optional[Dict[str, Any]], input_file: str,
+                 log: Optional[Callable[[str], None]] = None, timeout: int = DEFAULT_TIMEOUT):
+        self.command = list(command)
+        self.input_file = input_file
+        self.log = log or (lambda message: None)
+        self.timeout = timeout
+        self.output_file = command[command.index('-o') + 1] if '-o' in command else None
+        self.model: Optional[SpecModel] = None
+        self.reason = ""
+        try:
+            self.model = self._build_model(spec)
+        except (UnsupportedSpec, RefResolutionError, OSError, ValueError) as e:
+            self.reason = str(e)
+
+    def _build_model(self, spec: Optional[Dict[str, Any]]) -> SpecModel:
+        if self.output_file is None:
+            raise UnsupportedSpec("sem arquivo de saída")
+        if '--user_templates' in self.command:
+            raise UnsupportedSpec("templates próprios")
+        if spec is None:
+            # O Widdershins lê o arquivo; $refs externos mudam sem que o spec mude
+            if has_external_refs(self.input_file):
+                raise UnsupportedSpec("$refs externos não resolvidos")
+            spec = load_document(self.input_file)
+        return SpecModel(spec)
+
+    def options_digest(self) -> str:
+        """Argumentos do comando (sem entrada e saída), environment e versão do Widdershins"""
+        output_index = self.command.index('-o')
+        args = self.command[2:output_index] + self.command[output_index + 2:]
+        parts: List[str] = [widdershins_version(self.command[0])] + args
+        if '--environment' in args:
+            parts.append(file_digest(args[args.index('--environment') + 1]))
+        return _digest(parts)
+
+    # --- Atualização da saída existente ---
+
+    def patch(self) -> Optional[RenderProcess]:
+        if self.model is None:
+            return None
+        started = time.perf_counter()
+        try:
+            state = self._read_state()
+            if not state:
+                return None
+            if state.get("options") != self.options_digest() or state.get("frame") != self.model.frame_digest():
+                return self._full("opções, info, servidores, tags ou segurança mudaram")
+            with open(self.output_file, 'rb') as f:
+                data = f.read()
+            if hashlib.sha256(data).hexdigest() != state.get("output"):
+                return self._full("saída alterada fora do gerador")
+
+            document = RenderedDocument.parse(data.decode('utf-8'))
+            previous = {(OP, key): value for key, value in state.get("operations", {}).items()}
+            previous.update({(SCHEMA, key): value for key, value in state.get("schemas", {}).items()})
+            if set(document.locations) != set(previous):
+                return self._full("seções da saída não correspondem ao estado")
+
+            current = self.model.hashes
+            changed = [key for key, value in current.items() if previous.get(key) != value]
+            removed = [key for key in previous if key not in current]
+            if len(changed) > MAX_CHANGED_FRACTION * max(1, len(current)):
+                return self._full(f"{len(changed)} de {len(current)} seções mudaram")
+
+            rendered = None
+            process = None
+            if changed:
+                process = run_widdershins(self._partial_command(), self.model.partial_spec(changed), self.timeout)
+                if process.returncode != 0:
+                    return self._full("falha na renderização parcial")
+                rendered = RenderedDocument.parse(process.stdout)
+
+            text = self._rebuild(document, changed, rendered)
+            if text is None:
+                return self._full("estrutura do documento não permite a montagem")
+        except UnsupportedSpec as e:
+            return self._full(str(e))
+        except (OSError, UnicodeDecodeError, subprocess.SubprocessError) as e:
+            return self._full(f"erro na renderização incremental: {e}")
+
+        output = text.encode('utf-8')
+        output_changed = write_if_changed(self.output_file, output)
+        self._write_state(hashlib.sha256(output).hexdigest())
+        if changed or removed:
+            self.log(f"  ⚡ Renderização incremental: {sum(key[0] == OP for key in changed)} operações e "
+                     f"{sum(key[0] == SCHEMA for key in changed)} schemas renderizados, {len(removed)} removidos\n")
+        else:
+            self.log("  ⚡ Renderização incremental: nenhuma operação ou schema alterado\n")
+        return RenderProcess(self.command, 0, "", process.stderr if process else "",
+                             time.perf_counter() - started,
+                             process.peak_memory_kb if process else None, output_changed)
+
+    def _full(self, reason: str) -> None:
+        self.reason = reason
+        self.log(f"  ↻ Renderização completa: {reason}\n")
+        return None
+
+    def _partial_command(self) -> List[str]:
+        """Mesmo comando com o Markdown no stdout"""
+        index = self.command.index('-o')
+        return self.command[:index] + self.command[index + 2:]
+
+    def _rebuild(self, document: RenderedDocument, changed: List[Key],
+                 rendered: Optional[RenderedDocument]) -> Optional[str]:
+        model = self.model
+        # Bloco (h1) de cada seção no novo documento
+        homes: Dict[Key, str] = {}
+        bodies: Dict[Key, List[str]] = {}
+        for key, (block, section) in document.locations.items():
+            if key in model.hashes:
+                homes[key] = block.heading
+                bodies[key] = section.body
+        for key in changed:
+            location = rendered.locations.get(key) if rendered else None
+            if location is None:
+                return None
+            homes[key] = location[0].heading
+            bodies[key] = location[1].body
+
+        headings = {block.heading for block in document.blocks}
+        if len(headings) != len(document.blocks) or not set(homes.values()) <= headings:
+            # Tag nova (ou h1 repetido): o cabeçalho do bloco não existe na saída
+            return None
+
+        changed_set = set(changed)
+        last_block = document.blocks[-1]
+        for block in document.blocks:
+            old_keys = [section.key for section in block.sections]
+            new_keys = sorted((key for key, heading in homes.items() if heading == block.heading),
+                              key=lambda key: model.order[key])
+            if bool(old_keys) != bool(new_keys):
+                # Bloco que ficaria vazio ou que não tinha seções: o Widdershins decide se ele existe
+                return None
+            if not new_keys:
+                continue
+            kept = [key for key in old_keys if homes.get(key) == block.heading]
+            if kept != sorted(kept, key=lambda key: model.order[key]):
+                return None
+            if block is last_block and (new_keys[-1] != old_keys[-1] or new_keys[-1] in changed_set):
+                # A última seção do documento inclui o rodapé do template
+                return None
+
+            inner = None
+            if len(new_keys) > 1:
+                kind = new_keys[0][0]
+                inner = document.inner_gap(kind) or (rendered.inner_gap(kind) if rendered else None)
+                if inner is None or (rendered is not None and rendered.inner_gap(kind) not in (None, inner)):
+                    return None
+            end_gap = block.sections[-1].gap
+            block.sections = [Section(key, bodies[key], inner) for key in new_keys[:-1]]
+            block.sections.append(Section(new_keys[-1], bodies[new_keys[-1]], end_gap))
+        return document.text()
+
+    # --- Estado ---
+
+    def record(self) -> bool:
+        """Grava o estado após uma renderização completa; remove-o se a saída não puder ser dividida"""
+        if self.model is None:
+            return False
+        try:
+            with open(self.output_file, 'rb') as f:
+                data = f.read()
+            document = RenderedDocument.parse(data.decode('utf-8'))
+            if set(document.locations) != set(self.model.hashes):
+                raise UnsupportedSpec("seções da saída não correspondem ao spec")
+            self._write_state(hashlib.sha256(data).hexdigest())
+            return True
+        except (UnsupportedSpec, OSError, UnicodeDecodeError) as e:
+            self.reason = str(e)
+            try:
+                os.remove(state_path(self.output_file))
+            except OSError:
+                pass
+            return False
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(state_path(self.output_file), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) and state.get("version") == STATE_VERSION else {}
+
+    def _write_state(self, output_digest: str):
+        model = self.model
+        state = {
+            "version": STATE_VERSION,
+            "options": self.options_digest(),
+            "frame": model.frame_digest(),
+            "output": output_digest,
+            "operations": {name: value for (kind, name), value in model.hashes.items() if kind == OP},
+            "schemas": {name: value for (kind, name), value in model.hashes.items() if kind == SCHEMA},
+        }
+        write_if_changed(str(state_path(self.output_file)),
+                         json.dumps(state, separators=(',', ':')).encode('utf-8'))
+
+
+def render_incremental(command: List[str], spec: Optional[Dict[str, Any]], input_file: str,
+                       log: Optional[Callable[[str], None]] = None,
+                       timeout: int = DEFAULT_TIMEOUT) -> RenderProcess:
+    """Atualiza a saída de forma incremental quando possível; senão renderiza tudo e grava o estado"""
+    renderer = IncrementalRenderer(command, spec, input_file, log, timeout)
+    result = renderer.patch()
+    if result is not None:
+        return result
+    result = run_widdershins(command, spec, timeout)
+    if result.returncode == 0:
+        renderer.record()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Renderização incremental por operação")
+    parser.add_argument("input", help="Spec OpenAPI 3 ou Postman Collection")
+    parser.add_argument("-o", "--output", required=True, help="Arquivo Markdown de saída")
+    parser.add_argument("--config", help="config.json com as opções de geração")
+    parser.add_argument("--verify", action="store_true",
+                        help="Também renderizar tudo e comparar com o resultado incremental")
+    args = parser.parse_args(argv)
+
+    log = lambda message: print(message, end='')
+    try:
+        options: Dict[str, Any] = {}
+        if args.config:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                options = json.load(f)
+        widdershins = find_widdershins()
+        spec, _ = prepare_spec(args.input, options, log=log)
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        result = render_incremental(build_command(widdershins, args.input, args.output, options), spec, args.input, log)
+        if result.returncode != 0:
+            print(f"Erro: {result.stderr.strip()}")
+            return 1
+        print(f"✅ {args.output} ({result.duration:.2f}s)")
+
+        if args.verify:
+            with tempfile.TemporaryDirectory() as directory:
+                full_output = os.path.join(directory, Path(args.output).name)
+                full = run_widdershins(build_command(widdershins, args.input, full_output, options), spec)
+                if full.returncode != 0:
+                    print(f"Erro na renderização completa: {full.stderr.strip()}")
+                    return 1
+                if file_digest(full_output) != file_digest(args.output):
+                    print(f"❌ Diferente da renderização completa ({full.duration:.2f}s)")
+                    return 1
+            print(f"✅ Idêntico à renderização completa ({full.duration:.2f}s)")
+    except (OSError, ValueError, RefResolutionError, subprocess.SubprocessError) as e:
+        print(f"Erro: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""
+Preview paginado de arquivos grandes
+Índice de linhas sobre mmap (construído em background) e um Text que só
+carrega as linhas visíveis
+"""
+
+import mmap
+import threading
+import tkinter as tk
+from array import array
+from bisect import bisect_right
+from tkinter import ttk
+from typing import Callable, List, Optional
+
+
+INDEX_CHUNK_SIZE = 4 * 1024 * 1024
+# Linhas maiores que isso (ex.: JSON minificado) são quebradas em linhas virtuais
+MAX_LINE_BYTES = 4096
+INDEX_POLL_MS = 200
+# Bloco da busca: o lock é liberado entre blocos
+SEARCH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class LineIndex:
+    """Índice de offsets de linha sobre um arquivo mapeado em memória"""
+
+    def __init__(self, file_path: str, max_line_bytes: int = MAX_LINE_BYTES):
+        self.file_path = file_path
+        self.max_line_bytes = max_line_bytes
+        self._file = open(file_path, 'rb')
+        self.size = self._file.seek(0, 2)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+        self._offsets = array('Q', [0])
+        self._indexed_bytes = 0
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._building = False
+        self._closed = False
+        self.complete = self.size == 0
+
+    # --- Construção ---
+
+    def start(self, on_progress: Optional[Callable[[int, int], None]] = None) -> threading.Thread:
+        """Constrói o índice em um thread de trabalho"""
+        self._building = True
+        thread = threading.Thread(target=self._build, args=(on_progress,), daemon=True)
+        thread.start()
+        return thread
+
+    def _build(self, on_progress: Optional[Callable[[int, int], None]]):
+        try:
+            mm = self._mm
+            pos = 0
+            line_start = 0
+            while mm is not None and pos < self.size and not self._cancel.is_set():
+                chunk_end = min(pos + INDEX_CHUNK_SIZE, self.size)
+                chunk = mm[pos:chunk_end]
+                new_offsets = array('Q')
+                search_from = 0
+
+                while True:
+                    newline = chunk.find(b'\n', search_from)
+                    line_end = pos + newline + 1 if newline >= 0 else None
+
+                    # Quebra virtual de linhas muito longas (em fronteira UTF-8)
+                    limit = line_end if line_end is not None else chunk_end
+                    while limit - line_start > self.max_line_bytes:
+                        split = line_start + self.max_line_bytes
+                        while split > line_start + 1 and (mm[split] & 0xC0) == 0x80:
+                            split -= 1
+                        new_offsets.append(split)
+                        line_start = split
+
+                    if line_end is None:
+                        break
+                    if line_end < self.size:
+                        new_offsets.append(line_end)
+                    line_start = line_end
+                    search_from = newline + 1
+
+                pos = chunk_end
+                with self._lock:
+                    self._offsets.extend(new_offsets)
+                    self._indexed_bytes = pos
+                if on_progress:
+                    on_progress(pos, self.size)
+
+            self.complete = not self._cancel.is_set()
+        finally:
+            with self._lock:
+                self._building = False
+                if self._closed:
+                    self._release()
+
+    # --- Consulta ---
+
+    @property
+    def line_count(self) -> int:
+        with self._lock:
+            return len(self._offsets)
+
+    @property
+    def indexed_bytes(self) -> int:
+        with self._lock:
+            return self.size if self.complete else self._indexed_bytes
+
+    def get_lines(self, start: int, count: int) -> List[str]:
+        """Retorna as linhas [start, start + count) já indexadas"""
+        with self._lock:
+            if self._mm is None:
+                return [""] if start == 0 else []
+            total = len(self._offsets)
+            start = max(0, min(start, total - 1))
+            end = min(total, start + count)
+            bounds = list(self._offsets[start:end + 1])
+            if len(bounds) == end - start:
+                bounds.append(self.size if self.complete else self._indexed_bytes)
+            data = [self._mm[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+        return [line.decode('utf-8', errors='replace').rstrip('\r\n') for line in data]
+
+    def offset_of_line(self, line: int) -> int:
+        with self._lock:
+            line = max(0, min(line, len(self._offsets) - 1))
+            return self._offsets[line]
+
+    def line_of_offset(self, offset: int) -> Optional[int]:
+        """Linha que contém o offset, ou None se o índice ainda não chegou lá"""
+        with self._lock:
+            if not self.complete and offset >= self._indexed_bytes:
+                return None
+            return max(0, bisect_right(self._offsets, offset) - 1)
+
+    def find(self, text: str, start_offset: int = 0, cancel: Optional[threading.Event] = None) -> int:
+        """
+        Busca (sensível a maiúsculas) no arquivo inteiro; retorna o offset ou -1.
+        Lenta em arquivos grandes: chamar fora do main thread. A busca é feita
+        em blocos, sem bloquear a construção do índice.
+        """
+        needle = text.encode('utf-8')
+        if not needle:
+            return -1
+        start_offset = max(0, min(start_offset, self.size))
+        found = self._find_range(needle, start_offset, self.size, cancel)
+        if found < 0 and start_offset > 0:
+            found = self._find_range(needle, 0, start_offset, cancel)  # Recomeça do início
+        return found
+
+    def _find_range(self, needle: bytes, begin: int, end: int, cancel: Optional[threading.Event]) -> int:
+        """Ocorrência que começa em [begin, end)"""
+        pos = begin
+        while pos < end:
+            if (cancel is not None and cancel.is_set()) or self._cancel.is_set():
+                return -1
+            chunk_end = min(end, pos + SEARCH_CHUNK_SIZE)
+            with self._lock:
+                if self._mm is None:
+                    return -1
+                # A janela avança len(needle) - 1 bytes para achar ocorrências na fronteira
+                found = self._mm.find(needle, pos, min(self.size, chunk_end + len(needle) - 1))
+            if found >= 0:
+                return found
+            pos = chunk_end
+        return -1
+
+    def close(self):
+        """Cancela a construção e libera o mmap"""
+        self._cancel.set()
+        with self._lock:
+            self._closed = True
+            if not self._building:
+                self._release()
+
+    def _release(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class PagedTextView(ttk.Frame):
+    """Text somente-leitura que exibe apenas a janela de linhas visível"""
+
+    def __init__(self, parent: tk.Widget, index: LineIndex, **text_options):
+        super().__init__(parent)
+        self.index = index
+        self.top_line = 0
+        self.highlight_line: Optional[int] = None
+        self._last_count = -1
+
+        self.text = tk.Text(self, wrap=tk.NONE, **text_options)
+        self.vscroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.hscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=self.hscroll.set)
+        self.text.tag_configure("highlight", background="#fff3a0")
+
+        self.text.grid(row=0, column=0, sticky=tk.NSEW)
+        self.vscroll.grid(row=0, column=1, sticky=tk.NS)
+        self.hscroll.grid(row=1, column=0, sticky=tk.EW)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_wheel)
+        self.text.bind("<Prior>", lambda e: self._scroll_lines(-self.visible_lines))
+        self.text.bind("<Next>", lambda e: self._scroll_lines(self.visible_lines))
+        self.text.bind("<Up>", lambda e: self._scroll_lines(-1))
+        self.text.bind("<Down>", lambda e: self._scroll_lines(1))
+        self.text.bind("<Configure>", lambda e: self.refresh())
+
+        self._poll_index()
+
+    @property
+    def visible_lines(self) -> int:
+        line_height = max(1, int(self.text.tk.call("font", "metrics", self.text.cget("font"), "-linespace")))
+        return max(1, self.text.winfo_height() // line_height)
+
+    def goto_line(self, line: int, highlight: bool = True):
+        """Posiciona a linha (base 0) no topo da área visível"""
+        self.highlight_line = line if highlight else None
+        self.top_line = max(0, line - 2)
+        self.refresh()
+
+    def refresh(self):
+        """Recarrega no Text apenas as linhas visíveis"""
+        total = self.index.line_count
+        visible = self.visible_lines
+        self.top_line = max(0, min(self.top_line, total - visible))
+        lines = self.index.get_lines(self.top_line, visible)
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        if self.highlight_line is not None and 0 <= self.highlight_line - self.top_line < len(lines):
+            row = self.highlight_line - self.top_line + 1
+            self.text.tag_add("highlight", f"{row}.0", f"{row}.end")
+        self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.vscroll.set(self.top_line / total, min(1.0, (self.top_line + visible) / total))
+
+    def _scroll_lines(self, delta: int):
+        self.top_line += delta
+        self.refresh()
+        return "break"
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            return self._scroll_lines(-3)
+        return self._scroll_lines(3)
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None):
+        if action == tk.MOVETO:
+            self.top_line = int(float(value) * self.index.line_count)
+            self.refresh()
+        elif action == tk.SCROLL:
+            step = self.visible_lines if unit == "pages" else 1
+            self._scroll_lines(int(value) * step)
+
+    def _poll_index(self):
+        """Atualiza a visão enquanto o índice cresce"""
+        try:
+            count = self.index.line_count
+            if count != self._last_count:
+                self._last_count = count
+                self.refresh()
+            if not self.index.complete:
+                self.after(INDEX_POLL_MS, self._poll_index)
+        except tk.TclError:
+            # Janela foi fechada
+            pass
@@ -0,0 +1,230 @@
+"""
+Diagnóstico de memória com tracemalloc
+Mede o pico e a memória retida por arquivo (conversão de collections e cada
+iteração do lote), lista os principais pontos de alocação e grava snapshots
+no início e no fim da sessão, que podem ser comparados depois para achar
+vazamentos:
+
+    python memory_diagnostics.py diff memory_snapshots/<sessão>/start.snap memory_snapshots/<sessão>/lote_3.snap
+    python memory_diagnostics.py convert collection_grande.json
+"""
+
+import argparse
+import linecache
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterator, List, Optional
+
+
+SNAPSHOT_DIR = Path(__file__).parent / "memory_snapshots"
+TRACE_FRAMES = 10
+TOP_SITES = 10
+# Registros mantidos em memória (a própria sessão não pode crescer sem limite)
+MAX_RECORDS = 1000
+# Alocações do próprio tracemalloc e do import de módulos não interessam
+IGNORED_FILES = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                 "<unknown>", tracemalloc.__file__, linecache.__file__)
+
+
+class MemoryRecord:
+    """Pico e memória retida (bytes) de um trecho medido"""
+
+    __slots__ = ('label', 'peak', 'retained', 'duration')
+
+    def __init__(self, label: str, peak: int, retained: int, duration: float):
+        self.label = label
+        self.peak = peak
+        self.retained = retained
+        self.duration = duration
+
+    def summary(self) -> str:
+        return f"pico {format_size(self.peak)}, retido {format_size(self.retained, signed=True)}"
+
+
+class MemoryDiagnostics:
+    """
+    Sessão de diagnóstico: liga o tracemalloc no primeiro uso e grava o
+    snapshot inicial em snapshot_dir/<data_hora>/start.snap.
+
+    O tracemalloc é global ao processo: o pico de um trecho inclui o que
+    outros threads alocaram ao mesmo tempo (o lote da GUI é sequencial).
+    Trechos aninhados são suportados; o pico do externo inclui o dos internos.
+    """
+
+    def __init__(self, snapshot_dir: Path = SNAPSHOT_DIR, frames: int = TRACE_FRAMES,
+                 top: int = TOP_SITES):
+        self.snapshot_dir = snapshot_dir
+        self.frames = frames
+        self.top = top
+        self.records: Deque[MemoryRecord] = deque(maxlen=MAX_RECORDS)
+        self.session_dir: Optional[Path] = None
+        self._started_tracing = False
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        # Pico já observado por cada trecho aberto (reset_peak zera o contador global)
+        self._peaks: List[int] = []
+        self._lock = threading.RLock()
+
+    @property
+    def active(self) -> bool:
+        return self._start_snapshot is not None
+
+    def start(self) -> Path:
+        """Inicia a sessão (idempotente); retorna a pasta dos snapshots"""
+        with self._lock:
+            if self.session_dir is not None:
+                return self.session_dir
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+            self.session_dir = self.snapshot_dir / time.strftime("%Y%m%d_%H%M%S")
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+            self._start_snapshot = self.take_snapshot("start")
+            return self.session_dir
+
+    def stop(self):
+        """Encerra a sessão e desliga o tracemalloc se foi ligado por ela"""
+        with self._lock:
+            if self._started_tracing:
+                tracemalloc.stop()
+            self._started_tracing = False
+            self._start_snapshot = None
+            self.session_dir = None
+            self._peaks = []
+
+    @contextmanager
+    def track(self, label: str, on_record: Optional[Callable[[MemoryRecord], None]] = None) -> Iterator[None]:
+        """Mede o trecho; o registro vai para records e para on_record"""
+        self.start()
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                after, peak = tracemalloc.get_traced_memory()
+                peak = max(self._peaks.pop(), peak)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                record = MemoryRecord(label, max(0, peak - current), after - current,
+                                      time.perf_counter() - started)
+                self.records.append(record)
+            if on_record is not None:
+                on_record(record)
+
+    def take_snapshot(self, name: Optional[str] = None) -> tracemalloc.Snapshot:
+        """Snapshot filtrado; com name, também gravado em <sessão>/<name>.snap"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in IGNORED_FILES]
+        )
+        if name and self.session_dir is not None:
+            snapshot.dump(str(self.session_dir / f"{name}.snap"))
+        return snapshot
+
+    def top_sites(self, snapshot: Optional[tracemalloc.Snapshot] = None) -> List[str]:
+        """Principais pontos de alocação ainda vivos"""
+        snapshot = snapshot or self.take_snapshot()
+        return [format_statistic(stat) for stat in snapshot.statistics('lineno')[:self.top]]
+
+    def checkpoint(self, name: str) -> List[str]:
+        """
+        Grava um snapshot e retorna o relatório: crescimento desde o início da
+        sessão e os principais pontos de alocação
+        """
+        with self._lock:
+            if self._start_snapshot is None:
+                return []
+            snapshot = self.take_snapshot(name)
+            growth = snapshot.compare_to(self._start_snapshot, 'lineno')
+            total = sum(stat.size_diff for stat in growth)
+        lines = [f"🧠 Memória desde o início da sessão: {format_size(total, signed=True)} "
+                 f"(snapshots em {self.session_dir})"]
+        lines.append("  Maior crescimento:")
+        lines.extend(f"    {format_statistic(stat, diff=True)}" for stat in growth[:self.top] if stat.size_diff > 0)
+        lines.append("  Maiores alocações vivas:")
+        lines.extend(f"    {line}" for line in self.top_sites(snapshot))
+        return lines
+
+
+def format_size(size: int, signed: bool = False) -> str:
+    sign = "+" if signed and size > 0 else ("-" if size < 0 else "")
+    value = float(abs(size))
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.1f} GB"
+
+
+def format_statistic(stat: Any, diff: bool = False) -> str:
+    """'arquivo:linha: tamanho (blocos)' de um Statistic ou StatisticDiff"""
+    frame = stat.traceback[0]
+    size = format_size(stat.size_diff, signed=True) if diff else format_size(stat.size)
+    return f"{Path(frame.filename).name}:{frame.lineno}: {size} ({stat.count} blocos)"
+
+
+def diff_snapshots(first: str, second: str, top: int = TOP_SITES) -> List[str]:
+    """Comparação entre dois snapshots gravados (segundo - primeiro)"""
+    before = tracemalloc.Snapshot.load(first)
+    after = tracemalloc.Snapshot.load(second)
+    growth = after.compare_to(before, 'lineno')
+    total = sum(stat.size_diff for stat in growth)
+    lines = [f"Diferença total: {format_size(total, signed=True)}"]
+    lines.extend(format_statistic(stat, diff=True) for stat in growth[:top])
+    return lines
+
+
+def profile_conversion(collection_file: str, top: int = TOP_SITES) -> List[str]:
+    """Converte uma collection sob tracemalloc e relata pico e pontos de alocação"""
+    from postman_converter import PostmanToOpenAPIConverter
+
+    diagnostics = MemoryDiagnostics(top=top)
+    converter = PostmanToOpenAPIConverter()
+    with diagnostics.track(Path(collection_file).name):
+        spec = converter.convert_to_spec(collection_file)
+    record = diagnostics.records[-1]
+    lines = [f"{record.label}: {record.summary()} em {record.duration:.2f}s"
+             + ("" if spec is not None else " (falha na conversão)")]
+    lines.extend(diagnostics.checkpoint("end"))
+    diagnostics.stop()
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diagnóstico de memória (tracemalloc)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    diff = commands.add_parser("diff", help="Compara dois snapshots gravados")
+    diff.add_argument("first", help="Snapshot inicial (.snap)")
+    diff.add_argument("second", help="Snapshot final (.snap)")
+    diff.add_argument("--top", type=int, default=TOP_SITES)
+
+    convert = commands.add_parser("convert", help="Mede a conversão de uma Postman Collection")
+    convert.add_argument("collection", help="Arquivo da collection")
+    convert.add_argument("--top", type=int, default=TOP_SITES)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "diff":
+            lines = diff_snapshots(args.first, args.second, args.top)
+        else:
+            lines = profile_conversion(args.collection, args.top)
+    except (OSError, ValueError, EOFError) as e:
+        print(f"Erro: {e}")
+        return 1
+
+    print("\n".join(lines))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
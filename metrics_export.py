@@ -0,0 +1,226 @@
+"""
+Exportação de métricas no formato texto do Prometheus
+Contadores, histogramas e gauges de uma execução em lote (GUI ou manifesto)
+gravados de forma atômica em um arquivo .prom, lido pelo textfile collector
+do node_exporter. O arquivo é regravado periodicamente durante a execução e
+uma última vez ao final
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+METRIC_PREFIX = "widdershins_"
+WRITE_INTERVAL = 15.0
+# Limites (segundos) dos buckets de conversão e renderização
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# nome -> texto de ajuda
+COUNTERS = {
+    "files_processed_total": "Arquivos processados (renderizados, inalterados ou com falha)",
+    "cache_hits_total": "Arquivos sem renderização ou com saída idêntica à anterior",
+    "failures_total": "Arquivos com falha na conversão, validação ou renderização",
+}
+HISTOGRAMS = {
+    "conversion_seconds": "Tempo de preparação do spec (conversão Postman, $refs, filtros)",
+    "render_seconds": "Tempo de execução do Widdershins",
+}
+GAUGES = {
+    "queue_depth": "Arquivos aguardando processamento",
+    "active_workers": "Arquivos sendo processados neste momento",
+    "run_in_progress": "1 enquanto a execução está em andamento",
+    "last_update_timestamp_seconds": "Momento da última gravação do arquivo",
+}
+
+
+class Histogram:
+    """Histograma cumulativo com buckets fixos"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {_format_value(self.sum)}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class RunMetrics:
+    """Métricas de uma execução, atualizadas por qualquer thread"""
+
+    def __init__(self, mode: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram(buckets) for name in HISTOGRAMS}
+        self.gauges: Dict[str, float] = dict.fromkeys(GAUGES, 0)
+
+    def inc(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self.histograms[name].observe(seconds)
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def add_gauge(self, name: str, delta: float):
+        with self._lock:
+            self.gauges[name] += delta
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Observa a duração do bloco no histograma (também quando ele falha)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        """Um arquivo sai da fila e conta como trabalho ativo durante o bloco"""
+        with self._lock:
+            self.gauges["queue_depth"] = max(0, self.gauges["queue_depth"] - 1)
+            self.gauges["active_workers"] += 1
+        try:
+            yield
+        finally:
+            self.add_gauge("active_workers", -1)
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (0.0.4)"""
+        labels = f'mode="{_escape_label(self.mode)}"'
+        with self._lock:
+            self.gauges["last_update_timestamp_seconds"] = time.time()
+            lines: List[str] = []
+            for name, help_text in COUNTERS.items():
+                lines.extend(_header(name, "counter", help_text))
+                lines.append(f"{METRIC_PREFIX}{name}{{{labels}}} {self.counters[name]}")
+            for name, help_text in HISTOGRAMS.items():
+                lines.extend(_header(name, "histogram", help_text))
+                lines.extend(self.histograms[name].lines(METRIC_PREFIX + name, labels))
+            for name, help_text in GAUGES.items():
+                lines.extend(_header(name, "gauge", help_text))
+                lines.append(f"{METRIC_PREFIX}{name}{{{labels}}} {_format_value(self.gauges[name])}")
+        return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, text: str):
+    """
+    Grava de forma atômica: temporário na mesma pasta + os.replace. O
+    temporário não termina em .prom, então o collector nunca lê um arquivo
+    pela metade.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class MetricsExporter:
+    """Regrava o arquivo de métricas a cada interval segundos até stop()"""
+
+    def __init__(self, path: str, metrics: RunMetrics, interval: float = WRITE_INTERVAL,
+                 log=None):
+        self.path = path
+        self.metrics = metrics
+        self.interval = interval
+        self.log = log or (lambda message: None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error_logged = False
+
+    def start(self, queued: int = 0) -> "MetricsExporter":
+        self.metrics.set_gauge("queue_depth", queued)
+        self.metrics.set_gauge("run_in_progress", 1)
+        self.flush()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra a gravação periódica e grava o estado final"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.metrics.set_gauge("queue_depth", 0)
+        self.metrics.set_gauge("run_in_progress", 0)
+        self.flush()
+
+    def flush(self) -> bool:
+        try:
+            write_textfile(self.path, self.metrics.render())
+            return True
+        except OSError as e:
+            # Métricas nunca interrompem o lote; registra só a primeira falha
+            if not self._error_logged:
+                self._error_logged = True
+                self.log(f"⚠️ Falha ao gravar métricas em {self.path}: {e}\n")
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+@contextmanager
+def exported_run(path: Optional[str], mode: str, queued: int = 0,
+                 log=None) -> Iterator[RunMetrics]:
+    """Métricas da execução, exportadas para path durante e ao final (sem path, só em memória)"""
+    metrics = RunMetrics(mode)
+    if not path:
+        metrics.set_gauge("queue_depth", queued)
+        yield metrics
+        return
+    exporter = MetricsExporter(path, metrics, log=log).start(queued)
+    try:
+        yield metrics
+    finally:
+        exporter.stop()
+
+
+def _header(name: str, kind: str, help_text: str) -> Tuple[str, str]:
+    return f"# HELP {METRIC_PREFIX}{name} {help_text}", f"# TYPE {METRIC_PREFIX}{name} {kind}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
@@ -0,0 +1,338 @@
+"""
+Validação estrutural de specs OpenAPI/Swagger
+Verifica paths, operations, responses e alvos de $ref em uma única passada
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import unquote
+
+from ref_resolver import (
+    RefResolutionError, YAMLUnavailableError, file_digest, load_document, resolve_pointer, split_ref
+)
+
+
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+PARAMETER_LOCATIONS = ('query', 'header', 'path', 'cookie', 'body', 'formData')
+RESPONSE_CODE_PATTERN = re.compile(r'^(default|[1-5](\d\d|XX))$')
+PATH_TEMPLATE_PATTERN = re.compile(r'\{([^}/]+)\}')
+MAX_CACHE_ENTRIES = 256
+
+
+class ValidationIssue:
+    """Problema encontrado na validação"""
+
+    __slots__ = ('level', 'pointer', 'message')
+
+    def __init__(self, level: str, pointer: str, message: str):
+        self.level = level
+        self.pointer = pointer
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"{self.pointer or '#'}: {self.message}"
+
+
+class ValidationResult:
+    """Resultado da validação de um arquivo"""
+
+    def __init__(self, digest: str, issues: List[ValidationIssue], dependencies: Optional[Dict[str, Optional[str]]] = None):
+        self.digest = digest
+        # Arquivos externos lidos pela validação ({caminho: hash}, None se inacessível)
+        self.dependencies = dependencies or {}
+        self.errors = [i for i in issues if i.level == 'error']
+        self.warnings = [i for i in issues if i.level == 'warning']
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+
+class OpenAPIValidator:
+    """Valida a estrutura de um documento já carregado"""
+
+    def __init__(self, document: Any, source_path: Optional[str] = None):
+        self.document = document
+        self.source_dir = Path(source_path).parent if source_path else None
+        self.issues: List[ValidationIssue] = []
+        # Arquivos externos carregados para verificar os $refs
+        self.external_files: List[str] = []
+        # Documentos externos já carregados (ou o erro ao carregar), por caminho
+        self._external_docs: Dict[str, Any] = {}
+        self._refs: List[tuple] = []
+        self._version = ""
+
+    def validate(self) -> List[ValidationIssue]:
+        """Executa a validação e retorna a lista de problemas"""
+        doc = self.document
+        if not isinstance(doc, dict):
+            self._error("", "O documento não é um objeto")
+            return self.issues
+
+        self._version = str(doc.get('openapi') or doc.get('swagger') or '')
+        if not self._version:
+            self._error("", "Campo 'openapi' (ou 'swagger') ausente")
+
+        info = doc.get('info')
+        if not isinstance(info, dict):
+            self._error("/info", "Objeto 'info' ausente")
+        else:
+            for field in ('title', 'version'):
+                if field not in info:
+                    self._error("/info", f"Campo obrigatório '{field}' ausente")
+
+        if 'paths' not in doc and not self._version.startswith('3.1'):
+            self._error("", "Objeto 'paths' ausente")
+
+        # Passada única: verificações dependentes de posição + coleta de $refs
+        self._walk(doc, "")
+        self._check_refs()
+        return self.issues
+
+    # --- Percurso ---
+
+    def _walk(self, node: Any, pointer: str):
+        if isinstance(node, dict):
+            ref = node.get('$ref')
+            if isinstance(ref, str):
+                self._refs.append((pointer, ref))
+
+            if pointer == "/paths":
+                self._check_paths(node)
+            elif pointer.startswith("/paths/"):
+                self._check_paths_node(node, pointer)
+
+            for key, value in node.items():
+                self._walk(value, f"{pointer}/{self._escape(key)}")
+
+        elif isinstance(node, list):
+            for index, value in enumerate(node):
+                self._walk(value, f"{pointer}/{index}")
+
+    def _check_paths(self, paths: Dict[str, Any]):
+        for path in paths:
+            if not str(path).startswith('/') and not str(path).startswith('x-'):
+                self._error(f"/paths/{self._escape(path)}", "O path deve começar com '/'")
+
+    def _check_paths_node(self, node: Dict[str, Any], pointer: str):
+        parts = pointer.split('/')
+        # /paths/<path>            -> path item
+        # /paths/<path>/<method>   -> operation
+        # /paths/<path>/<method>/responses/<code> -> response
+        if len(parts) == 3:
+            self._check_path_item(node, pointer, self._unescape(parts[2]))
+        elif len(parts) == 4 and parts[3] in HTTP_METHODS:
+            self._check_operation(node, pointer)
+        elif len(parts) == 5 and parts[3] in HTTP_METHODS and parts[4] == 'responses':
+            self._check_responses(node, pointer)
+        elif len(parts) == 6 and parts[3] in HTTP_METHODS and parts[4] == 'responses':
+            self._check_response(node, pointer)
+
+    def _check_path_item(self, item: Dict[str, Any], pointer: str, path: str):
+        if path.startswith('x-') or '$ref' in item:
+            return
+
+        template_params = set(PATH_TEMPLATE_PATTERN.findall(path))
+        shared = self._declared_path_params(item.get('parameters'))
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            own = self._declared_path_params(operation.get('parameters'))
+            # $ref não resolvido: os parâmetros declarados são desconhecidos
+            if shared is None or own is None:
+                continue
+            for name in sorted(template_params - shared - own):
+                self._error(f"{pointer}/{method}", f"Parâmetro de path '{name}' não declarado")
+
+    def _check_operation(self, operation: Dict[str, Any], pointer: str):
+        responses = operation.get('responses')
+        if responses is None:
+            if self._version.startswith('3.1'):
+                self._warning(pointer, "Operação sem 'responses'")
+            else:
+                self._error(pointer, "Operação sem 'responses'")
+        elif isinstance(responses, dict) and not responses:
+            self._error(f"{pointer}/responses", "'responses' não pode ser vazio")
+
+        parameters = operation.get('parameters', [])
+        if not isinstance(parameters, list):
+            self._error(f"{pointer}/parameters", "'parameters' deve ser uma lista")
+            return
+
+        seen = set()
+        for index, param in enumerate(parameters):
+            if not isinstance(param, dict) or '$ref' in param:
+                continue
+            param_pointer = f"{pointer}/parameters/{index}"
+            name, location = param.get('name'), param.get('in')
+            if not name or not location:
+                self._error(param_pointer, "Parâmetro sem 'name' ou 'in'")
+                continue
+            if location not in PARAMETER_LOCATIONS:
+                self._error(param_pointer, f"Localização inválida: '{location}'")
+            if location == 'path' and param.get('required') is not True:
+                self._error(param_pointer, f"Parâmetro de path '{name}' deve ter required: true")
+            if (name, location) in seen:
+                self._error(param_pointer, f"Parâmetro duplicado: {name} ({location})")
+            seen.add((name, location))
+
+    def _check_responses(self, responses: Any, pointer: str):
+        if not isinstance(responses, dict):
+            self._error(pointer, "'responses' deve ser um objeto")
+            return
+        for code in responses:
+            if not str(code).startswith('x-') and not RESPONSE_CODE_PATTERN.match(str(code)):
+                self._error(f"{pointer}/{self._escape(code)}", f"Código de resposta inválido: {code}")
+
+    def _check_response(self, response: Any, pointer: str):
+        if pointer.rsplit('/', 1)[-1].startswith('x-'):
+            return
+        if not isinstance(response, dict):
+            self._error(pointer, "Resposta deve ser um objeto")
+        elif '$ref' not in response and 'description' not in response:
+            self._error(pointer, "Resposta sem 'description'")
+
+    def _check_refs(self):
+        """Verifica se cada $ref aponta para um alvo existente"""
+        for pointer, ref in self._refs:
+            file_part, fragment = split_ref(ref)
+            if file_part.startswith(('http://', 'https://')):
+                continue
+
+            if file_part and self.source_dir is None:
+                continue
+            target_doc = self._target_document(file_part)
+            if isinstance(target_doc, Exception):
+                self._error(pointer, f"$ref para arquivo inacessível: {ref}")
+                continue
+
+            try:
+                resolve_pointer(target_doc, fragment)
+            except RefResolutionError:
+                self._error(pointer, f"$ref sem alvo: {ref}")
+
+    # --- Helpers ---
+
+    def _target_document(self, file_part: str) -> Any:
+        """Documento apontado pela parte de arquivo de um $ref (o erro, se não carregar)"""
+        if not file_part:
+            return self.document
+        if self.source_dir is None:
+            return RefResolutionError(f"$ref externo sem arquivo de origem: {file_part}")
+        target_path = str((self.source_dir / unquote(file_part)).resolve())
+        if target_path not in self._external_docs:
+            self.external_files.append(target_path)
+            try:
+                self._external_docs[target_path] = load_document(target_path)
+            except (OSError, ValueError, RefResolutionError) as e:
+                self._external_docs[target_path] = e
+        return self._external_docs[target_path]
+
+    def _declared_path_params(self, parameters: Any) -> Optional[set]:
+        """Nomes dos parâmetros de path; None se algum $ref não puder ser resolvido"""
+        names = set()
+        if isinstance(parameters, list):
+            for param in parameters:
+                if isinstance(param, dict) and isinstance(param.get('$ref'), str):
+                    file_part, fragment = split_ref(param['$ref'])
+                    if file_part.startswith(('http://', 'https://')):
+                        return None
+                    target_doc = self._target_document(file_part)
+                    if isinstance(target_doc, Exception):
+                        return None
+                    try:
+                        param = resolve_pointer(target_doc, fragment)
+                    except RefResolutionError:
+                        return None
+                if isinstance(param, dict) and param.get('in') == 'path':
+                    names.add(param.get('name'))
+        return names
+
+    def _error(self, pointer: str, message: str):
+        self.issues.append(ValidationIssue('error', pointer, message))
+
+    def _warning(self, pointer: str, message: str):
+        self.issues.append(ValidationIssue('warning', pointer, message))
+
+    @staticmethod
+    def _escape(key: Any) -> str:
+        return str(key).replace('~', '~0').replace('/', '~1')
+
+    @staticmethod
+    def _unescape(part: str) -> str:
+        return part.replace('~1', '/').replace('~0', '~')
+
+
+class ValidationCache:
+    """
+    Cache (LRU, thread-safe) de resultados de validação. A chave combina o
+    caminho resolvido e o hash do conteúdo (os $refs relativos dependem da
+    pasta); o resultado só vale se os arquivos externos não mudaram.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ValidationResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ValidationResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        if result is not None and any(_dependency_digest(path) != digest
+                                      for path, digest in result.dependencies.items()):
+            return None
+        return result
+
+    def put(self, key: str, result: ValidationResult):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def validate_document(document: Any, source_path: Optional[str] = None) -> ValidationResult:
+    """Valida um documento já carregado em memória (ex.: collection convertida)"""
+    return ValidationResult("", OpenAPIValidator(document, source_path).validate())
+
+
+def validate_file(file_path: str, cache: Optional[ValidationCache] = None) -> ValidationResult:
+    """Valida um arquivo, reaproveitando o resultado em cache quando o conteúdo não mudou"""
+    digest = file_digest(file_path)
+    key = f"{Path(file_path).resolve()}:{digest}"
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    dependencies: Dict[str, Optional[str]] = {}
+    try:
+        document = load_document(file_path)
+        validator = OpenAPIValidator(document, file_path)
+        issues = validator.validate()
+        dependencies = {path: _dependency_digest(path) for path in validator.external_files}
+    except YAMLUnavailableError as e:
+        # Sem PyYAML não há como validar: não bloquear o arquivo
+        issues = [ValidationIssue('warning', '', str(e))]
+    except RefResolutionError as e:
+        issues = [ValidationIssue('error', '', str(e))]
+    except ValueError as e:
+        issues = [ValidationIssue('error', '', f"Erro de sintaxe: {e}")]
+
+    result = ValidationResult(digest, issues, dependencies)
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+
+def _dependency_digest(file_path: str) -> Optional[str]:
+    try:
+        return file_digest(file_path)
+    except OSError:
+        return None
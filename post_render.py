@@ -0,0 +1,43 @@
+"""
+Pós-processamento das saídas geradas
+Etapas opcionais executadas após uma renderização bem-sucedida, na ordem:
+divisão em páginas, índice de busca e sidecar .gz. Cada etapa só roda quando
+a saída mudou (ou quando o artefato ainda não existe)
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from doc_splitter import needs_split, split_document, split_enabled
+from gzip_sidecar import SidecarWriter, gzip_level, needs_sidecar, write_sidecar
+from ref_resolver import load_document
+from search_index import needs_index, search_enabled, write_index
+
+
+def post_process(output_file: str, output_changed: Optional[bool], options: Dict[str, Any],
+                 input_file: str, spec: Optional[Dict[str, Any]] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 sidecars: Optional[SidecarWriter] = None) -> Optional[Future]:
+    """
+    Executa as etapas habilitadas nas opções. spec é o documento já em memória
+    (None para ler input_file). Com sidecars o .gz é gerado em background;
+    sem ele, de forma síncrona. Retorna o Future do sidecar agendado, se houver.
+    """
+    log = log or (lambda message: None)
+
+    if split_enabled(options) and needs_split(output_file, output_changed):
+        split = split_document(output_file)
+        log(f"  📑 {split['pages']} páginas ({split['changed']} alteradas) em {split['directory']}\n")
+
+    if search_enabled(options) and needs_index(output_file, output_changed):
+        document = spec if spec is not None else load_document(input_file)
+        index = write_index(output_file, document)
+        log(f"  🔎 Índice de busca: {index['docs']} operações, {index['tokens']} termos em {index['shards']} shards\n")
+
+    level = gzip_level(options)
+    if level is not None:
+        if sidecars is not None:
+            return sidecars.submit(output_file, output_changed, level)
+        if needs_sidecar(output_file, output_changed):
+            write_sidecar(output_file, level)
+    return None
@@ -5,15 +5,145 @@ Resolve problemas de compatibilidade com exports do Postman
 
 import json
 import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 
+ELLIPSIS = "…"
+# Callback de progresso: (requests processados, total, pasta atual)
+ProgressCallback = Callable[[int, int, str], None]
+TRIM_LABELS = {"arrays": "listas cortadas", "strings": "textos resumidos", "depth": "níveis omitidos", "summary": "resumido"}
+
+
+class ConversionCancelled(Exception):
+    """Conversão interrompida pelo evento de cancelamento"""
+
+
+class ExampleLimits:
+    """
+    Limites para os exemplos copiados das collections (0 = sem limite).
+    Respostas gravadas no Postman podem ter vários MB; sem limite o spec
+    cresce na mesma proporção e a renderização do Widdershins fica lenta.
+    Por padrão nada é cortado: os limites são ligados nas opções.
+    """
+    
+    DEFAULT_MAX_BYTES = 0
+    DEFAULT_MAX_ITEMS = 0
+    DEFAULT_MAX_DEPTH = 0
+    DEFAULT_MAX_STRING = 0
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_items: int = DEFAULT_MAX_ITEMS,
+                 max_depth: int = DEFAULT_MAX_DEPTH, max_string: int = DEFAULT_MAX_STRING):
+        self.max_bytes = max(0, max_bytes)
+        self.max_items = max(0, max_items)
+        self.max_depth = max(0, max_depth)
+        self.max_string = max(0, max_string)
+    
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> "ExampleLimits":
+        """Limites configurados nas opções (mesmas chaves do config.json)"""
+        def value(key: str, default: int) -> int:
+            try:
+                return int(options.get(key, default))
+            except (TypeError, ValueError):
+                return default
+        
+        return cls(
+            max_bytes=value("example_max_kb", cls.DEFAULT_MAX_BYTES // 1024) * 1024,
+            max_items=value("example_max_items", cls.DEFAULT_MAX_ITEMS),
+            max_depth=value("example_max_depth", cls.DEFAULT_MAX_DEPTH),
+            max_string=value("example_max_chars", cls.DEFAULT_MAX_STRING),
+        )
+    
+    def key(self) -> Tuple[int, int, int, int]:
+        return (self.max_bytes, self.max_items, self.max_depth, self.max_string)
+
+
+class ExampleTrimmer:
+    """Reduz um exemplo aos limites, contando o que foi cortado"""
+    
+    def __init__(self, limits: ExampleLimits):
+        self.limits = limits
+    
+    def trim(self, value: Any) -> Tuple[Any, Dict[str, int]]:
+        """Retorna (exemplo reduzido, {"arrays": n, "strings": n, "depth": n, "summary": 0|1})"""
+        counts = _empty_counts()
+        if not any(self.limits.key()):
+            return value, counts
+        max_items, max_string = self.limits.max_items, self.limits.max_string
+        result = self._trim(value, 0, max_items, max_string, counts)
+        
+        # Ainda acima de max_bytes: aperta itens e strings até caber
+        while self.limits.max_bytes and _json_size(result) > self.limits.max_bytes:
+            if max_items == 1 and max_string == 64:
+                counts["summary"] = 1
+                return self._summary(value), counts
+            max_items = max(1, (max_items or self.limits.max_bytes) // 2)
+            max_string = max(64, (max_string or self.limits.max_bytes) // 2)
+            counts = _empty_counts()
+            result = self._trim(value, 0, max_items, max_string, counts)
+        return result, counts
+    
+    def trim_text(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """Corpo não-JSON: apenas o limite de bytes"""
+        counts = _empty_counts()
+        limit = self.limits.max_bytes
+        data = text.encode('utf-8')
+        if not limit or len(data) <= limit:
+            return text, counts
+        counts["strings"] = 1
+        kept = data[:limit].decode('utf-8', errors='ignore')
+        return f"{kept}{ELLIPSIS} (+{len(data) - limit} bytes)", counts
+    
+    def _trim(self, value: Any, depth: int, max_items: int, max_string: int, counts: Dict[str, int]) -> Any:
+        if isinstance(value, (dict, list)) and self.limits.max_depth and depth >= self.limits.max_depth:
+            counts["depth"] += 1
+            return self._summary(value)
+        
+        if isinstance(value, dict):
+            return {key: self._trim(item, depth + 1, max_items, max_string, counts) for key, item in value.items()}
+        
+        if isinstance(value, list):
+            items = [self._trim(item, depth + 1, max_items, max_string, counts) for item in value[:max_items or None]]
+            if max_items and len(value) > max_items:
+                counts["arrays"] += 1
+                items.append(f"{ELLIPSIS} (+{len(value) - max_items} itens)")
+            return items
+        
+        if isinstance(value, str) and max_string and len(value) > max_string:
+            counts["strings"] += 1
+            return f"{value[:max_string]}{ELLIPSIS} (+{len(value) - max_string} caracteres)"
+        
+        return value
+    
+    def _summary(self, value: Any) -> str:
+        if isinstance(value, dict):
+            return f"{ELLIPSIS} (objeto com {len(value)} campos)"
+        if isinstance(value, list):
+            return f"{ELLIPSIS} (lista com {len(value)} itens)"
+        return f"{ELLIPSIS} ({_json_size(value)} bytes)"
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"arrays": 0, "strings": 0, "depth": 0, "summary": 0}
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
 class PostmanToOpenAPIConverter:
     """Converte Postman Collections para formato OpenAPI 3.0"""
     
-    def __init__(self):
+    def __init__(self, limits: Optional[ExampleLimits] = None):
+        self.limits = limits or ExampleLimits()
+        self._trimmer = ExampleTrimmer(self.limits)
+        self._reset()
+    
+    def _reset(self):
+        """Reinicia o estado para uma nova conversão"""
         self.openapi_spec = {
             "openapi": "3.0.3",
             "info": {
@@ -29,44 +159,56 @@ class PostmanToOpenAPIConverter:
             }
         }
         self.servers_set = set()
+        # Exemplos reduzidos na última conversão (ver trim_summary)
+        self.trim_report: List[Dict[str, Any]] = []
+        self._location = ""
+        self._progress: Optional[ProgressCallback] = None
+        self._cancel: Optional[threading.Event] = None
+        self._processed = 0
+        self._total = 0
     
     def is_postman_collection(self, file_path: str) -> bool:
         """Verifica se o arquivo é uma Postman Collection"""
+        return self.load_collection(file_path) is not None
+    
+    def is_postman_data(self, data: Any) -> bool:
+        """Verifica se um documento já carregado é uma Postman Collection"""
+        if not isinstance(data, dict):
+            return False
+        
+        # Verificar indicadores de Postman Collection
+        info = data.get('info', {})
+        if not isinstance(info, dict):
+            info = {}
+        indicators = [
+            'info' in data and 'schema' in info,
+            'item' in data,
+            str(info.get('schema', '')).startswith('https://schema.getpostman.com')
+        ]
+        
+        return any(indicators)
+    
+    def load_collection(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Carrega o arquivo e o retorna apenas se for uma Postman Collection"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # Verificar indicadores de Postman Collection
-            indicators = [
-                'info' in data and 'schema' in data.get('info', {}),
-                'item' in data,
-                data.get('info', {}).get('schema', '').startswith('https://schema.getpostman.com')
-            ]
+            return data if self.is_postman_data(data) else None
             
-            return any(indicators)
-            
-        except (json.JSONDecodeError, FileNotFoundError, KeyError):
-            return False
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            return None
     
     def convert(self, postman_file: str, output_file: str) -> bool:
         """Converte Postman Collection para OpenAPI"""
         try:
-            with open(postman_file, 'r', encoding='utf-8') as f:
-                postman_data = json.load(f)
-            
-            # Extrair informações básicas
-            self._extract_info(postman_data)
-            
-            # Processar items (endpoints)
-            if 'item' in postman_data:
-                self._process_items(postman_data['item'])
-            
-            # Adicionar servers descobertos
-            self._finalize_servers()
+            spec = self.convert_to_spec(postman_file)
+            if spec is None:
+                return False
             
             # Salvar OpenAPI
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.openapi_spec, f, indent=2, ensure_ascii=False)
+                json.dump(spec, f, indent=2, ensure_ascii=False)
             
             return True
             
@@ -74,6 +216,57 @@ class PostmanToOpenAPIConverter:
             print(f"Erro na conversao: {e}")
             return False
     
+    def convert_to_spec(self, postman_file: str) -> Optional[Dict[str, Any]]:
+        """Converte Postman Collection para OpenAPI em memória (sem gravar em disco)"""
+        try:
+            with open(postman_file, 'r', encoding='utf-8') as f:
+                postman_data = json.load(f)
+            
+            return self.convert_data(postman_data)
+            
+        except Exception as e:
+            print(f"Erro na conversao: {e}")
+            return None
+    
+    def convert_data(self, postman_data: Dict[str, Any], progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Converte uma collection já carregada e retorna o spec OpenAPI.
+        progress recebe (requests processados, total, pasta atual); com cancel
+        definido a conversão é interrompida com ConversionCancelled.
+        """
+        self._reset()
+        self._progress = progress
+        self._cancel = cancel
+        
+        # Extrair informações básicas
+        self._extract_info(postman_data)
+        
+        # Processar items (endpoints)
+        if 'item' in postman_data:
+            if progress is not None:
+                self._total = self._count_requests(postman_data['item'])
+                progress(0, self._total, "")
+            self._process_items(postman_data['item'])
+        
+        # Adicionar servers descobertos
+        self._finalize_servers()
+        
+        return self.openapi_spec
+    
+    def trim_summary(self) -> str:
+        """Resumo do que foi cortado dos exemplos na última conversão ("" se nada)"""
+        if not self.trim_report:
+            return ""
+        original = sum(entry["original_bytes"] for entry in self.trim_report)
+        final = sum(entry["final_bytes"] for entry in self.trim_report)
+        lines = [f"✂️ {len(self.trim_report)} exemplos reduzidos ({original / 1024:.1f} KB → {final / 1024:.1f} KB)"]
+        for entry in self.trim_report:
+            cuts = ", ".join(f"{TRIM_LABELS[kind]}: {count}" for kind, count in entry["trimmed"].items() if count)
+            lines.append(f"   {entry['location']}: {entry['original_bytes'] / 1024:.1f} KB → "
+                         f"{entry['final_bytes'] / 1024:.1f} KB ({cuts})")
+        return "\n".join(lines)
+    
     def _extract_info(self, postman_data: Dict[str, Any]):
         """Extrai informações básicas da collection"""
         info = postman_data.get('info', {})
@@ -91,17 +284,35 @@ class PostmanToOpenAPIConverter:
                 version_str = f"{version.get('major', 1)}.{version.get('minor', 0)}.{version.get('patch', 0)}"
                 self.openapi_spec['info']['version'] = version_str
     
-    def _process_items(self, items: List[Dict[str, Any]], base_path: str = ""):
+    def _count_requests(self, items: List[Dict[str, Any]]) -> int:
+        """Total de requests da collection (para o progresso)"""
+        total = 0
+        pending = [items]
+        while pending:
+            for item in pending.pop():
+                if 'item' in item:
+                    pending.append(item['item'])
+                elif 'request' in item:
+                    total += 1
+        return total
+    
+    def _process_items(self, items: List[Dict[str, Any]], base_path: str = "", folder: str = ""):
         """Processa items da collection (pode ser recursivo para folders)"""
         for item in items:
+            if self._cancel is not None and self._cancel.is_set():
+                raise ConversionCancelled()
+            
             if 'item' in item:
                 # É uma pasta, processar recursivamente
                 folder_name = item.get('name', 'folder')
                 new_base_path = f"{base_path}/{self._sanitize_path(folder_name)}"
-                self._process_items(item['item'], new_base_path)
+                self._process_items(item['item'], new_base_path, folder_name)
             elif 'request' in item:
                 # É um endpoint
                 self._process_request(item, base_path)
+                self._processed += 1
+                if self._progress is not None:
+                    self._progress(self._processed, self._total, folder)
     
     def _process_request(self, item: Dict[str, Any], base_path: str):
         """Processa um request individual"""
@@ -129,6 +340,8 @@ class PostmanToOpenAPIConverter:
         if url_info['base_url']:
             self.servers_set.add(url_info['base_url'])
         
+        self._location = f"{method.upper()} {path}"
+        
         # Criar path no OpenAPI
         if path not in self.openapi_spec['paths']:
             self.openapi_spec['paths'][path] = {}
@@ -270,7 +483,7 @@ class PostmanToOpenAPIConverter:
                     "content": {
                         content_type: {
                             "schema": {"type": "object"},
-                            "example": self._parse_example_body(raw_data, content_type)
+                            "example": self._parse_example_body(raw_data, content_type, "requestBody")
                         }
                     }
                 }
@@ -307,15 +520,31 @@ class PostmanToOpenAPIConverter:
         except Exception as e:
             print(f"Erro ao processar body: {e}")
     
-    def _parse_example_body(self, raw_data: str, content_type: str) -> Any:
-        """Tenta fazer parse do exemplo de body"""
+    def _parse_example_body(self, raw_data: str, content_type: str, where: str = "") -> Any:
+        """Tenta fazer parse do exemplo de body (reduzido aos limites configurados)"""
         try:
             if content_type == "application/json" and raw_data.strip():
-                return json.loads(raw_data)
+                return self._limit_example(json.loads(raw_data), where)
             else:
-                return raw_data
+                return self._limit_example(raw_data, where)
         except json.JSONDecodeError:
-            return raw_data
+            return self._limit_example(raw_data, where)
+    
+    def _limit_example(self, example: Any, where: str) -> Any:
+        """Aplica os limites ao exemplo e registra no trim_report o que foi cortado"""
+        if isinstance(example, str):
+            result, counts = self._trimmer.trim_text(example)
+        else:
+            result, counts = self._trimmer.trim(example)
+        
+        if any(counts.values()):
+            self.trim_report.append({
+                "location": f"{self._location} → {where}" if where else self._location,
+                "original_bytes": _json_size(example),
+                "final_bytes": _json_size(result),
+                "trimmed": counts,
+            })
+        return result
     
     def _process_responses(self, responses: List[Dict[str, Any]], operation: Dict[str, Any]):
         """Processa responses de exemplo"""
@@ -349,11 +578,11 @@ class PostmanToOpenAPIConverter:
                 if body:
                     try:
                         example = json.loads(body)
-                        response_obj['content']['application/json']['example'] = example
+                        response_obj['content']['application/json']['example'] = self._limit_example(example, str(code))
                     except json.JSONDecodeError:
                         response_obj['content']['text/plain'] = {
                             "schema": {"type": "string"},
-                            "example": body
+                            "example": self._limit_example(body, str(code))
                         }
                 
                 operation['responses'][str(code)] = response_obj
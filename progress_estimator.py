@@ -0,0 +1,272 @@
+"""
+Progresso ponderado e ETA dos lotes
+Cada arquivo recebe, antes do lote, um custo estimado (bytes, número de
+operações e conversão de Postman) ou, quando existe, a duração da última
+execução no histórico. Os tempos medidos durante o lote recalibram as
+estimativas dos arquivos restantes; o ETA considera os arquivos processados
+em paralelo e a vazão recente
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from archive_io import ArchiveError, ArchiveSet, is_member_path
+from memory_diagnostics import format_size
+from ref_resolver import SCAN_CHUNK_SIZE, SCAN_OVERLAP
+
+
+# Modelo de custo (unidades ≈ bytes de spec): inicialização do Node, bytes e operações
+FIXED_COST = 1_000_000
+OPERATION_COST = 20_000
+POSTMAN_FACTOR = 1.5
+# Operações presumidas pelo tamanho quando o arquivo não é varrido (membros de pacotes)
+BYTES_PER_OPERATION = 2_000
+# Vazão inicial (unidades de custo por segundo) quando nenhum arquivo tem histórico
+DEFAULT_RATE = 1_000_000
+# Peso das medições anteriores a cada recalibração (as recentes pesam mais)
+DECAY = 0.8
+# Um arquivo em andamento nunca conta como concluído pela estimativa
+IN_FLIGHT_CAP = 0.95
+# Janela (segundos) da vazão atual
+THROUGHPUT_WINDOW = 30.0
+
+HTTP_METHODS = rb'(?:get|put|post|delete|options|head|patch|trace)'
+# Operações de OpenAPI em JSON ("get": {) e YAML (linha "  get:")
+OPERATION_PATTERN = re.compile(rb'"' + HTTP_METHODS + rb'"\s*:|^[ \t]+' + HTTP_METHODS + rb':[ \t]*\r?$', re.M)
+POSTMAN_REQUEST_PATTERN = re.compile(rb'"method"\s*:')
+POSTMAN_MARKER_PATTERN = re.compile(rb'schema\.getpostman\.com|"_postman_id"')
+
+
+class FileCost:
+    """Custo estimado de um arquivo do lote"""
+
+    __slots__ = ('path', 'size', 'operations', 'postman', 'history')
+
+    def __init__(self, path: str, size: int, operations: int, postman: bool, history: Optional[float] = None):
+        self.path = path
+        self.size = size
+        self.operations = operations
+        self.postman = postman
+        # Duração da última execução bem-sucedida (segundos), se houver
+        self.history = history
+
+    @property
+    def units(self) -> float:
+        cost = FIXED_COST + self.size + self.operations * OPERATION_COST
+        return cost * POSTMAN_FACTOR if self.postman else cost
+
+
+def scan_operations(file_path: str) -> Tuple[int, bool]:
+    """Varredura rápida (sem parse): (número de operações, é Postman Collection)"""
+    operations = requests = 0
+    postman = False
+    try:
+        with open(file_path, 'rb') as f:
+            tail = b''
+            while True:
+                chunk = f.read(SCAN_CHUNK_SIZE)
+                buffer = tail + chunk
+                # Ocorrências na sobreposição ficam para o próximo bloco (contadas uma vez)
+                limit = max(0, len(buffer) - SCAN_OVERLAP) if chunk else len(buffer)
+                operations += sum(1 for match in OPERATION_PATTERN.finditer(buffer) if match.start() < limit)
+                requests += sum(1 for match in POSTMAN_REQUEST_PATTERN.finditer(buffer) if match.start() < limit)
+                postman = postman or POSTMAN_MARKER_PATTERN.search(buffer) is not None
+                if not chunk:
+                    break
+                tail = buffer[limit:]
+    except OSError:
+        pass
+    return (requests if postman else operations), postman
+
+
+def estimate_cost(path: str, archives: ArchiveSet, history: Optional[float] = None) -> FileCost:
+    """Custo de um arquivo; membros de pacotes usam só o tamanho (não são lidos)"""
+    if is_member_path(path):
+        try:
+            size = archives.size(path)
+        except ArchiveError:
+            size = 0
+        return FileCost(path, size, size // BYTES_PER_OPERATION, 'postman' in Path(path).name.lower(), history)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    operations, postman = scan_operations(path)
+    return FileCost(path, size, operations, postman, history)
+
+
+def estimate_costs(paths: Iterable[str], history: Any = None, options: Optional[Dict[str, Any]] = None,
+                   archives: Optional[ArchiveSet] = None) -> Dict[str, FileCost]:
+    """Custos do lote; history (RunHistory) fornece as durações anteriores"""
+    paths = list(paths)
+    durations: Dict[str, float] = {}
+    if history is not None:
+        try:
+            durations = history.last_durations(paths, options)
+        except sqlite3.Error:
+            pass
+    own_archives = archives is None
+    archives = archives or ArchiveSet()
+    try:
+        return {path: estimate_cost(path, archives, durations.get(path)) for path in paths}
+    finally:
+        if own_archives:
+            archives.close()
+
+
+def historical_rate(costs: Iterable[FileCost]) -> float:
+    """Vazão (unidades de custo por segundo) dos arquivos com histórico"""
+    units = seconds = 0.0
+    for cost in costs:
+        if cost.history:
+            units += cost.units
+            seconds += cost.history
+    return units / seconds if seconds > 0 else DEFAULT_RATE
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+class ProgressSnapshot:
+    """Leitura do progresso em um instante"""
+
+    __slots__ = ('fraction', 'done', 'total', 'eta', 'elapsed', 'bytes_per_second', 'files_per_minute')
+
+    def __init__(self, fraction: float, done: int, total: int, eta: Optional[float], elapsed: float,
+                 bytes_per_second: float, files_per_minute: float):
+        self.fraction = fraction
+        self.done = done
+        self.total = total
+        self.eta = eta
+        self.elapsed = elapsed
+        self.bytes_per_second = bytes_per_second
+        self.files_per_minute = files_per_minute
+
+    def describe(self) -> str:
+        text = f"{self.fraction:.0%} · {self.done}/{self.total} arquivos"
+        if self.done >= self.total:
+            return f"{text} em {format_duration(self.elapsed)}"
+        if self.done:
+            text += (f" · {format_size(int(self.bytes_per_second))}/s "
+                     f"({self.files_per_minute:.1f} arq/min)")
+        return f"{text} · restam ~{format_duration(self.eta)}"
+
+
+class ProgressEstimator:
+    """
+    Progresso de um lote ponderado pelo custo de cada arquivo (thread-safe).
+
+    As chaves identificam os arquivos (o caminho no lote da GUI, a saída no
+    manifesto, em que uma entrada pode gerar vários alvos). start() e
+    finish() são chamados pelos threads de trabalho; snapshot() a qualquer
+    momento. Arquivos com histórico e sem histórico são recalibrados
+    separadamente: a duração registrada não inclui conversão e validação.
+    """
+
+    def __init__(self, costs: Dict[str, FileCost], workers: int = 1):
+        self.costs = costs
+        self.workers = max(1, workers)
+        self.rate = historical_rate(costs.values())
+        self._started: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+        # [medido, estimado] acumulados (com decaimento) por origem da estimativa
+        self._calibration: Dict[bool, list] = {True: [0.0, 0.0], False: [0.0, 0.0]}
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self._bytes_done = 0
+        self._fraction = 0.0
+        self._begin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self, key: str):
+        with self._lock:
+            self._started[key] = time.perf_counter()
+
+    def finish(self, key: str, duration: Optional[float] = None, measured: bool = True):
+        """
+        Conclui um arquivo; measured=False (falhas) não recalibra as
+        estimativas, pois um arquivo rejeitado cedo não representa a vazão
+        """
+        now = time.perf_counter()
+        with self._lock:
+            started = self._started.pop(key, now)
+            duration = duration if duration is not None else now - started
+            self._finished[key] = duration
+            cost = self.costs.get(key)
+            if cost is None:
+                return
+            self._bytes_done += cost.size
+            self._recent.append((now, cost.size))
+            if measured:
+                calibration = self._calibration[cost.history is not None]
+                calibration[0] = calibration[0] * DECAY + duration
+                calibration[1] = calibration[1] * DECAY + self._base_seconds(cost)
+
+    def snapshot(self) -> ProgressSnapshot:
+        now = time.perf_counter()
+        with self._lock:
+            done_work = sum(self._finished.values())
+            total_work = done_work
+            remaining = []
+            for key, cost in self.costs.items():
+                if key in self._finished:
+                    continue
+                expected = self._expected(cost)
+                if key in self._started:
+                    elapsed = now - self._started[key]
+                    expected = max(expected, elapsed / IN_FLIGHT_CAP)
+                    done_work += elapsed
+                    remaining.append(expected - elapsed)
+                else:
+                    remaining.append(expected)
+                total_work += expected
+
+            if remaining:
+                # Os restantes se dividem entre os workers, mas nenhum termina antes do mais longo
+                parallel = min(self.workers, len(remaining))
+                eta: Optional[float] = max(sum(remaining) / parallel, max(remaining))
+            else:
+                eta = 0.0
+            fraction = done_work / total_work if total_work > 0 else 1.0
+            # A recalibração pode reduzir a fração; a barra não volta
+            self._fraction = max(self._fraction, min(fraction, 1.0) if remaining else 1.0)
+
+            elapsed = now - self._begin
+            while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            window = min(elapsed, THROUGHPUT_WINDOW)
+            if elapsed < THROUGHPUT_WINDOW:
+                bytes_per_second = self._bytes_done / elapsed if elapsed > 0 else 0.0
+                files = len(self._finished)
+            else:
+                bytes_per_second = sum(size for _, size in self._recent) / window
+                files = len(self._recent)
+            files_per_minute = files * 60 / window if window > 0 else 0.0
+            return ProgressSnapshot(self._fraction, len(self._finished), len(self.costs), eta,
+                                    elapsed, bytes_per_second, files_per_minute)
+
+    def _base_seconds(self, cost: FileCost) -> float:
+        return cost.history if cost.history is not None else cost.units / self.rate
+
+    def _scale(self, from_history: bool) -> float:
+        """Razão medida/estimada; sem medições da mesma origem, usa a da outra"""
+        for calibration in (self._calibration[from_history], self._calibration[not from_history]):
+            if calibration[1] > 0:
+                return calibration[0] / calibration[1]
+        return 1.0
+
+    def _expected(self, cost: FileCost) -> float:
+        return self._base_seconds(cost) * self._scale(cost.history is not None)
@@ -0,0 +1,367 @@
+"""
+Manifesto de projeto com build incremental (estilo make)
+Lista globs de specs, regras de saída e opções por grupo; só reconstrói os
+alvos cujas entradas ($refs externos, templates, environment) mudaram
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openapi_validator import ValidationCache, validate_document, validate_file
+from incremental_render import incremental_enabled, render_incremental
+from ref_resolver import RefResolver, collect_external_files, file_digest, load_document, referenced_files
+from render_pipeline import RenderProcess, build_command, find_widdershins, prepare_spec, run_widdershins
+from compile_cache import enable_compile_cache
+from run_history import RunHistory
+from gzip_sidecar import SidecarWriter
+from metrics_export import RunMetrics, exported_run
+from post_render import post_process
+from progress_estimator import ProgressEstimator, estimate_costs, format_duration
+
+
+STATE_FILE_NAME = ".widdershins_build.json"
+DEFAULT_OUTPUT_DIR = "docs"
+DEFAULT_OUTPUT_PATTERN = "{stem}_docs.md"
+PATH_OPTIONS = ("user_templates", "environment_file")
+
+
+class ManifestError(Exception):
+    """Manifesto inválido"""
+
+
+class BuildTarget:
+    """Um spec e o arquivo de documentação gerado a partir dele"""
+
+    def __init__(self, input_file: str, output_file: str, options: Dict[str, Any], group: str):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.options = options
+        self.group = group
+
+    def dependencies(self, references: Callable[[str], List[str]] = referenced_files) -> List[str]:
+        """Spec, arquivos de $ref externos, templates e environment"""
+        deps = [self.input_file] + collect_external_files(self.input_file, references)
+
+        templates_dir = self.options.get("user_templates")
+        if templates_dir and os.path.isdir(templates_dir):
+            for root, _, files in os.walk(templates_dir):
+                deps.extend(os.path.join(root, name) for name in sorted(files))
+
+        env_file = self.options.get("environment_file")
+        if env_file:
+            deps.append(env_file)
+
+        return deps
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Any]:
+    """Carrega e valida o manifesto (JSON, ou YAML com PyYAML)"""
+    manifest = load_document(manifest_path)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("groups"), list):
+        raise ManifestError("O manifesto deve conter uma lista 'groups'")
+
+    for index, group in enumerate(manifest["groups"]):
+        if not isinstance(group, dict) or not group.get("specs"):
+            raise ManifestError(f"Grupo {index} sem 'specs'")
+    return manifest
+
+
+def expand_targets(manifest: Dict[str, Any], base_dir: Path, ignore: Tuple[str, ...] = ()) -> List[BuildTarget]:
+    """Expande os globs de cada grupo em alvos de build (o manifesto e o estado nunca são alvos)"""
+    ignored = {str(Path(path).resolve()) for path in ignore}
+    ignored.add(str((base_dir / STATE_FILE_NAME).resolve()))
+    defaults = manifest.get("defaults", {})
+    targets: List[BuildTarget] = []
+    outputs: Dict[str, str] = {}
+
+    for index, group in enumerate(manifest["groups"]):
+        name = group.get("name", f"grupo{index + 1}")
+        options = dict(defaults.get("options", {}))
+        options.update(group.get("options", {}))
+        for key in PATH_OPTIONS:
+            if options.get(key):
+                options[key] = str((base_dir / options[key]).resolve())
+
+        output_dir = base_dir / group.get("output_dir", defaults.get("output_dir", DEFAULT_OUTPUT_DIR))
+        pattern = group.get("output", defaults.get("output", DEFAULT_OUTPUT_PATTERN))
+        excludes = _as_list(group.get("exclude", [])) + _as_list(defaults.get("exclude", []))
+
+        for spec_glob in _as_list(group["specs"]):
+            for spec_path in sorted(base_dir.glob(spec_glob)):
+                if not spec_path.is_file() or str(spec_path.resolve()) in ignored:
+                    continue
+                relative = spec_path.relative_to(base_dir).as_posix()
+                if any(fnmatch.fnmatch(relative, pattern_) for pattern_ in excludes):
+                    continue
+
+                output_name = pattern.format(
+                    stem=spec_path.stem,
+                    group=name,
+                    dir=str(Path(relative).parent).replace('\\', '/')
+                )
+                output_file = str((output_dir / output_name).resolve())
+                if output_file in outputs:
+                    if outputs[output_file] == str(spec_path):
+                        continue  # Mesmo spec casado por dois globs
+                    raise ManifestError(f"Saída duplicada: {output_file} ({outputs[output_file]} e {spec_path})")
+                outputs[output_file] = str(spec_path)
+                targets.append(BuildTarget(str(spec_path.resolve()), output_file, options, name))
+
+    return targets
+
+
+class BuildState:
+    """Estado persistido entre builds: assinatura das entradas de cada saída"""
+
+    def __init__(self, state_path: Path):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.targets: Dict[str, Dict[str, Any]] = data.get("targets", {})
+        self.files: Dict[str, List[Any]] = data.get("files", {})
+        # $refs externos diretos de cada arquivo: [mtime_ns, tamanho, arquivos]
+        self.references: Dict[str, List[Any]] = data.get("references", {})
+
+    def digest(self, file_path: str) -> str:
+        """Hash do arquivo; só relê o conteúdo quando mtime/tamanho mudaram"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return "missing"
+
+        with self._lock:
+            cached = self.files.get(file_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = file_digest(file_path)
+        with self._lock:
+            self.files[file_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def referenced_files(self, file_path: str) -> List[str]:
+        """$refs externos diretos; só relê e varre o arquivo quando mtime/tamanho mudaram"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return []
+
+        with self._lock:
+            cached = self.references.get(file_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        found = referenced_files(file_path)
+        with self._lock:
+            self.references[file_path] = [stat.st_mtime_ns, stat.st_size, found]
+        return found
+
+    def signature(self, target: BuildTarget) -> str:
+        """Assinatura das opções e de todas as dependências do alvo"""
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(target.options, sort_keys=True).encode('utf-8'))
+        for dep in target.dependencies(self.referenced_files):
+            hasher.update(dep.encode('utf-8'))
+            hasher.update(self.digest(dep).encode('ascii'))
+        return hasher.hexdigest()
+
+    def is_up_to_date(self, target: BuildTarget, signature: str) -> bool:
+        entry = self.targets.get(target.output_file)
+        return bool(entry) and entry.get("signature") == signature and os.path.exists(target.output_file)
+
+    def record(self, target: BuildTarget, signature: str):
+        with self._lock:
+            self.targets[target.output_file] = {"input": target.input_file, "signature": signature}
+
+    def save(self):
+        with self._lock:
+            data = {"targets": self.targets, "files": self.files, "references": self.references}
+        temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(temp_path, self.state_path)
+
+
+class ManifestBuilder:
+    """Executa o build de um manifesto, em paralelo e de forma incremental"""
+
+    def __init__(self, manifest_path: str, jobs: Optional[int] = None, force: bool = False,
+                 log: Callable[[str], None] = print, widdershins_path: Optional[str] = None,
+                 history: Optional[RunHistory] = None, metrics_file: Optional[str] = None,
+                 on_progress: Optional[Callable[[ProgressEstimator], None]] = None):
+        self.manifest_path = Path(manifest_path).resolve()
+        self.base_dir = self.manifest_path.parent
+        self.manifest = load_manifest(str(self.manifest_path))
+        self.jobs = jobs or self.manifest.get("jobs") or min(4, os.cpu_count() or 1)
+        self.force = force
+        self.log = log
+        self.widdershins_path = widdershins_path or find_widdershins()
+        self.state = BuildState(self.base_dir / STATE_FILE_NAME)
+        self.resolver = RefResolver()
+        self.validation_cache = ValidationCache()
+        self.history = history
+        self.sidecars = SidecarWriter()
+        # Arquivo .prom para o textfile collector (argumento ou chave "metrics_file" do manifesto)
+        metrics_file = metrics_file or self.manifest.get("metrics_file")
+        self.metrics_file = str(self.base_dir / metrics_file) if metrics_file else None
+        # Recebe o estimador do build (barra da GUI); sem ele, o progresso vai para o log
+        self.on_progress = on_progress
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """Reconstrói os alvos desatualizados; retorna os totais"""
+        targets = expand_targets(self.manifest, self.base_dir, ignore=(str(self.manifest_path),))
+        summary = {"total": len(targets), "built": 0, "unchanged": 0, "up_to_date": 0, "failed": 0}
+        self.log(f"📋 Manifesto: {len(targets)} alvos, {self.jobs} em paralelo\n")
+
+        stale: List[Tuple[BuildTarget, str]] = []
+        for target in targets:
+            signature = self.state.signature(target)
+            if not self.force and self.state.is_up_to_date(target, signature):
+                summary["up_to_date"] += 1
+            else:
+                stale.append((target, signature))
+
+        self.log(f"  {summary['up_to_date']} atualizados, {len(stale)} para reconstruir\n")
+        if dry_run:
+            for target, _ in stale:
+                self.log(f"  → {Path(target.input_file).name} → {target.output_file}\n")
+            return summary
+
+        self.sidecars.begin()
+        # Uma entrada pode gerar vários alvos: o progresso é acompanhado pela saída
+        costs = estimate_costs({target.input_file for target, _ in stale}, self.history)
+        progress = ProgressEstimator({target.output_file: costs[target.input_file] for target, _ in stale},
+                                     workers=self.jobs)
+        if stale:
+            self.log(f"  ⏱️ Tempo estimado: ~{format_duration(progress.snapshot().eta)}\n")
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+        with exported_run(self.metrics_file, "manifest", queued=len(stale), log=self.log) as metrics:
+            metrics.inc("files_processed_total", summary["up_to_date"])
+            metrics.inc("cache_hits_total", summary["up_to_date"])
+            try:
+                with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                    futures = {executor.submit(self._build_target, target, metrics, progress): (target, signature)
+                               for target, signature in stale}
+                    for future in as_completed(futures):
+                        target, signature = futures[future]
+                        result = future.result()
+                        metrics.inc("files_processed_total")
+                        if result is not None:
+                            self.state.record(target, signature)
+                            summary["built"] += 1
+                            summary["unchanged"] += int(result.output_changed is False)
+                            metrics.inc("cache_hits_total", int(result.output_changed is False))
+                        else:
+                            summary["failed"] += 1
+                            metrics.inc("failures_total")
+                        if self.on_progress is None:
+                            self.log(f"  ⏱️ {progress.snapshot().describe()}\n")
+            finally:
+                self.state.save()
+                sidecars = self.sidecars.wait()
+                self.sidecars.shutdown()
+
+        if sidecars["written"] or sidecars["errors"]:
+            self.log(f"  🗜️ Sidecars .gz: {sidecars['written']} gravados, {len(sidecars['errors'])} falhas\n")
+
+        self.log(f"\n{'-'*30}\n")
+        self.log(f"Reconstruídos: {summary['built']} (inalterados: {summary['unchanged']}) | "
+                 f"Atualizados: {summary['up_to_date']} | Erros: {summary['failed']}\n")
+        return summary
+
+    def _build_target(self, target: BuildTarget, metrics: RunMetrics,
+                      progress: ProgressEstimator) -> Optional[RenderProcess]:
+        """Renderiza um alvo (roda em um thread do pool); None em caso de falha"""
+        progress.start(target.output_file)
+        result = None
+        try:
+            with metrics.active():
+                result = self._render_target(target, metrics)
+        finally:
+            # Falhas não recalibram as estimativas
+            progress.finish(target.output_file, measured=result is not None)
+        return result
+
+    def _render_target(self, target: BuildTarget, metrics: RunMetrics) -> Optional[RenderProcess]:
+        name = Path(target.input_file).name
+        try:
+            with metrics.timed("conversion_seconds"):
+                spec, _ = prepare_spec(target.input_file, target.options, self.resolver)
+            if spec is not None:
+                validation = validate_document(spec, target.input_file)
+            else:
+                validation = validate_file(target.input_file, self.validation_cache)
+            if not validation.is_valid:
+                self.log(f"  ❌ [{target.group}] {name}: spec inválido ({validation.errors[0]})\n")
+                return None
+
+            Path(target.output_file).parent.mkdir(parents=True, exist_ok=True)
+            command = build_command(self.widdershins_path, target.input_file, target.output_file, target.options)
+            with metrics.timed("render_seconds"):
+                if incremental_enabled(target.options):
+                    result = render_incremental(command, spec, target.input_file)
+                else:
+                    result = run_widdershins(command, spec)
+            if self.history is not None:
+                self.history.record_run("manifest", target.input_file, target.output_file, target.options,
+                                        self.widdershins_path, result)
+            if result.returncode != 0:
+                self.log(f"  ❌ [{target.group}] {name}: {result.stderr.strip()}\n")
+                return None
+
+            post_process(target.output_file, result.output_changed, target.options, target.input_file, spec,
+                         sidecars=self.sidecars)
+            unchanged = " (inalterado)" if result.output_changed is False else ""
+            self.log(f"  ✅ [{target.group}] {name} → {Path(target.output_file).name}{unchanged}\n")
+            return result
+
+        except Exception as e:
+            self.log(f"  ❌ [{target.group}] {name}: {e}\n")
+            return None
+
+
+def _as_list(value: Any) -> List[str]:
+    return [value] if isinstance(value, str) else list(value or [])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build incremental de documentação a partir de um manifesto")
+    parser.add_argument("manifest", help="Arquivo de manifesto (JSON/YAML)")
+    parser.add_argument("-j", "--jobs", type=int, help="Alvos renderizados em paralelo")
+    parser.add_argument("--force", action="store_true", help="Reconstruir todos os alvos")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas listar o que seria reconstruído")
+    parser.add_argument("--no-history", action="store_true", help="Não registrar as execuções no histórico")
+    parser.add_argument("--metrics-file", help="Arquivo .prom (formato texto do Prometheus) atualizado durante o build")
+    args = parser.parse_args(argv)
+
+    enable_compile_cache()
+    try:
+        history = None if args.no_history else RunHistory()
+        builder = ManifestBuilder(args.manifest, jobs=args.jobs, force=args.force,
+                                  log=lambda message: print(message, end=''), history=history,
+                                  metrics_file=args.metrics_file)
+        summary = builder.run(dry_run=args.dry_run)
+    except (ManifestError, OSError, ValueError, sqlite3.Error) as e:
+        print(f"Erro no manifesto: {e}")
+        return 2
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+"""
+Resolução de $refs em Python (bundle / dereference) antes do Widdershins
+Evita que o Node releia e resolva os mesmos arquivos externos a cada spec
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import unquote
+
+try:
+    import yaml
+except ImportError:  # PyYAML é opcional: sem ele apenas documentos JSON são resolvidos
+    yaml = None
+
+
+# Detecta "$ref": "<algo que não começa com #>" em JSON ou YAML
+EXTERNAL_REF_PATTERN = re.compile(rb'''["']?\$ref["']?\s*:\s*["']?(?!#)([^"'\s,}\]]+)''')
+SCAN_CHUNK_SIZE = 1024 * 1024
+SCAN_OVERLAP = 512
+
+
+class RefResolutionError(Exception):
+    """Erro ao carregar ou resolver uma referência"""
+
+
+class YAMLUnavailableError(RefResolutionError):
+    """Documento YAML sem PyYAML instalado"""
+
+
+def file_digest(file_path: str) -> str:
+    """Calcula o SHA-256 do conteúdo de um arquivo (leitura em blocos)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(SCAN_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_document(text: str, name: str = "") -> Any:
+    """Faz o parse de um documento JSON ou YAML"""
+    if name.lower().endswith('.json'):
+        return json.loads(text)
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    if yaml is None:
+        raise YAMLUnavailableError(f"PyYAML não instalado, não é possível ler {name or 'documento YAML'}")
+
+    try:
+        return yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise RefResolutionError(f"YAML inválido em {name}: {e}")
+
+
+def load_document(file_path: str) -> Any:
+    """Carrega um documento JSON/YAML do disco"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return parse_document(f.read(), str(file_path))
+
+
+def has_external_refs(file_path: str) -> bool:
+    """Varredura rápida (sem parse) em busca de $refs para outros arquivos"""
+    try:
+        with open(file_path, 'rb') as f:
+            tail = b''
+            while True:
+                chunk = f.read(SCAN_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                if EXTERNAL_REF_PATTERN.search(tail + chunk):
+                    return True
+                tail = chunk[-SCAN_OVERLAP:]
+    except OSError:
+        return False
+
+
+def spec_has_external_refs(node: Any) -> bool:
+    """Se um documento já carregado ainda tem $refs para fora dele (ex.: http(s) deixados pelo RefResolver)"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get('$ref')
+            if isinstance(ref, str) and not ref.startswith('#'):
+                return True
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return False
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """Separa uma referência em (arquivo, fragmento)"""
+    file_part, _, fragment = ref.partition('#')
+    return file_part, '#' + fragment
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """Resolve um JSON Pointer ('#/a/b/0') dentro de um documento"""
+    node = document
+    path = pointer.lstrip('#')
+    if not path or path == '/':
+        return node
+
+    for raw_part in path.lstrip('/').split('/'):
+        part = unquote(raw_part).replace('~1', '/').replace('~0', '~')
+        if isinstance(node, list):
+            try:
+                node = node[int(part)]
+            except (ValueError, IndexError):
+                raise RefResolutionError(f"Ponteiro inválido: {pointer}")
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            raise RefResolutionError(f"Ponteiro não encontrado: {pointer}")
+
+    return node
+
+
+class _ResolveContext:
+    """Estado de uma resolução (um documento raiz)"""
+
+    def __init__(self, root_path: str, root_digest: str, dereference: bool, root_schemas: Dict[str, Any]):
+        self.root_path = root_path
+        self.root_digest = root_digest
+        self.dereference = dereference
+        self.hoist_names: Dict[Tuple[str, str], str] = {}
+        self.hoisted: Dict[str, Any] = {}
+        self.used_names = set(root_schemas)
+
+
+class RefResolver:
+    """
+    Resolve $refs de specs OpenAPI com cache compartilhado.
+
+    - Documentos são memorizados pelo hash do conteúdo, então arquivos de
+      componentes comuns a vários specs de um lote são lidos uma única vez.
+    - Subárvores já resolvidas também são memorizadas e compartilhadas entre
+      os resultados; quem precisar alterar o resultado deve copiá-lo antes.
+    - Ciclos são detectados e o alvo é movido para components/schemas,
+      mantendo uma referência interna válida no documento final.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: Dict[str, Tuple[float, int, str]] = {}
+        self._documents: Dict[str, Any] = {}
+        self._resolved: Dict[Tuple[str, str, bool, bool], Any] = {}
+        self.stats = {"documents_loaded": 0, "cache_hits": 0, "cache_misses": 0}
+
+    def resolve(self, file_path: str, dereference: bool = False) -> Dict[str, Any]:
+        """
+        Retorna o spec pronto para o Widdershins.
+
+        bundle (padrão): referências externas são incorporadas e as internas
+        do documento raiz são mantidas. dereference: todas são incorporadas.
+        """
+        root_path = str(Path(file_path).resolve())
+        root_digest = self._digest(root_path)
+        root = self._document(root_path, root_digest)
+        if not isinstance(root, dict):
+            raise RefResolutionError(f"Documento raiz inválido: {file_path}")
+
+        root_schemas = root.get('components', {}).get('schemas', {}) if isinstance(root.get('components'), dict) else {}
+        ctx = _ResolveContext(root_path, root_digest, dereference, root_schemas or {})
+        result, _ = self._walk(root, root_path, root_digest, ctx, ())
+
+        if ctx.hoisted:
+            result = dict(result)
+            components = dict(result.get('components') or {})
+            schemas = dict(components.get('schemas') or {})
+            schemas.update(ctx.hoisted)
+            components['schemas'] = schemas
+            result['components'] = components
+
+        return result
+
+    def clear(self):
+        """Descarta todos os caches"""
+        with self._lock:
+            self._digests.clear()
+            self._documents.clear()
+            self._resolved.clear()
+
+    # --- Cache de documentos ---
+
+    def _digest(self, file_path: str) -> str:
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            raise RefResolutionError(f"Arquivo referenciado não encontrado: {file_path} ({e})")
+
+        with self._lock:
+            cached = self._digests.get(file_path)
+            if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+                return cached[2]
+
+        digest = file_digest(file_path)
+        with self._lock:
+            self._digests[file_path] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+    def _document(self, file_path: str, digest: str) -> Any:
+        with self._lock:
+            if digest in self._documents:
+                return self._documents[digest]
+
+        try:
+            document = load_document(file_path)
+        except (OSError, ValueError) as e:
+            raise RefResolutionError(f"Erro ao ler {file_path}: {e}")
+
+        with self._lock:
+            self._documents[digest] = document
+            self.stats["documents_loaded"] += 1
+        return document
+
+    # --- Percurso ---
+
+    def _walk(self, node: Any, base_path: str, digest: str, ctx: _ResolveContext,
+              stack: Tuple[Tuple[str, str], ...]) -> Tuple[Any, bool]:
+        """Percorre a árvore; retorna (valor, depende_do_contexto)"""
+        if isinstance(node, list):
+            items = []
+            contextual = False
+            for item in node:
+                value, item_contextual = self._walk(item, base_path, digest, ctx, stack)
+                items.append(value)
+                contextual = contextual or item_contextual
+            return items, contextual
+
+        if not isinstance(node, dict):
+            return node, False
+
+        ref = node.get('$ref')
+        if isinstance(ref, str):
+            return self._resolve_ref(node, ref, base_path, digest, ctx, stack)
+
+        result = {}
+        contextual = False
+        for key, value in node.items():
+            result[key], value_contextual = self._walk(value, base_path, digest, ctx, stack)
+            contextual = contextual or value_contextual
+        return result, contextual
+
+    def _resolve_ref(self, node: Dict[str, Any], ref: str, base_path: str, digest: str,
+                     ctx: _ResolveContext, stack: Tuple[Tuple[str, str], ...]) -> Tuple[Any, bool]:
+        file_part, pointer = split_ref(ref)
+        in_root = digest == ctx.root_digest and base_path == ctx.root_path
+
+        if file_part.startswith(('http://', 'https://')):
+            # Referências remotas ficam para o Widdershins
+            return dict(node), False
+
+        if not file_part:
+            if in_root and not ctx.dereference:
+                return dict(node), False
+            target_path, target_digest = base_path, digest
+        else:
+            target_path = str((Path(base_path).parent / unquote(file_part)).resolve())
+            target_digest = self._digest(target_path)
+
+        key = (target_digest, pointer)
+        if key in stack:
+            return self._cycle_ref(key, target_path, pointer, ctx), True
+
+        target_is_root = target_digest == ctx.root_digest and target_path == ctx.root_path
+        memo_key = (target_digest, pointer, ctx.dereference, target_is_root)
+        with self._lock:
+            memo = self._resolved.get(memo_key)
+        if memo is not None:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return self._with_siblings(memo, node, base_path, digest, ctx, stack)
+
+        with self._lock:
+            self.stats["cache_misses"] += 1
+
+        document = self._document(target_path, target_digest)
+        target = resolve_pointer(document, pointer)
+        value, contextual = self._walk(target, target_path, target_digest, ctx, stack + (key,))
+
+        if key in ctx.hoist_names:
+            # Este alvo participa de um ciclo: a definição vai para components
+            name = ctx.hoist_names[key]
+            ctx.hoisted[name] = value
+            value, contextual = {"$ref": f"#/components/schemas/{name}"}, True
+
+        if not contextual:
+            with self._lock:
+                self._resolved[memo_key] = value
+
+        result, siblings_contextual = self._with_siblings(value, node, base_path, digest, ctx, stack)
+        return result, contextual or siblings_contextual
+
+    def _with_siblings(self, value: Any, node: Dict[str, Any], base_path: str, digest: str,
+                       ctx: _ResolveContext, stack: Tuple[Tuple[str, str], ...]) -> Tuple[Any, bool]:
+        """Mantém chaves irmãs do $ref (ex.: description) sobre o valor resolvido"""
+        if len(node) == 1 or not isinstance(value, dict):
+            return value, False
+
+        merged = dict(value)
+        contextual = False
+        for key, sibling in node.items():
+            if key != '$ref':
+                merged[key], sibling_contextual = self._walk(sibling, base_path, digest, ctx, stack)
+                contextual = contextual or sibling_contextual
+        return merged, contextual
+
+    def _cycle_ref(self, key: Tuple[str, str], target_path: str, pointer: str, ctx: _ResolveContext) -> Dict[str, str]:
+        """Gera a referência interna usada para quebrar um ciclo"""
+        if key[0] == ctx.root_digest and target_path == ctx.root_path:
+            # Ciclo dentro do próprio documento raiz: a referência original é válida
+            return {"$ref": pointer}
+
+        if key not in ctx.hoist_names:
+            base_name = pointer.rstrip('/').split('/')[-1] if pointer not in ('#', '#/') else Path(target_path).stem
+            base_name = re.sub(r'[^\w.\-]', '_', unquote(base_name)) or "Schema"
+            name = base_name
+            suffix = 2
+            while name in ctx.used_names:
+                name = f"{base_name}_{suffix}"
+                suffix += 1
+            ctx.used_names.add(name)
+            ctx.hoist_names[key] = name
+
+        return {"$ref": f"#/components/schemas/{ctx.hoist_names[key]}"}
+
+
+def referenced_files(file_path: str) -> List[str]:
+    """Arquivos externos referenciados diretamente por um spec (sem recursão)"""
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return []
+
+    base_dir = Path(file_path).parent
+    found: List[str] = []
+    for match in EXTERNAL_REF_PATTERN.finditer(content):
+        file_part = match.group(1).decode('utf-8', errors='replace').partition('#')[0]
+        if not file_part or file_part.startswith(('http://', 'https://')):
+            continue
+        target = str((base_dir / unquote(file_part)).resolve())
+        if target not in found:
+            found.append(target)
+    return found
+
+
+def collect_external_files(file_path: str,
+                           references: Callable[[str], List[str]] = referenced_files) -> List[str]:
+    """
+    Lista (recursivamente) os arquivos externos referenciados por um spec.
+    references lista as referências diretas de um arquivo (pode vir de cache).
+    """
+    seen = {str(Path(file_path).resolve())}
+    found: List[str] = []
+
+    def visit(path: str):
+        for target in references(path):
+            if target in seen:
+                continue
+            seen.add(target)
+            found.append(target)
+            visit(target)
+
+    visit(file_path)
+    return found
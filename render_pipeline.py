@@ -0,0 +1,536 @@
+"""
+Pipeline de renderização independente da GUI
+Monta o comando do Widdershins a partir de um dicionário de opções (as mesmas
+chaves do config.json), prepara o spec em memória e executa o processo.
+Specs convertidos/resolvidos não são gravados ao lado do arquivo original:
+no Linux vão para um arquivo anônimo (memfd), nos demais sistemas para um
+temporário do sistema removido automaticamente
+"""
+
+import json
+import logging
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from postman_converter import ExampleLimits, PostmanToOpenAPIConverter
+from ref_resolver import (
+    RefResolutionError, RefResolver, file_digest, has_external_refs, load_document, spec_has_external_refs
+)
+from spec_filter import apply_filters, filters_enabled
+
+
+MEMFD_NAME = "widdershins-spec"
+BASE_DIR = Path(__file__).parent
+DEFAULT_TIMEOUT = 120
+
+logger = logging.getLogger(__name__)
+
+BOOLEAN_FLAGS = [
+    ("opt_code", "--code"),
+    ("opt_summary", "--summary"),
+    ("opt_omit_header", "--omitHeader"),
+    ("opt_raw", "--raw"),
+    ("opt_resolve", "--resolve"),
+]
+
+LANGUAGE_TABS = [
+    ("lang_curl", "'shell:cURL'"),
+    ("lang_javascript", "'javascript:Node.js'"),
+    ("lang_python", "'python:Python'"),
+    ("lang_java", "'java:Java'"),
+    ("lang_go", "'go:Go'"),
+    ("lang_php", "'php:PHP'"),
+    ("lang_ruby", "'ruby:Ruby'"),
+    ("lang_csharp", "'csharp:C#'"),
+]
+
+# Lista de flags extras permitidas (whitelist)
+ALLOWED_FLAGS = {
+    '--maxHeadingDepth', '--shallow', '--verbose', '--help',
+    '--version', '--theme', '--search', '--includes'
+}
+DANGEROUS_CHARS = {'&', '|', ';', '`', '$', '(', ')', '<', '>'}
+DANGEROUS_PATH_PARTS = {"..", "~", "$"}
+
+# Flags extras -> opções da API JavaScript do Widdershins
+JS_FLAG_OPTIONS = {
+    '--maxHeadingDepth': 'maxDepth',
+    '--shallow': 'shallowSchemas',
+    '--verbose': 'verbose',
+    '--theme': 'theme',
+    '--search': 'search',
+    '--includes': 'includes',
+}
+
+
+def find_widdershins(base_dir: Path = BASE_DIR) -> str:
+    """Widdershins local (node_modules) se disponível, senão o global"""
+    local_path = base_dir / "node_modules" / ".bin" / "widdershins"
+    if sys.platform == "win32":
+        local_path = local_path.with_suffix(".cmd")
+    return str(local_path) if local_path.exists() else "widdershins"
+
+
+def is_allowed_flag(flag: str) -> bool:
+    """Valida uma flag extra (ou o valor de uma flag)"""
+    if flag.startswith('--'):
+        return flag.split('=')[0] in ALLOWED_FLAGS
+    return not any(char in flag for char in DANGEROUS_CHARS)
+
+
+def is_safe_path(path_str: str, directory: bool = False) -> bool:
+    """Verifica se o caminho existe e não contém componentes perigosos"""
+    if not path_str or not path_str.strip():
+        return False
+    path = Path(path_str)
+    if not (path.is_dir() if directory else path.is_file()):
+        return False
+    return not (path.is_absolute() and any(part in DANGEROUS_PATH_PARTS for part in path.parts))
+
+
+def language_tabs(options: Dict[str, Any]) -> List[str]:
+    """Language tabs habilitadas nas opções"""
+    return [tab for key, tab in LANGUAGE_TABS if options.get(key)]
+
+
+def other_flags(options: Dict[str, Any]) -> List[str]:
+    """Flags adicionais permitidas; texto mal formado (aspas sem par) é ignorado com um aviso"""
+    text = str(options.get("other_flags") or "").strip()
+    if not text:
+        return []
+    try:
+        return [flag for flag in shlex.split(text) if is_allowed_flag(flag)]
+    except ValueError as e:
+        logger.warning(f"Erro ao processar flags adicionais: {e}")
+        return []
+
+
+def build_command(widdershins_path: str, input_file: str, output_file: Optional[str], options: Dict[str, Any]) -> List[str]:
+    """Monta a lista de argumentos do Widdershins de forma segura (sem shell).
+    Com output_file None o Markdown vai para o stdout."""
+    if not input_file or (output_file is not None and not output_file):
+        raise ValueError("Arquivos de entrada e saída são obrigatórios")
+
+    command = [widdershins_path, input_file]
+    if output_file is not None:
+        command.extend(['-o', output_file])
+
+    for key, flag in BOOLEAN_FLAGS:
+        if options.get(key):
+            command.append(flag)
+
+    templates_path = str(options.get("user_templates") or "").strip()
+    if templates_path and is_safe_path(templates_path, directory=True):
+        command.extend(['--user_templates', templates_path])
+
+    env_file = str(options.get("environment_file") or "").strip()
+    if env_file and is_safe_path(env_file):
+        command.extend(['--environment', env_file])
+
+    tabs = language_tabs(options)
+    if tabs:
+        command.append('--language_tabs')
+        command.extend(tabs)
+
+    command.extend(other_flags(options))
+
+    return command
+
+
+def widdershins_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Opções da API JavaScript (converter.convert) equivalentes ao comando de
+    build_command, com a mesma semântica da CLI do Widdershins
+    """
+    result: Dict[str, Any] = {
+        "codeSamples": not options.get("opt_code"),
+        "tocSummary": bool(options.get("opt_summary")),
+        "omitHeader": bool(options.get("opt_omit_header")),
+        "sample": not options.get("opt_raw"),
+        "resolve": bool(options.get("opt_resolve")),
+    }
+
+    tabs = []
+    for tab in language_tabs(options):
+        language, _, label = tab.strip("'").partition(':')
+        tabs.append({language: label})
+    if tabs:
+        result["language_tabs"] = tabs
+
+    templates_path = str(options.get("user_templates") or "").strip()
+    if templates_path and is_safe_path(templates_path, directory=True):
+        result["user_templates"] = templates_path
+
+    flags = other_flags(options)
+    if flags:
+        for index, flag in enumerate(flags):
+            name = JS_FLAG_OPTIONS.get(flag.split('=')[0])
+            if name is None:
+                continue
+            if '=' in flag:
+                value: Any = flag.split('=', 1)[1]
+            elif index + 1 < len(flags) and not flags[index + 1].startswith('--'):
+                value = flags[index + 1]
+            else:
+                value = True
+            if value in ("true", "false"):
+                value = value == "true"
+            elif name == "maxDepth":
+                value = int(value)
+            elif name == "includes" and isinstance(value, str):
+                value = value.split(',')
+            result[name] = value
+
+    # Como na CLI, o environment sobrescreve as demais opções
+    env_file = str(options.get("environment_file") or "").strip()
+    if env_file and is_safe_path(env_file):
+        environment = load_document(env_file)
+        if isinstance(environment, dict):
+            result.update(environment)
+
+    return result
+
+
+def prepare_spec(input_file: str, options: Dict[str, Any], resolver: Optional[RefResolver] = None,
+                 log: Optional[Callable[[str], None]] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Prepara o spec em memória e retorna (spec, nome_base_da_saída).
+
+    Collections do Postman são convertidas; com opt_resolve os $refs externos
+    são resolvidos em Python. Com filtros de subconjunto (spec_filter) o
+    documento é sempre carregado e filtrado. spec None significa usar o
+    arquivo como está.
+    """
+    log = log or (lambda message: None)
+    output_stem = Path(input_file).stem
+
+    converter = PostmanToOpenAPIConverter(ExampleLimits.from_options(options))
+    collection = converter.load_collection(input_file)
+    if collection is not None:
+        log("  📦 Convertendo Postman Collection...\n")
+        spec = converter.convert_data(collection)
+        log("  ✅ Conversão concluída\n")
+        if converter.trim_report:
+            log(f"  {converter.trim_summary()}\n")
+        return apply_filters(spec, options, log), output_stem + "_openapi"
+
+    if not filters_enabled(options):
+        return _resolved_spec(input_file, options, resolver, log), output_stem
+
+    # Em memória o spec perde a pasta de origem: $refs externos precisam ser
+    # resolvidos antes, sem recorrer ao arquivo (os filtros seriam ignorados)
+    dereference = bool(options.get("opt_resolve") and options.get("opt_dereference"))
+    if dereference or has_external_refs(input_file):
+        try:
+            spec = (resolver or RefResolver()).resolve(input_file, dereference=dereference)
+        except RefResolutionError as e:
+            raise RefResolutionError(f"Filtros exigem resolver os $refs externos de {Path(input_file).name}: {e}")
+        log(f"🔗 $refs resolvidos em Python: {Path(input_file).name}\n")
+    else:
+        spec = load_document(input_file)
+    return apply_filters(spec, options, log), output_stem
+
+
+def _resolved_spec(input_file: str, options: Dict[str, Any], resolver: Optional[RefResolver],
+                   log: Callable[[str], None]) -> Optional[Dict[str, Any]]:
+    """Spec com os $refs resolvidos em Python, ou None para deixar o Widdershins resolver"""
+    dereference = bool(options.get("opt_dereference"))
+    if resolver is None or not options.get("opt_resolve"):
+        return None
+    if not dereference and not has_external_refs(input_file):
+        return None
+
+    try:
+        spec = resolver.resolve(input_file, dereference=dereference)
+    except RefResolutionError as e:
+        log(f"⚠️ Resolução de $refs em Python falhou, usando --resolve do Widdershins: {e}\n")
+        return None
+
+    log(f"🔗 $refs resolvidos em Python: {Path(input_file).name}\n")
+    return spec
+
+
+class RenderProcess(subprocess.CompletedProcess):
+    """CompletedProcess com a duração e o pico de memória (KB) do Widdershins.
+    output_changed: se a saída (-o) foi substituída; None quando não houve publicação."""
+
+    def __init__(self, args, returncode: int, stdout: Optional[str], stderr: Optional[str],
+                 duration: float, peak_memory_kb: Optional[int] = None, output_changed: Optional[bool] = None):
+        super().__init__(args, returncode, stdout, stderr)
+        self.duration = duration
+        self.peak_memory_kb = peak_memory_kb
+        self.output_changed = output_changed
+
+
+def run_widdershins(command: List[str], spec: Optional[Dict[str, Any]] = None,
+                    timeout: int = DEFAULT_TIMEOUT) -> RenderProcess:
+    """
+    Executa o Widdershins, entregando o spec em memória quando houver.
+    A saída é gerada em um temporário irmão e só substitui o arquivo final
+    se o conteúdo mudou (ver staged_output).
+    """
+    with spec_source(spec, command[1]) as (source, pass_fds), staged_output(command) as (command, publish):
+        if spec is not None:
+            command = with_input(command, source, spec)
+
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            pass_fds=pass_fds,
+            startupinfo=hidden_startupinfo(),
+            shell=False
+        )
+
+        # Pipes lidos em threads para que o processo seja aguardado com wait4 (rusage)
+        output: Dict[str, str] = {}
+        readers = [
+            threading.Thread(target=lambda name=name, pipe=pipe: output.__setitem__(name, pipe.read()), daemon=True)
+            for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr))
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            peak_memory_kb = wait_with_usage(process, timeout)
+        finally:
+            for reader in readers:
+                reader.join()
+            process.stdout.close()
+            process.stderr.close()
+
+        result = RenderProcess(command, process.returncode, output.get("stdout", ""), output.get("stderr", ""),
+                               time.perf_counter() - started, peak_memory_kb)
+        if result.returncode == 0:
+            result.output_changed = publish()
+        return result
+
+
+@contextmanager
+def staged_output(command: List[str]) -> Iterator[Tuple[List[str], Callable[[], Optional[bool]]]]:
+    """
+    Redireciona o -o do comando para um temporário irmão da saída final.
+
+    Retorna (comando, publicar). publicar() compara o temporário com a saída
+    existente e só a substitui (rename atômico) se o conteúdo mudou; a saída
+    inalterada mantém o mtime original. O temporário não publicado é removido.
+    """
+    if '-o' not in command:
+        yield command, lambda: None
+        return
+
+    index = command.index('-o') + 1
+    output_file = command[index]
+    staged = staging_path(output_file)
+    try:
+        yield command[:index] + [staged] + command[index + 1:], lambda: publish_output(staged, output_file)
+    finally:
+        try:
+            os.remove(staged)
+        except OSError:
+            pass
+
+
+def staging_path(output_file: str) -> str:
+    """Temporário oculto na mesma pasta da saída (rename atômico no mesmo sistema de arquivos)"""
+    path = Path(output_file)
+    return str(path.with_name(f".{path.stem}.{uuid.uuid4().hex[:8]}{path.suffix}"))
+
+
+def publish_output(staged: str, output_file: str) -> Optional[bool]:
+    """Publica o temporário sobre a saída se o conteúdo mudou; retorna se mudou"""
+    if not os.path.exists(staged):
+        return None
+    if same_content(staged, output_file):
+        os.remove(staged)
+        return False
+
+    if os.path.exists(output_file):
+        shutil.copymode(output_file, staged)
+    os.replace(staged, output_file)
+    return True
+
+
+def write_if_changed(output_file: str, data: bytes) -> bool:
+    """Grava dados na saída pelo mesmo caminho do temporário irmão; retorna se mudou"""
+    staged = staging_path(output_file)
+    try:
+        with open(staged, 'wb') as f:
+            f.write(data)
+        return bool(publish_output(staged, output_file))
+    finally:
+        try:
+            os.remove(staged)
+        except OSError:
+            pass
+
+
+def same_content(path_a: str, path_b: str) -> bool:
+    """Compara por tamanho e, se igual, por hash"""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+    except OSError:
+        return False
+    return file_digest(path_a) == file_digest(path_b)
+
+
+def wait_with_usage(process: subprocess.Popen, timeout: Optional[float] = None) -> Optional[int]:
+    """
+    Aguarda o processo e retorna o pico de memória residente em KB.
+
+    Usa os.wait4 onde existe (POSIX); nos demais sistemas apenas aguarda e
+    retorna None. Em timeout o processo é encerrado e TimeoutExpired propagado.
+    """
+    if not hasattr(os, "wait4"):
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        return None
+
+    timed_out = threading.Event()
+    reaped_lock = threading.Lock()
+    reaped = False
+
+    def kill_on_timeout():
+        # os.kill direto: Popen.kill() faria poll() e colheria o processo antes do wait4
+        with reaped_lock:
+            if not reaped:
+                timed_out.set()
+                os.kill(process.pid, signal.SIGKILL)
+
+    timer = threading.Timer(timeout, kill_on_timeout) if timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+        with reaped_lock:
+            reaped = True
+    finally:
+        if timer:
+            timer.cancel()
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(process.args, timeout)
+
+    # ru_maxrss: KB no Linux, bytes no macOS
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+_version_cache: Dict[Tuple[str, float], str] = {}
+_version_lock = threading.Lock()
+
+
+def widdershins_version(widdershins_path: str) -> str:
+    """Versão do Widdershins (consultada uma vez por instalação)"""
+    resolved = shutil.which(widdershins_path) or widdershins_path
+    try:
+        key = (resolved, os.path.getmtime(resolved))
+    except OSError:
+        return "desconhecida"
+
+    with _version_lock:
+        if key in _version_cache:
+            return _version_cache[key]
+
+    try:
+        result = subprocess.run(
+            [widdershins_path, '--version'], capture_output=True, text=True,
+            timeout=30, startupinfo=hidden_startupinfo(), shell=False
+        )
+        version = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else "desconhecida"
+    except (OSError, subprocess.SubprocessError):
+        version = "desconhecida"
+
+    with _version_lock:
+        _version_cache[key] = version
+    return version
+
+
+def hidden_startupinfo():
+    """Oculta a janela do console no Windows"""
+    if sys.platform != "win32":
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return startupinfo
+
+
+def serialize_spec(spec: Dict[str, Any]) -> bytes:
+    """Serializa o spec em JSON compacto (o Widdershins aceita JSON e YAML)"""
+    return json.dumps(spec, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+@contextmanager
+def spec_source(spec: Optional[Dict[str, Any]], file_path: str) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+    """
+    Retorna (caminho_de_entrada, fds_para_herdar) para o subprocesso.
+
+    Sem spec em memória, o próprio arquivo é usado. Os fds devem ser passados
+    em pass_fds do subprocess para que o filho consiga abrir /dev/fd/N.
+    """
+    if spec is None:
+        yield file_path, ()
+        return
+
+    data = serialize_spec(spec)
+
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create(MEMFD_NAME)
+        try:
+            _write_all(fd, data)
+            os.lseek(fd, 0, os.SEEK_SET)
+            yield f"/dev/fd/{fd}", (fd,)
+        finally:
+            os.close(fd)
+        return
+
+    # Fallback (Windows/macOS): temporário na pasta do sistema, nunca ao lado do original
+    fd, temp_path = tempfile.mkstemp(prefix="widdershins_", suffix=".json")
+    try:
+        _write_all(fd, data)
+        os.close(fd)
+        fd = None
+        yield temp_path, ()
+    finally:
+        if fd is not None:
+            os.close(fd)
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def with_input(command: list, source: str, spec: Dict[str, Any]) -> list:
+    """Troca a entrada do comando ([widdershins, entrada, ...]) por um spec pronto.
+    --resolve só é removido se o spec não tem mais $refs externos: os http(s)
+    ficam para o Widdershins."""
+    keep_resolve = spec_has_external_refs(spec)
+    return [command[0], source] + [arg for arg in command[2:] if arg != '--resolve' or keep_resolve]
+
+
+def _write_all(fd: int, data: bytes):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
@@ -0,0 +1,535 @@
+"""
+Serviço local de renderização (HTTP, somente biblioteca padrão)
+Mantém um pool de workers Node "quentes" com o Widdershins já carregado,
+com fila de pedidos, limite de concorrência e endpoints de saúde/métricas.
+
+    POST /render   {"spec": <objeto ou texto JSON/YAML>, "options": {...}} -> Markdown
+    GET  /health   estado do serviço
+    GET  /metrics  contadores e latências
+
+As opções usam as mesmas chaves do config.json (ver render_pipeline).
+Opções com caminhos no servidor (templates e arquivo de ambiente) só são
+aceitas dentro dos diretórios liberados com --allow-dir; as demais são ignoradas.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from compile_cache import enable_compile_cache
+from post_render import post_process
+from postman_converter import ExampleLimits, PostmanToOpenAPIConverter
+from ref_resolver import RefResolutionError, RefResolver, load_document, parse_document
+from render_pipeline import (
+    BASE_DIR, DEFAULT_TIMEOUT, MEMFD_NAME, build_command, find_widdershins, hidden_startupinfo,
+    prepare_spec, run_widdershins, widdershins_options, write_if_changed
+)
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = os.environ.get("WIDDERSHINS_SERVICE_URL", f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+DRIVER_PATH = BASE_DIR / "render_worker.js"
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_QUEUE = 32
+# Tempo máximo esperando um worker livre antes de responder 503
+QUEUE_TIMEOUT = 30
+WORKER_START_TIMEOUT = 30
+# Workers são reciclados periodicamente para conter vazamentos de memória do Node
+WORKER_MAX_RENDERS = 200
+MAX_BODY_BYTES = 64 * 1024 * 1024
+LATENCY_WINDOW = 1000
+# Opções que apontam para arquivos do servidor (templates doT executam JS)
+PATH_OPTIONS = ("user_templates", "environment_file")
+
+logger = logging.getLogger(__name__)
+
+
+class RenderServiceError(Exception):
+    """Falha ao renderizar (status HTTP associado)"""
+
+    status = 500
+
+
+class InvalidRequestError(RenderServiceError):
+    status = 400
+
+
+class ServiceBusyError(RenderServiceError):
+    status = 503
+
+
+class RenderTimeoutError(RenderServiceError):
+    status = 504
+
+
+class NodeWorker:
+    """Processo Node persistente executando render_worker.js"""
+
+    def __init__(self, node: str = "node", driver: Path = DRIVER_PATH):
+        self.renders = 0
+        self._ids = itertools.count(1)
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._stderr: Deque[str] = deque(maxlen=20)
+        self.process = subprocess.Popen(
+            [node, str(driver)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            cwd=str(driver.parent),
+            startupinfo=hidden_startupinfo(),
+            shell=False
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+        ready = self._next_response(WORKER_START_TIMEOUT)
+        if not ready or not ready.get("ready"):
+            self.close()
+            raise RenderServiceError(f"Worker Node não iniciou: {self.last_error()}")
+
+    def render(self, spec: Any, options: Dict[str, Any], timeout: float) -> str:
+        request_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "spec": spec, "options": options}) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise RenderServiceError(f"Worker Node encerrado: {e}")
+
+        response = self._next_response(timeout)
+        self.renders += 1
+        if response is None:
+            raise RenderServiceError(f"Worker Node encerrado: {self.last_error()}")
+        if response.get("id") != request_id:
+            raise RenderServiceError("Resposta fora de ordem do worker Node")
+        if not response.get("ok"):
+            raise RenderServiceError(response.get("error") or "Erro desconhecido no Widdershins")
+        return response["markdown"]
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def last_error(self) -> str:
+        return " | ".join(self._stderr) or f"código {self.process.poll()}"
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+    def _next_response(self, timeout: float) -> Optional[dict]:
+        try:
+            return self._responses.get(timeout=timeout)
+        except queue.Empty:
+            self.process.kill()
+            self.process.wait()
+            raise RenderTimeoutError(f"Renderização excedeu {timeout:.0f}s")
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            try:
+                self._responses.put(json.loads(line))
+            except ValueError:
+                self._stderr.append(line.strip())
+        self._responses.put(None)
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            if line.strip():
+                self._stderr.append(line.strip())
+
+
+class ServiceMetrics:
+    """Contadores e latências recentes (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.worker_restarts = 0
+        self.in_flight = 0
+        self.queued = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, **counters: int):
+        with self._lock:
+            for name, delta in counters.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            data = {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "requests_total": self.requests,
+                "errors_total": self.errors,
+                "rejected_total": self.rejected,
+                "timeouts_total": self.timeouts,
+                "worker_restarts_total": self.worker_restarts,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+            }
+        for name, quantile in (("p50", 0.50), ("p95", 0.95), ("max", 1.0)):
+            value = latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] if latencies else 0.0
+            data[f"render_seconds_{name}"] = round(value, 3)
+        return data
+
+
+class RenderService:
+    """
+    Renderiza specs com concorrência limitada. Com Node e o Widdershins local
+    disponíveis usa o pool de workers quentes; senão executa a CLI por pedido.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+                 timeout: int = DEFAULT_TIMEOUT, node: str = "node", allowed_dirs: Iterable[str] = ()):
+        self.concurrency = max(1, workers)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.node = node
+        self.allowed_dirs = [os.path.realpath(directory) for directory in allowed_dirs]
+        self.metrics = ServiceMetrics()
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._idle: "queue.LifoQueue[NodeWorker]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.mode = "cli"
+
+        try:
+            for _ in range(self.concurrency):
+                self._idle.put(NodeWorker(node))
+            self.mode = "node"
+        except (OSError, RenderServiceError) as e:
+            logger.warning(f"Pool de workers Node indisponível, usando a CLI do Widdershins: {e}")
+            self._drain_idle()
+
+    def render(self, spec: Any, options: Dict[str, Any]) -> str:
+        """Renderiza um spec já carregado (OpenAPI ou Postman) em Markdown"""
+        with self._lock:
+            if self.metrics.queued >= self.max_queue:
+                self.metrics.add(rejected=1)
+                raise ServiceBusyError("Fila de renderização cheia")
+            self.metrics.add(queued=1)
+        try:
+            acquired = self._slots.acquire(timeout=QUEUE_TIMEOUT)
+        finally:
+            self.metrics.add(queued=-1)
+        if not acquired:
+            self.metrics.add(rejected=1)
+            raise ServiceBusyError("Nenhum worker livre")
+
+        self.metrics.add(requests=1, in_flight=1)
+        started = time.perf_counter()
+        try:
+            converter = PostmanToOpenAPIConverter(ExampleLimits.from_options(options))
+            if converter.is_postman_data(spec):
+                spec = converter.convert_data(spec)
+
+            if self.mode == "node":
+                markdown = self._render_with_worker(spec, options)
+            else:
+                markdown = self._render_with_cli(spec, options)
+            self.metrics.observe(time.perf_counter() - started)
+            return markdown
+        except RenderServiceError as e:
+            self.metrics.add(errors=1, timeouts=int(isinstance(e, RenderTimeoutError)))
+            raise
+        except Exception as e:
+            self.metrics.add(errors=1)
+            raise RenderServiceError(str(e))
+        finally:
+            self.metrics.add(in_flight=-1)
+            self._slots.release()
+
+    def request_options(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Opções de um pedido HTTP sem os caminhos fora dos diretórios liberados"""
+        options = dict(options)
+        for key in PATH_OPTIONS:
+            value = str(options.get(key) or "").strip()
+            if not value:
+                continue
+            path = os.path.realpath(value)
+            if any(os.path.commonpath([path, directory]) == directory for directory in self.allowed_dirs):
+                options[key] = path
+            else:
+                logger.warning(f"Opção {key} ignorada: {value} fora dos diretórios liberados (--allow-dir)")
+                del options[key]
+        return options
+
+    def _render_with_worker(self, spec: Any, options: Dict[str, Any]) -> str:
+        try:
+            js_options = widdershins_options(options)
+        except (ValueError, RefResolutionError) as e:
+            raise InvalidRequestError(f"Opções inválidas: {e}")
+
+        # Um slot adquirido garante um worker ocioso (ou a vaga de um que morreu)
+        try:
+            worker: Optional[NodeWorker] = self._idle.get_nowait()
+        except queue.Empty:
+            worker = None
+        try:
+            if worker is None or not worker.alive:
+                worker = self._replace(worker)
+            return worker.render(spec, js_options, self.timeout)
+        except RenderServiceError:
+            if worker is not None and not worker.alive:
+                worker = self._replace(worker)
+            raise
+        finally:
+            if worker is not None and worker.renders >= WORKER_MAX_RENDERS:
+                worker = self._replace(worker)
+            if worker is not None:
+                self._idle.put(worker)
+
+    def _replace(self, worker: Optional[NodeWorker]) -> Optional[NodeWorker]:
+        if worker is not None:
+            worker.close()
+        self.metrics.add(worker_restarts=1)
+        try:
+            return NodeWorker(self.node)
+        except (OSError, RenderServiceError) as e:
+            logger.error(f"Falha ao reiniciar worker Node: {e}")
+            return None
+
+    def _render_with_cli(self, spec: Any, options: Dict[str, Any]) -> str:
+        command = build_command(find_widdershins(), MEMFD_NAME, None, options)
+        try:
+            result = run_widdershins(command, spec, self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RenderTimeoutError(f"Renderização excedeu {self.timeout}s")
+        if result.returncode != 0:
+            raise RenderServiceError(result.stderr.strip() or f"Widdershins saiu com código {result.returncode}")
+        return result.stdout
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "mode": self.mode,
+            "workers": self.concurrency,
+            "idle_workers": self._idle.qsize() if self.mode == "node" else None,
+            "max_queue": self.max_queue,
+        }
+
+    def close(self):
+        self._drain_idle()
+
+    def _drain_idle(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Endpoints HTTP do serviço"""
+
+    server_version = "WiddershinsRender/1.0"
+
+    def do_GET(self):
+        service: RenderService = self.server.service
+        if self.path == "/health":
+            self._send_json(200, service.health())
+        elif self.path == "/metrics":
+            self._send_json(200, service.metrics.snapshot())
+        else:
+            self._send_json(404, {"error": "Endpoint não encontrado"})
+
+    def do_POST(self):
+        if self.path != "/render":
+            self._send_json(404, {"error": "Endpoint não encontrado"})
+            return
+
+        try:
+            spec, options = self._read_request()
+            markdown = self.server.service.render(spec, options)
+        except RenderServiceError as e:
+            headers = {"Retry-After": "1"} if isinstance(e, ServiceBusyError) else {}
+            self._send_json(e.status, {"error": str(e)}, headers)
+            return
+
+        body = markdown.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_request(self):
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise InvalidRequestError("Content-Length inválido")
+        if length <= 0 or length > MAX_BODY_BYTES:
+            raise InvalidRequestError("Corpo da requisição vazio ou grande demais")
+
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise InvalidRequestError(f"JSON inválido: {e}")
+        if not isinstance(payload, dict) or "spec" not in payload:
+            raise InvalidRequestError("Campo 'spec' ausente")
+
+        spec = payload["spec"]
+        if isinstance(spec, str):
+            try:
+                spec = parse_document(spec, "spec")
+            except (ValueError, RefResolutionError) as e:
+                raise InvalidRequestError(f"Spec inválido: {e}")
+        options = payload.get("options") or {}
+        if not isinstance(spec, dict) or not isinstance(options, dict):
+            raise InvalidRequestError("'spec' e 'options' devem ser objetos")
+        return spec, self.server.service.request_options(options)
+
+    def _send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: RenderService):
+        super().__init__(address, RenderRequestHandler)
+        self.service = service
+
+
+class RenderClient:
+    """Cliente do serviço local de renderização"""
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = DEFAULT_TIMEOUT + QUEUE_TIMEOUT):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        """Verifica rapidamente se o serviço está no ar"""
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=0.5) as response:
+                return response.status == 200
+        except (OSError, ValueError):
+            return False
+
+    def render(self, spec: Dict[str, Any], options: Dict[str, Any]) -> str:
+        data = json.dumps({"spec": spec, "options": options}).encode('utf-8')
+        request = urllib.request.Request(
+            f"{self.url}/render", data=data, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise RenderServiceError(f"HTTP {e.code}: {message}")
+
+
+def render_file(input_file: str, output_file: str, options: Dict[str, Any], url: str = DEFAULT_URL) -> str:
+    """Renderiza pelo serviço quando ele está no ar; senão localmente. Retorna o modo usado."""
+    spec, _ = prepare_spec(input_file, options, RefResolver())
+
+    # O serviço ignora caminhos locais (templates, ambiente); esses pedidos rodam aqui
+    client = RenderClient(url)
+    if not any(options.get(key) for key in PATH_OPTIONS) and client.is_available():
+        markdown = client.render(spec if spec is not None else load_document(input_file), options)
+        changed = write_if_changed(output_file, markdown.encode('utf-8'))
+        post_process(output_file, changed, options, input_file, spec)
+        return "serviço"
+
+    command = build_command(find_widdershins(), input_file, output_file, options)
+    result = run_widdershins(command, spec)
+    if result.returncode != 0:
+        raise RenderServiceError(result.stderr.strip() or f"Widdershins saiu com código {result.returncode}")
+    post_process(output_file, result.output_changed, options, input_file, spec)
+    return "local"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serviço local de renderização do Widdershins")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Inicia o serviço HTTP")
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Renderizações simultâneas")
+    serve.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="Pedidos aguardando na fila")
+    serve.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="Tempo máximo por renderização (s)")
+    serve.add_argument("--allow-dir", action="append", default=[], metavar="DIR",
+                       help="Diretório liberado para user_templates/environment_file (repetível)")
+
+    render = commands.add_parser("render", help="Renderiza um arquivo (usa o serviço se estiver no ar)")
+    render.add_argument("input", help="Spec OpenAPI ou Postman Collection")
+    render.add_argument("-o", "--output", required=True, help="Arquivo Markdown de saída")
+    render.add_argument("--config", help="config.json com as opções de geração")
+    render.add_argument("--url", default=DEFAULT_URL, help="Endereço do serviço")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    enable_compile_cache()
+
+    if args.command == "serve":
+        service = RenderService(args.workers, args.max_queue, args.timeout, allowed_dirs=args.allow_dir)
+        server = RenderServer((args.host, args.port), service)
+        logger.info(f"Serviço em http://{args.host}:{args.port} ({service.mode}, {service.concurrency} workers)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.close()
+        return 0
+
+    options: Dict[str, Any] = {}
+    try:
+        if args.config:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                options = json.load(f)
+        mode = render_file(args.input, args.output, options, args.url)
+    except (OSError, ValueError, RenderServiceError, RefResolutionError, subprocess.SubprocessError) as e:
+        print(f"Erro: {e}")
+        return 1
+
+    print(f"✅ {args.output} ({mode})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
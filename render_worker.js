@@ -0,0 +1,55 @@
+'use strict';
+// Worker persistente do serviço de renderização (render_service.py).
+// Lê um pedido JSON por linha no stdin ({id, spec, options}) e responde uma
+// linha JSON no stdout ({id, ok, markdown | error}). O Widdershins é carregado
+// uma única vez, evitando o custo de inicialização do Node a cada documento.
+
+const readline = require('readline');
+const util = require('util');
+
+// O stdout é o canal do protocolo: logs do Widdershins vão para o stderr
+const toStderr = (...args) => process.stderr.write(util.format(...args) + '\n');
+console.log = toStderr;
+console.info = toStderr;
+console.warn = toStderr;
+
+let converter;
+try {
+    converter = require('widdershins');
+} catch (err) {
+    toStderr('widdershins não encontrado:', err.message);
+    process.exit(3);
+}
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function handle(line) {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (err) {
+        reply({ id: null, ok: false, error: 'Pedido inválido: ' + err.message });
+        return;
+    }
+
+    try {
+        const markdown = await converter.convert(request.spec, request.options || {});
+        reply({ id: request.id, ok: true, markdown });
+    } catch (err) {
+        reply({ id: request.id, ok: false, error: String((err && err.message) || err) });
+    }
+}
+
+// Um pedido por vez: o pool em Python controla a concorrência
+let pending = Promise.resolve();
+const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+input.on('line', (line) => {
+    pending = pending.then(() => handle(line));
+});
+input.on('close', () => {
+    pending.then(() => process.exit(0));
+});
+
+reply({ ready: true });
@@ -0,0 +1,288 @@
+"""
+Histórico de execuções (SQLite) e detecção de regressões de desempenho
+Cada renderização registra hash da entrada, opções, versão do Widdershins,
+duração, pico de memória, tamanho da saída e status
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from archive_io import is_member_path, member_fingerprint
+from ref_resolver import file_digest
+from render_pipeline import RenderProcess, widdershins_version
+
+
+HISTORY_DB = Path(__file__).parent / "run_history.db"
+# Execuções anteriores (mesmo arquivo e opções) usadas como referência
+BASELINE_RUNS = 10
+MIN_BASELINE_RUNS = 3
+DURATION_THRESHOLD = 0.25
+SIZE_THRESHOLD = 0.10
+# Variações de duração abaixo disso são ruído (inicialização do Node)
+MIN_DURATION_DELTA = 0.3
+# Caminhos por consulta IN (...) (limite de parâmetros do SQLite)
+QUERY_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    options TEXT NOT NULL,
+    options_hash TEXT NOT NULL,
+    widdershins_version TEXT,
+    duration REAL NOT NULL,
+    peak_memory_kb INTEGER,
+    output_size INTEGER,
+    exit_status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_input ON runs (input_path, options_hash, started_at);
+"""
+
+
+class RunRecord:
+    """Uma execução do Widdershins"""
+
+    __slots__ = ('mode', 'input_path', 'input_hash', 'options', 'widdershins_version', 'duration',
+                 'peak_memory_kb', 'output_size', 'exit_status', 'started_at')
+
+    def __init__(self, mode: str, input_path: str, input_hash: str, options: Dict[str, Any],
+                 widdershins_version: str, duration: float, peak_memory_kb: Optional[int],
+                 output_size: Optional[int], exit_status: int, started_at: Optional[float] = None):
+        self.mode = mode
+        self.input_path = input_path
+        self.input_hash = input_hash
+        self.options = options
+        self.widdershins_version = widdershins_version
+        self.duration = duration
+        self.peak_memory_kb = peak_memory_kb
+        self.output_size = output_size
+        self.exit_status = exit_status
+        self.started_at = started_at if started_at is not None else time.time() - duration
+
+
+class Regression:
+    """Arquivo cuja última execução fugiu do próprio histórico"""
+
+    __slots__ = ('input_path', 'metric', 'baseline', 'current', 'widdershins_version', 'previous_version')
+
+    def __init__(self, input_path: str, metric: str, baseline: float, current: float,
+                 widdershins_version: str, previous_version: str):
+        self.input_path = input_path
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+        self.widdershins_version = widdershins_version
+        self.previous_version = previous_version
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+    def __str__(self) -> str:
+        if self.metric == 'duration':
+            values = f"{self.baseline:.2f}s → {self.current:.2f}s"
+        else:
+            values = f"{self.baseline:,.0f} → {self.current:,.0f} bytes"
+        version = ""
+        if self.widdershins_version != self.previous_version:
+            version = f" (widdershins {self.previous_version} → {self.widdershins_version})"
+        label = "tempo" if self.metric == 'duration' else "tamanho"
+        return f"{Path(self.input_path).name}: {label} {self.change:+.0%} ({values}){version}"
+
+
+def options_hash(options: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class RunHistory:
+    """Banco SQLite com o histórico de execuções (uma conexão, thread-safe)"""
+
+    def __init__(self, db_path: Path = HISTORY_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, record: RunRecord):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (started_at, mode, input_path, input_hash, options, options_hash,"
+                " widdershins_version, duration, peak_memory_kb, output_size, exit_status)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.started_at, record.mode, record.input_path, record.input_hash,
+                 json.dumps(record.options, sort_keys=True), options_hash(record.options),
+                 record.widdershins_version, record.duration, record.peak_memory_kb,
+                 record.output_size, record.exit_status)
+            )
+
+    def record_run(self, mode: str, input_file: str, output_file: str, options: Dict[str, Any],
+                   widdershins_path: str, result: RenderProcess) -> RunRecord:
+        """Registra uma execução a partir do resultado do Widdershins"""
+        output_size = None
+        if result.returncode == 0:
+            try:
+                output_size = os.path.getsize(output_file)
+            except OSError:
+                pass
+
+        record = RunRecord(
+            mode=mode,
+            input_path=str(Path(input_file).resolve()),
+            input_hash=member_fingerprint(input_file) if is_member_path(input_file) else file_digest(input_file),
+            options=options,
+            widdershins_version=widdershins_version(widdershins_path),
+            duration=result.duration,
+            peak_memory_kb=result.peak_memory_kb,
+            output_size=output_size,
+            exit_status=result.returncode
+        )
+        self.record(record)
+        return record
+
+    def runs(self, input_path: Optional[str] = None, limit: int = 50) -> List[sqlite3.Row]:
+        """Execuções mais recentes (de um arquivo ou de todos)"""
+        query = "SELECT * FROM runs"
+        params: tuple = ()
+        if input_path:
+            query += " WHERE input_path = ?"
+            params = (str(Path(input_path).resolve()),)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        with self._lock:
+            cursor = self._conn.execute(query, params + (limit,))
+            cursor.row_factory = sqlite3.Row
+            return cursor.fetchall()
+
+    def last_durations(self, input_files: Iterable[str], options: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """
+        Duração da última execução bem-sucedida de cada arquivo (chave: o
+        caminho como recebido). Com options, prefere execuções com as mesmas
+        opções; arquivos sem histórico ficam de fora.
+        """
+        wanted = {str(Path(input_file).resolve()): input_file for input_file in input_files}
+        wanted_hash = options_hash(options) if options is not None else None
+        paths = list(wanted)
+        rows = []
+        with self._lock:
+            for start in range(0, len(paths), QUERY_CHUNK_SIZE):
+                chunk = paths[start:start + QUERY_CHUNK_SIZE]
+                # Com MAX(), o SQLite devolve a duração da linha mais recente de cada grupo
+                rows.extend(self._conn.execute(
+                    "SELECT input_path, options_hash IS ? AS exact, duration, MAX(started_at) FROM runs"
+                    f" WHERE input_path IN ({', '.join('?' * len(chunk))}) AND exit_status = 0"
+                    " GROUP BY input_path, exact",
+                    [wanted_hash] + chunk
+                ).fetchall())
+
+        found: Dict[str, float] = {}
+        exact = set()
+        for input_path, is_exact, duration, _ in rows:
+            input_file = wanted[input_path]
+            if is_exact:
+                found[input_file] = duration
+                exact.add(input_file)
+            elif input_file not in exact:
+                found[input_file] = duration
+        return found
+
+    def regressions(self, duration_threshold: float = DURATION_THRESHOLD,
+                    size_threshold: float = SIZE_THRESHOLD) -> List[Regression]:
+        """
+        Compara a última execução bem-sucedida de cada arquivo com a mediana
+        das anteriores (mesmas opções). Sinaliza tempo acima do limite ou
+        tamanho de saída variando além do limite (para mais ou para menos).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT input_path, options_hash, duration, output_size, widdershins_version FROM runs"
+                " WHERE exit_status = 0 ORDER BY input_path, options_hash, started_at DESC"
+            ).fetchall()
+
+        series: Dict[tuple, List[tuple]] = {}
+        for input_path, opts_hash, duration, output_size, version in rows:
+            runs = series.setdefault((input_path, opts_hash), [])
+            if len(runs) <= BASELINE_RUNS:
+                runs.append((duration, output_size, version))
+
+        found: List[Regression] = []
+        for (input_path, _), runs in series.items():
+            (duration, output_size, version), previous = runs[0], runs[1:]
+            if len(previous) < MIN_BASELINE_RUNS:
+                continue
+            previous_version = previous[0][2]
+
+            baseline = statistics.median(run[0] for run in previous)
+            if duration - baseline > max(MIN_DURATION_DELTA, baseline * duration_threshold):
+                found.append(Regression(input_path, 'duration', baseline, duration, version, previous_version))
+
+            sizes = [run[1] for run in previous if run[1] is not None]
+            if output_size is not None and len(sizes) >= MIN_BASELINE_RUNS:
+                baseline = statistics.median(sizes)
+                if baseline and abs(output_size - baseline) / baseline > size_threshold:
+                    found.append(Regression(input_path, 'output_size', baseline, output_size, version, previous_version))
+
+        return found
+
+    def report(self, duration_threshold: float = DURATION_THRESHOLD, size_threshold: float = SIZE_THRESHOLD) -> str:
+        """Relatório texto: regressões e resumo das últimas execuções"""
+        lines = []
+        regressions = self.regressions(duration_threshold, size_threshold)
+        if regressions:
+            lines.append(f"⚠️ {len(regressions)} regressões em relação ao histórico:")
+            lines.extend(f"  - {regression}" for regression in regressions)
+        else:
+            lines.append("✅ Nenhuma regressão em relação ao histórico")
+
+        lines.append("")
+        lines.append("Últimas execuções:")
+        for row in self.runs(limit=20):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["started_at"]))
+            memory = f"{row['peak_memory_kb'] / 1024:.0f} MB" if row["peak_memory_kb"] else "-"
+            size = f"{row['output_size']:,} B" if row["output_size"] is not None else "-"
+            status = "✅" if row["exit_status"] == 0 else f"❌ ({row['exit_status']})"
+            lines.append(f"  {when} [{row['mode']}] {Path(row['input_path']).name}: "
+                         f"{row['duration']:.2f}s, {memory}, {size} {status}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Relatório do histórico de execuções do Widdershins")
+    parser.add_argument("--db", default=str(HISTORY_DB), help="Banco de histórico")
+    parser.add_argument("--duration-threshold", type=float, default=DURATION_THRESHOLD,
+                        help="Aumento relativo de tempo tolerado (padrão 0.25)")
+    parser.add_argument("--size-threshold", type=float, default=SIZE_THRESHOLD,
+                        help="Variação relativa de tamanho tolerada (padrão 0.10)")
+    parser.add_argument("--check", action="store_true", help="Código de saída 1 se houver regressões")
+    args = parser.parse_args(argv)
+
+    history = RunHistory(Path(args.db))
+    try:
+        if args.check:
+            regressions = history.regressions(args.duration_threshold, args.size_threshold)
+            for regression in regressions:
+                print(regression)
+            return 1 if regressions else 0
+        print(history.report(args.duration_threshold, args.size_threshold))
+        return 0
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
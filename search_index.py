@@ -0,0 +1,189 @@
+"""
+Índice de busca pré-construído
+Índice invertido (token -> operações) montado a partir do spec durante a
+renderização, com pesos por campo, gravado em JSON compacto e dividido em
+shards por prefixo para que o cliente carregue apenas os shards necessários
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from doc_splitter import MANIFEST_NAME, pages_dir
+from render_pipeline import write_if_changed
+
+
+INDEX_NAME = "index.json"
+DOCS_NAME = "docs.json"
+PREFIX_LENGTH = 2
+MIN_TOKEN_LENGTH = 2
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+
+# Peso de cada campo no score do token
+FIELD_WEIGHTS = {
+    "path": 5,
+    "operationId": 3,
+    "summary": 3,
+    "tags": 2,
+    "parameters": 2,
+    "description": 1,
+}
+
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9À-ɏ]+')
+CAMEL_PATTERN = re.compile(r'[A-Z]?[a-zß-ɏ]+|[A-Z]+(?![a-z])|\d+')
+
+
+def search_enabled(options: Dict[str, Any]) -> bool:
+    return bool(options.get("opt_search_index"))
+
+
+def index_dir(output_file: str) -> Path:
+    """Pasta do índice: <pasta da saída>/<nome da saída sem extensão>_search/"""
+    path = Path(output_file)
+    return path.with_name(f"{path.stem}_search")
+
+
+def needs_index(output_file: str, output_changed: Optional[bool]) -> bool:
+    """Só reconstrói se a saída mudou ou se o índice ainda não existe"""
+    if output_changed is None:
+        return False
+    return output_changed or not (index_dir(output_file) / INDEX_NAME).exists()
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens em minúsculas; identificadores camelCase/snake_case também geram as partes"""
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text or ""):
+        lowered = word.lower()
+        if len(lowered) >= MIN_TOKEN_LENGTH:
+            tokens.append(lowered)
+        parts = CAMEL_PATTERN.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts if len(part) >= MIN_TOKEN_LENGTH)
+    return tokens
+
+
+def operation_anchor(method: str, path: str, operation: Dict[str, Any]) -> str:
+    """Âncora da operação no Markdown do Widdershins (opId + operationId)"""
+    operation_id = operation.get("operationId")
+    if not operation_id:
+        operation_id = re.sub(r'[^A-Za-z0-9]', '_', f"{method}{path}")
+    return f"opId{operation_id}"
+
+
+def build_index(spec: Dict[str, Any], pages: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Monta {"docs": [...], "postings": {token: [[doc, score], ...]}} a partir do spec.
+    pages mapeia "METHOD /path" para a página da saída dividida, quando houver.
+    """
+    docs: List[Dict[str, Any]] = []
+    postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    paths = spec.get("paths") if isinstance(spec, dict) else None
+    for path, item in (paths or {}).items():
+        if not isinstance(item, dict) or str(path).startswith("x-"):
+            continue
+        shared_params = item.get("parameters") if isinstance(item.get("parameters"), list) else []
+
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+
+            doc_id = len(docs)
+            doc = {
+                "m": method.upper(),
+                "p": path,
+                "s": operation.get("summary") or "",
+                "a": operation_anchor(method, path, operation),
+            }
+            page = (pages or {}).get(f"{method.upper()} {path}")
+            if page:
+                doc["pg"] = page
+            docs.append(doc)
+
+            params = shared_params + (operation.get("parameters") if isinstance(operation.get("parameters"), list) else [])
+            fields = {
+                "path": path,
+                "operationId": operation.get("operationId") or "",
+                "summary": operation.get("summary") or "",
+                "tags": " ".join(str(tag) for tag in operation.get("tags") or []),
+                "parameters": " ".join(str(p.get("name", "")) for p in params if isinstance(p, dict)),
+                "description": operation.get("description") or "",
+            }
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in set(tokenize(str(text))):
+                    postings[token][doc_id] = postings[token].get(doc_id, 0) + weight
+
+    return {
+        "docs": docs,
+        "postings": {
+            token: sorted(([doc, score] for doc, score in entries.items()), key=lambda entry: -entry[1])
+            for token, entries in postings.items()
+        },
+    }
+
+
+def shard_key(token: str) -> str:
+    return token[:PREFIX_LENGTH]
+
+
+def write_index(output_file: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Grava o índice em index_dir(output_file): index.json (metadados e lista de
+    shards), docs.json e um <prefixo>.json por prefixo de token. Shards iguais
+    não são regravados; shards que deixaram de existir são removidos.
+    """
+    target_dir = index_dir(output_file)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    index = build_index(spec, _split_pages(output_file))
+    shards: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    for token, entries in index["postings"].items():
+        shards[shard_key(token)][token] = entries
+
+    previous = _read_json(target_dir / INDEX_NAME).get("shards", [])
+    changed = 0
+    for key, tokens in shards.items():
+        changed += write_if_changed(str(target_dir / f"{key}.json"), _compact(tokens))
+    for stale in set(previous) - set(shards):
+        try:
+            os.remove(target_dir / f"{Path(stale).name}.json")
+        except OSError:
+            pass
+
+    changed += write_if_changed(str(target_dir / DOCS_NAME), _compact(index["docs"]))
+    changed += write_if_changed(str(target_dir / INDEX_NAME), _compact({
+        "version": 1,
+        "source": Path(output_file).name,
+        "prefix_length": PREFIX_LENGTH,
+        "weights": FIELD_WEIGHTS,
+        "docs": DOCS_NAME,
+        "shards": sorted(shards),
+    }))
+
+    return {"directory": str(target_dir), "docs": len(index["docs"]), "tokens": len(index["postings"]),
+            "shards": len(shards), "changed": changed}
+
+
+def _split_pages(output_file: str) -> Dict[str, str]:
+    """Página de cada operação, se a saída também foi dividida em páginas"""
+    manifest = _read_json(pages_dir(output_file) / MANIFEST_NAME)
+    return {f"{op['method']} {op['path']}": op["page"] for op in manifest.get("operations", [])}
+
+
+def _compact(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
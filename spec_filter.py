@@ -0,0 +1,305 @@
+"""
+Renderização de um subconjunto do spec
+Filtros de inclusão/exclusão (tags, globs de path, métodos, deprecated)
+aplicados ao documento antes do Widdershins, seguidos de uma passada de
+alcançabilidade que descarta components não usados e, opcionalmente, remove
+as extensões x-, para que o Node processe apenas o necessário
+"""
+
+import re
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+
+# Seções com componentes referenciáveis (OpenAPI 3 em components/, Swagger 2 na raiz)
+COMPONENT_SECTIONS_V2 = ('definitions', 'parameters', 'responses')
+
+# Extensões lidas pelo próprio Widdershins, mantidas mesmo com opt_strip_extensions
+KEPT_EXTENSIONS = {'x-code-samples', 'x-codeSamples', 'x-tagGroups', 'x-traitTag', 'x-widdershins-oldRef'}
+
+# Chaves cujo valor é um mapa de nomes definidos pelo usuário (ou de paths e
+# códigos), não de campos do spec: as chaves são mantidas mesmo começando com x-
+NAME_MAP_KEYS = {
+    'properties', 'patternProperties', 'dependentSchemas', 'definitions', '$defs',
+    'paths', 'webhooks', 'responses', 'parameters', 'headers', 'content', 'encoding',
+    'callbacks', 'links', 'examples', 'scopes', 'variables', 'mapping', 'securityDefinitions',
+}
+# Objetos cujas seções são todas mapas de nomes (components.schemas, components.headers...)
+SECTION_MAP_KEYS = {'components'}
+# Chaves com dados de exemplo, copiadas sem alteração
+DATA_KEYS = {'example', 'examples', 'default', 'enum', 'const', 'value'}
+
+# Tags podem conter espaços: itens separados por vírgula ou ponto e vírgula
+LIST_SEPARATOR = re.compile(r'\s*[,;]\s*')
+
+
+class SpecFilter:
+    """Critérios de seleção de operações (listas vazias não restringem)"""
+
+    def __init__(self, include_tags: List[str] = (), exclude_tags: List[str] = (),
+                 include_paths: List[str] = (), exclude_paths: List[str] = (),
+                 methods: List[str] = (), exclude_deprecated: bool = False):
+        self.include_tags = {tag.casefold() for tag in include_tags}
+        self.exclude_tags = {tag.casefold() for tag in exclude_tags}
+        self.include_paths = list(include_paths)
+        self.exclude_paths = list(exclude_paths)
+        self.methods = {method.lower() for method in methods}
+        self.exclude_deprecated = exclude_deprecated
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any]) -> Optional["SpecFilter"]:
+        """Filtro configurado nas opções (mesmas chaves do config.json), ou None"""
+        spec_filter = cls(
+            include_tags=_option_list(options.get("filter_include_tags")),
+            exclude_tags=_option_list(options.get("filter_exclude_tags")),
+            include_paths=_option_list(options.get("filter_include_paths")),
+            exclude_paths=_option_list(options.get("filter_exclude_paths")),
+            methods=_option_list(options.get("filter_methods")),
+            exclude_deprecated=bool(options.get("opt_exclude_deprecated")),
+        )
+        return spec_filter if spec_filter.is_active() else None
+
+    def is_active(self) -> bool:
+        return bool(self.include_tags or self.exclude_tags or self.include_paths
+                    or self.exclude_paths or self.methods or self.exclude_deprecated)
+
+    def accepts(self, path: str, method: str, operation: Dict[str, Any]) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        if self.exclude_deprecated and operation.get("deprecated"):
+            return False
+        if self.include_paths and not any(fnmatchcase(path, pattern) for pattern in self.include_paths):
+            return False
+        if any(fnmatchcase(path, pattern) for pattern in self.exclude_paths):
+            return False
+
+        tags = {str(tag).casefold() for tag in operation.get("tags") or []}
+        if self.include_tags and not tags & self.include_tags:
+            return False
+        return not tags & self.exclude_tags
+
+
+def filters_enabled(options: Dict[str, Any]) -> bool:
+    """Se o spec precisa ser carregado em memória para filtrar/limpar"""
+    return SpecFilter.from_options(options) is not None or bool(options.get("opt_strip_extensions"))
+
+
+def filter_spec(spec: Dict[str, Any], spec_filter: Optional[SpecFilter] = None,
+                strip_extensions: bool = False) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Retorna (spec filtrado, estatísticas). O documento de entrada não é
+    alterado (pode vir do cache do RefResolver): só os contêineres modificados
+    são copiados, o restante é compartilhado.
+    """
+    stats = {"operations": 0, "kept": 0, "components": 0, "pruned": 0}
+    result = dict(spec)
+
+    if spec_filter is not None:
+        result["paths"] = _filter_paths(spec.get("paths"), spec_filter, stats)
+        _prune_components(result, stats)
+        _prune_tags(result)
+    else:
+        stats["operations"] = stats["kept"] = _count_operations(spec.get("paths"))
+
+    if strip_extensions:
+        result = _strip_extensions(result)
+
+    return result, stats
+
+
+def apply_filters(spec: Dict[str, Any], options: Dict[str, Any],
+                  log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Aplica os filtros configurados nas opções e registra o resumo no log"""
+    log = log or (lambda message: None)
+    spec_filter = SpecFilter.from_options(options)
+    strip = bool(options.get("opt_strip_extensions"))
+    if spec_filter is None and not strip:
+        return spec
+
+    result, stats = filter_spec(spec, spec_filter, strip)
+    if spec_filter is not None:
+        log(f"🔍 Filtro: {stats['kept']} de {stats['operations']} operações, "
+            f"{stats['pruned']} de {stats['components']} componentes removidos\n")
+        if not stats["kept"]:
+            log("⚠️ Nenhuma operação corresponde aos filtros\n")
+    return result
+
+
+# --- Filtragem das operações ---
+
+def _filter_paths(paths: Any, spec_filter: SpecFilter, stats: Dict[str, int]) -> Dict[str, Any]:
+    filtered: Dict[str, Any] = {}
+    for path, item in (paths or {}).items():
+        if not isinstance(item, dict):
+            continue
+        if str(path).startswith("x-"):
+            filtered[path] = item
+            continue
+
+        kept_item = {key: value for key, value in item.items() if key not in HTTP_METHODS}
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if not isinstance(operation, dict):
+                continue
+            stats["operations"] += 1
+            if spec_filter.accepts(str(path), method, operation):
+                kept_item[method] = operation
+                stats["kept"] += 1
+
+        # Paths sem nenhuma operação restante saem do documento
+        if any(method in kept_item for method in HTTP_METHODS):
+            filtered[path] = kept_item
+    return filtered
+
+
+def _count_operations(paths: Any) -> int:
+    return sum(
+        1 for item in (paths or {}).values() if isinstance(item, dict)
+        for method in HTTP_METHODS if isinstance(item.get(method), dict)
+    )
+
+
+# --- Alcançabilidade dos components ---
+
+def _component_sections(spec: Dict[str, Any]) -> Iterator[Tuple[Tuple[str, ...], Dict[str, Any]]]:
+    """(prefixo do ponteiro, seção) de cada seção de componentes do documento"""
+    components = spec.get("components")
+    if isinstance(components, dict):
+        for kind, section in components.items():
+            if isinstance(section, dict) and kind != "securitySchemes":
+                yield ("components", kind), section
+    for kind in COMPONENT_SECTIONS_V2:
+        if isinstance(spec.get(kind), dict):
+            yield (kind,), spec[kind]
+
+
+def _pointer_parts(ref: str) -> Tuple[str, ...]:
+    return tuple(unquote(part).replace('~1', '/').replace('~0', '~')
+                 for part in ref[2:].split('/'))
+
+
+def _local_refs(node: Any) -> Iterator[Tuple[str, ...]]:
+    """Ponteiros internos (#/...) referenciados dentro de node"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/"):
+                yield _pointer_parts(ref)
+            # discriminator.mapping também referencia schemas por ponteiro
+            discriminator = current.get("discriminator")
+            if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+                for target in discriminator["mapping"].values():
+                    if isinstance(target, str) and target.startswith("#/"):
+                        yield _pointer_parts(target)
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _security_names(spec: Dict[str, Any]) -> Set[str]:
+    """Esquemas de segurança citados pela raiz ou pelas operações restantes"""
+    requirements = list(spec.get("security") or [])
+    for item in (spec.get("paths") or {}).values():
+        if isinstance(item, dict):
+            for method in HTTP_METHODS:
+                if isinstance(item.get(method), dict):
+                    requirements.extend(item[method].get("security") or [])
+    return {name for requirement in requirements if isinstance(requirement, dict) for name in requirement}
+
+
+def _prune_components(spec: Dict[str, Any], stats: Dict[str, int]):
+    """Mantém só os componentes alcançáveis a partir do restante do documento"""
+    sections = {prefix: section for prefix, section in _component_sections(spec)}
+    stats["components"] = sum(len(section) for section in sections.values())
+
+    roots = {key: value for key, value in spec.items() if key not in ("components",) + COMPONENT_SECTIONS_V2}
+    reachable: Set[Tuple[str, ...]] = set()
+    pending = list(_local_refs(roots))
+    while pending:
+        parts = pending.pop()
+        for prefix, section in sections.items():
+            size = len(prefix)
+            if parts[:size] == prefix and len(parts) > size and parts[size] in section:
+                key = prefix + (parts[size],)
+                if key not in reachable:
+                    reachable.add(key)
+                    pending.extend(_local_refs(section[parts[size]]))
+                break
+
+    pruned = {
+        prefix: {name: value for name, value in section.items() if prefix + (name,) in reachable}
+        for prefix, section in sections.items()
+    }
+    stats["pruned"] = stats["components"] - sum(len(section) for section in pruned.values())
+
+    security = _security_names(spec)
+    if isinstance(spec.get("components"), dict):
+        components = dict(spec["components"])
+        for (_, kind), section in ((prefix, s) for prefix, s in pruned.items() if prefix[0] == "components"):
+            components[kind] = section
+        if isinstance(components.get("securitySchemes"), dict):
+            components["securitySchemes"] = {
+                name: scheme for name, scheme in components["securitySchemes"].items() if name in security
+            }
+        spec["components"] = {kind: section for kind, section in components.items() if section != {}}
+    for kind in COMPONENT_SECTIONS_V2:
+        if (kind,) in pruned:
+            spec[kind] = pruned[(kind,)]
+    if isinstance(spec.get("securityDefinitions"), dict):
+        spec["securityDefinitions"] = {
+            name: scheme for name, scheme in spec["securityDefinitions"].items() if name in security
+        }
+
+
+def _prune_tags(spec: Dict[str, Any]):
+    """Descarta as definições de tags sem nenhuma operação restante"""
+    if not isinstance(spec.get("tags"), list):
+        return
+    used = {
+        str(tag) for item in (spec.get("paths") or {}).values() if isinstance(item, dict)
+        for method in HTTP_METHODS if isinstance(item.get(method), dict)
+        for tag in item[method].get("tags") or []
+    }
+    spec["tags"] = [tag for tag in spec["tags"] if not isinstance(tag, dict) or tag.get("name") in used]
+
+
+# --- Extensões x- ---
+
+def _strip_extensions(node: Any, names: bool = False, sections: bool = False) -> Any:
+    """
+    Cópia do nó sem chaves x- (exceto as usadas pelo Widdershins).
+    names: node é um mapa de nomes (ex.: properties, headers), cujas chaves são mantidas.
+    sections: cada valor de node é um mapa de nomes (ex.: components).
+    Só as chaves de campos de um objeto do spec são extensões; valores de
+    exemplo são dados do usuário e ficam intactos.
+    """
+    if isinstance(node, dict):
+        stripped = {}
+        for key, value in node.items():
+            if not names and isinstance(key, str) and key.startswith("x-") and key not in KEPT_EXTENSIONS:
+                continue
+            if names:
+                stripped[key] = _strip_extensions(value)
+            elif key in DATA_KEYS:
+                stripped[key] = value
+            else:
+                stripped[key] = _strip_extensions(value, names=sections or key in NAME_MAP_KEYS,
+                                                  sections=key in SECTION_MAP_KEYS)
+        return stripped
+    if isinstance(node, list):
+        return [_strip_extensions(item) for item in node]
+    return node
+
+
+def _option_list(value: Any) -> List[str]:
+    """Aceita listas (config.json/manifesto) ou texto separado por vírgulas"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item for item in LIST_SEPARATOR.split(str(value).strip()) if item]
@@ -0,0 +1,388 @@
+"""
+Combinação de vários specs em um único documento
+Junta specs OpenAPI 3 e Postman Collections (convertidas em memória) em um
+só documento renderizado por uma única chamada do Widdershins: tags
+prefixadas com o nome do serviço, servers deduplicados e components
+renomeados quando dois serviços usam o mesmo nome para definições
+diferentes. Opcionalmente a saída é dividida de volta em uma página por
+serviço:
+
+    python spec_merge.py servicos/*.yaml colecoes/*.json -o docs/api.md --split-services
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from compile_cache import enable_compile_cache
+from doc_splitter import services_dir, split_document
+from gzip_sidecar import SidecarWriter
+from post_render import post_process
+from ref_resolver import RefResolutionError, RefResolver, load_document
+from render_pipeline import build_command, find_widdershins, prepare_spec, run_widdershins, RenderProcess
+from spec_filter import HTTP_METHODS
+
+
+DEFAULT_TITLE = "Documentação Combinada"
+# Nome do documento combinado na pasta de saída do lote (GUI)
+MERGED_OUTPUT = "combined_docs.md"
+OPENAPI_VERSION = "3.0.3"
+# Separador entre o serviço e a tag original ("Pedidos / Pagamentos")
+TAG_SEPARATOR = " / "
+COMPONENT_REF = re.compile(r'^#/components/([^/]+)/(.+)$')
+
+
+class SpecMergeError(Exception):
+    """Spec que não pode ser combinado"""
+
+
+def service_name(spec: Dict[str, Any], file_path: str) -> str:
+    """Nome do serviço: info.title do spec, ou o nome do arquivo"""
+    title = str((spec.get("info") or {}).get("title") or "").strip()
+    return title or Path(file_path).stem
+
+
+def slug(text: str) -> str:
+    """Prefixo seguro para nomes de components, operationIds e paths"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_') or "servico"
+
+
+class SpecMerger:
+    """Acumula serviços com add() e monta o documento com result()"""
+
+    def __init__(self, title: str = DEFAULT_TITLE):
+        self.title = title
+        self.paths: Dict[str, Dict[str, Any]] = {}
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.tags: List[Dict[str, Any]] = []
+        self.tag_groups: List[Dict[str, Any]] = []
+        self.servers: List[Dict[str, Any]] = []
+        self.stats = {"services": 0, "operations": 0, "renamed": 0, "shared": 0, "path_conflicts": 0}
+        # serviço -> (servers, paths do serviço), para decidir servers por path no final
+        self._service_paths: List[Tuple[List[Dict[str, Any]], List[str]]] = []
+        self._path_owner: Dict[str, str] = {}
+        # path -> servers (normalizados) do serviço que o criou
+        self._path_servers: Dict[str, Tuple[str, ...]] = {}
+        self._operation_ids: set = set()
+        self._names: set = set()
+        self._descriptions: List[str] = []
+
+    def add(self, name: str, spec: Dict[str, Any]) -> str:
+        """
+        Adiciona um serviço; retorna o nome usado (único). O spec não é
+        alterado (pode vir do cache do RefResolver). SpecMergeError se não
+        for OpenAPI 3.
+        """
+        if not str(spec.get("openapi", "")).startswith("3"):
+            raise SpecMergeError("apenas specs OpenAPI 3 (ou Postman Collections) podem ser combinados")
+
+        name = self._unique_name(name)
+        prefix = slug(name)
+        renames = self._merge_components(spec.get("components") or {}, prefix)
+        spec = _rewrite_refs(spec, renames) if renames else spec
+        security_renames = {old: new for (kind, old), new in renames.items() if kind == "securitySchemes"}
+
+        servers = [server for server in spec.get("servers") or [] if isinstance(server, dict) and server.get("url")]
+        for server in servers:
+            if all(_server_key(server) != _server_key(known) for known in self.servers):
+                self.servers.append(server)
+
+        server_keys = tuple(_server_key(server) for server in servers)
+
+        tag_names = self._merge_tags(name, spec)
+        service_paths = []
+        for path, item in (spec.get("paths") or {}).items():
+            if not isinstance(item, dict):
+                continue
+            target = self._target_path(str(path), item, name, prefix, server_keys)
+            merged_item = self.paths.setdefault(target, {})
+            for key, value in item.items():
+                if key not in HTTP_METHODS:
+                    merged_item.setdefault(key, value)
+                elif isinstance(value, dict):
+                    merged_item[key] = self._operation(value, name, prefix, spec.get("security"), security_renames)
+                    self.stats["operations"] += 1
+            self._path_owner[target] = name
+            self._path_servers.setdefault(target, server_keys)
+            service_paths.append(target)
+
+        self._service_paths.append((servers, service_paths))
+        self.tag_groups.append({"name": name, "tags": tag_names})
+        description = str((spec.get("info") or {}).get("description") or "").strip()
+        self._descriptions.append(f"- **{name}**" + (f": {description.splitlines()[0]}" if description else ""))
+        self.stats["services"] += 1
+        return name
+
+    def result(self) -> Dict[str, Any]:
+        document: Dict[str, Any] = {
+            "openapi": OPENAPI_VERSION,
+            "info": {
+                "title": self.title,
+                "version": "1.0.0",
+                "description": "Serviços incluídos:\n\n" + "\n".join(self._descriptions),
+            },
+            "paths": self.paths,
+        }
+        if self.servers:
+            document["servers"] = self.servers
+        # Serviços com servers diferentes: cada path declara os servers do próprio serviço
+        if len({tuple(_server_key(server) for server in servers) for servers, _ in self._service_paths}) > 1:
+            for servers, paths in self._service_paths:
+                for path in paths:
+                    if servers:
+                        self.paths[path].setdefault("servers", servers)
+        if self.components:
+            document["components"] = self.components
+        if self.tags:
+            document["tags"] = self.tags
+        document["x-tagGroups"] = [group for group in self.tag_groups if group["tags"]]
+        return document
+
+    # --- Partes do serviço ---
+
+    def _unique_name(self, name: str) -> str:
+        candidate, counter = name, 2
+        while candidate.casefold() in self._names:
+            candidate = f"{name} ({counter})"
+            counter += 1
+        self._names.add(candidate.casefold())
+        return candidate
+
+    def _merge_components(self, components: Dict[str, Any], prefix: str) -> Dict[Tuple[str, str], str]:
+        """
+        Copia os components do serviço. Mesmo nome com a mesma definição é
+        compartilhado; com definição diferente, o do serviço é renomeado para
+        <serviço>_<nome>. A comparação usa as $refs já reescritas e se repete
+        até não haver novas renomeações: um component que referencia outro
+        renomeado também deixa de ser igual. Retorna {(seção, nome antigo): nome novo}.
+        """
+        sections = {kind: section for kind, section in components.items() if isinstance(section, dict)}
+        renames: Dict[Tuple[str, str], str] = {}
+        changed = True
+        while changed:
+            changed = False
+            for kind, section in sections.items():
+                merged = self.components.get(kind, {})
+                for component, value in section.items():
+                    if (kind, component) in renames or component not in merged:
+                        continue
+                    if merged[component] != _rewrite_refs(value, renames):
+                        renames[(kind, component)] = self._component_name(kind, component, prefix, section, renames)
+                        changed = True
+
+        for kind, section in sections.items():
+            merged = self.components.setdefault(kind, {})
+            for component, value in section.items():
+                new_name = renames.get((kind, component))
+                if new_name is None and component in merged:
+                    self.stats["shared"] += 1
+                    continue
+                merged[new_name or component] = _rewrite_refs(value, renames) if renames else value
+                self.stats["renamed"] += int(new_name is not None)
+        return renames
+
+    def _component_name(self, kind: str, component: str, prefix: str, section: Dict[str, Any],
+                        renames: Dict[Tuple[str, str], str]) -> str:
+        """<serviço>_<nome> livre no documento combinado e entre os components do serviço"""
+        taken = set(self.components.get(kind, {})) | set(section)
+        taken.update(name for (section_kind, _), name in renames.items() if section_kind == kind)
+        new_name, counter = f"{prefix}_{component}", 2
+        while new_name in taken:
+            new_name = f"{prefix}_{component}_{counter}"
+            counter += 1
+        return new_name
+
+    def _merge_tags(self, name: str, spec: Dict[str, Any]) -> List[str]:
+        """Tags do serviço prefixadas; operações sem tag ficam sob o nome do serviço"""
+        defined = {str(tag.get("name")): tag for tag in spec.get("tags") or [] if isinstance(tag, dict)}
+        used: List[str] = []
+        for item in (spec.get("paths") or {}).values():
+            if not isinstance(item, dict):
+                continue
+            for method in HTTP_METHODS:
+                operation = item.get(method)
+                if isinstance(operation, dict):
+                    for tag in operation.get("tags") or [None]:
+                        tag = str(tag) if tag is not None else None
+                        if tag not in used:
+                            used.append(tag)
+
+        # Ordem das definições do serviço primeiro, depois as tags só usadas
+        ordered = [tag for tag in defined if tag in used] + [tag for tag in used if tag not in defined]
+        names = []
+        for tag in ordered:
+            definition = dict(defined.get(tag) or {})
+            definition["name"] = _tag_name(name, tag)
+            if tag is None and "description" not in definition:
+                description = str((spec.get("info") or {}).get("description") or "").strip()
+                if description:
+                    definition["description"] = description
+            self.tags.append(definition)
+            names.append(definition["name"])
+        return names
+
+    def _target_path(self, path: str, item: Dict[str, Any], name: str, prefix: str,
+                     server_keys: Tuple[str, ...]) -> str:
+        """
+        Path no documento combinado; conflito com outro serviço (mesmo método,
+        campos do path item ou servers diferentes) recebe o prefixo /<serviço>
+        """
+        existing = self.paths.get(path)
+        if existing is None or self._path_owner.get(path) == name:
+            return path
+        methods_clash = any(method in existing for method in HTTP_METHODS if method in item)
+        shared_clash = any(key in existing and existing[key] != value
+                           for key, value in item.items() if key not in HTTP_METHODS)
+        servers_clash = self._path_servers.get(path, server_keys) != server_keys
+        if not (methods_clash or shared_clash or servers_clash):
+            return path
+        self.stats["path_conflicts"] += 1
+        return f"/{prefix}{path}"
+
+    def _operation(self, operation: Dict[str, Any], name: str, prefix: str, root_security: Any,
+                   security_renames: Dict[str, str]) -> Dict[str, Any]:
+        operation = dict(operation)
+        operation["tags"] = [_tag_name(name, str(tag)) for tag in operation.get("tags") or []] or [_tag_name(name, None)]
+
+        operation_id = operation.get("operationId")
+        if operation_id:
+            if operation_id in self._operation_ids:
+                operation_id = f"{prefix}_{operation_id}"
+                operation["operationId"] = operation_id
+            self._operation_ids.add(operation_id)
+
+        # A segurança da raiz do serviço passa para as operações (a raiz combinada não a tem)
+        security = operation.get("security", root_security)
+        if security is not None:
+            operation["security"] = [
+                {security_renames.get(scheme, scheme): scopes for scheme, scopes in requirement.items()}
+                for requirement in security if isinstance(requirement, dict)
+            ]
+        return operation
+
+
+def _tag_name(service: str, tag: Optional[str]) -> str:
+    return service if tag is None else f"{service}{TAG_SEPARATOR}{tag}"
+
+
+def _server_key(server: Dict[str, Any]) -> str:
+    return str(server.get("url", "")).rstrip('/').casefold()
+
+
+def _rewrite_refs(node: Any, renames: Dict[Tuple[str, str], str]) -> Any:
+    """Cópia do nó com $refs (e discriminator.mapping) apontando para os nomes novos"""
+    def target(ref: Any) -> Any:
+        match = COMPONENT_REF.match(ref) if isinstance(ref, str) else None
+        if match and (match.group(1), match.group(2)) in renames:
+            return f"#/components/{match.group(1)}/{renames[(match.group(1), match.group(2))]}"
+        return ref
+
+    if isinstance(node, dict):
+        rewritten = {key: _rewrite_refs(value, renames) for key, value in node.items()}
+        if "$ref" in rewritten:
+            rewritten["$ref"] = target(rewritten["$ref"])
+        discriminator = rewritten.get("discriminator")
+        if isinstance(discriminator, dict) and isinstance(discriminator.get("mapping"), dict):
+            mapping = {key: target(value) for key, value in discriminator["mapping"].items()}
+            rewritten["discriminator"] = dict(discriminator, mapping=mapping)
+        return rewritten
+    if isinstance(node, list):
+        return [_rewrite_refs(item, renames) for item in node]
+    return node
+
+
+def merge_files(files: List[str], options: Dict[str, Any], resolver: Optional[RefResolver] = None,
+                log: Optional[Callable[[str], None]] = None, title: str = DEFAULT_TITLE,
+                on_file: Optional[Callable[[str, Optional[str]], None]] = None) -> Tuple[Dict[str, Any], SpecMerger]:
+    """
+    Prepara cada arquivo (conversão do Postman, filtros, $refs externos
+    resolvidos, já que o documento combinado não tem pasta de origem) e
+    combina os specs. Arquivos que falham são registrados e ignorados.
+    on_file recebe (arquivo, erro ou None) após cada arquivo.
+    """
+    log = log or (lambda message: None)
+    resolver = resolver or RefResolver()
+    merger = SpecMerger(title)
+    for file_path in files:
+        name = Path(file_path).name
+        try:
+            spec, _ = prepare_spec(file_path, dict(options, opt_resolve=True), resolver, log)
+            if spec is None:
+                spec = load_document(file_path)
+            if not isinstance(spec, dict):
+                raise SpecMergeError("documento vazio ou inválido")
+            service = merger.add(service_name(spec, file_path), spec)
+            log(f"  ➕ {name} → {service}\n")
+            error = None
+        except (SpecMergeError, RefResolutionError, OSError, ValueError) as e:
+            log(f"  ❌ {name} ignorado: {e}\n")
+            error = str(e)
+        if on_file is not None:
+            on_file(file_path, error)
+
+    stats = merger.stats
+    log(f"🔗 {stats['services']} serviços, {stats['operations']} operações; components: "
+        f"{stats['shared']} compartilhados, {stats['renamed']} renomeados; "
+        f"{stats['path_conflicts']} paths em conflito prefixados\n")
+    return merger.result(), merger
+
+
+def render_merged(files: List[str], output_file: str, options: Dict[str, Any],
+                  widdershins_path: Optional[str] = None, resolver: Optional[RefResolver] = None,
+                  log: Optional[Callable[[str], None]] = None, title: str = DEFAULT_TITLE,
+                  split_services: bool = False,
+                  on_file: Optional[Callable[[str, Optional[str]], None]] = None,
+                  sidecars: Optional[SidecarWriter] = None) -> RenderProcess:
+    """Combina os arquivos e renderiza o resultado em uma única chamada do Widdershins"""
+    log = log or (lambda message: None)
+    spec, merger = merge_files(files, options, resolver, log, title, on_file)
+    if not merger.stats["services"]:
+        raise SpecMergeError("nenhum spec pôde ser combinado")
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    command = build_command(widdershins_path or find_widdershins(), files[0], output_file, options)
+    result = run_widdershins(command, spec)
+    if result.returncode != 0:
+        return result
+
+    post_process(output_file, result.output_changed, options, files[0], spec, log, sidecars)
+    if split_services and (result.output_changed or not services_dir(output_file).exists()):
+        groups = {tag: group["name"] for group in spec["x-tagGroups"] for tag in group["tags"]}
+        split = split_document(output_file, services_dir(output_file), groups.get)
+        log(f"  📑 {split['pages'] - 1} serviços ({split['changed']} páginas alteradas) em {split['directory']}\n")
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Combina vários specs/collections em um único documento")
+    parser.add_argument("inputs", nargs="+", help="Specs OpenAPI 3 e Postman Collections")
+    parser.add_argument("-o", "--output", required=True, help="Arquivo Markdown de saída")
+    parser.add_argument("--config", help="config.json com as opções de geração")
+    parser.add_argument("--title", default=DEFAULT_TITLE, help="Título do documento combinado")
+    parser.add_argument("--split-services", action="store_true", help="Também gerar uma página por serviço")
+    args = parser.parse_args(argv)
+
+    enable_compile_cache()
+    options: Dict[str, Any] = {}
+    try:
+        if args.config:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                options = json.load(f)
+        result = render_merged(args.inputs, args.output, options, log=lambda message: print(message, end=''),
+                               title=args.title, split_services=args.split_services)
+    except (OSError, ValueError, SpecMergeError) as e:
+        print(f"Erro: {e}")
+        return 1
+
+    if result.returncode != 0:
+        print(f"Erro: {result.stderr.strip()}")
+        return 1
+    print(f"✅ {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Outline (paths → métodos → respostas, ou pastas → requests do Postman)
+Construído em uma única varredura de bytes, guardando apenas offsets
+"""
+
+import json
+import mmap
+import re
+import threading
+from typing import Any, List, Optional
+
+
+HTTP_METHODS = {'get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace'}
+
+# Strings JSON (com escapes) ou caracteres estruturais
+JSON_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]:,]')
+YAML_KEY_PATTERN = re.compile(r'''^(\s*)(-\s+)?("(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|[^\s#'"{\[][^:#]*?)\s*:(?:\s+(.*))?$''')
+YAML_BLOCK_SCALAR = re.compile(r'^[|>][-+0-9]*\s*(#.*)?$')
+
+
+class OutlineNode:
+    """Nó do outline: rótulo, tipo e offset em bytes no arquivo"""
+
+    __slots__ = ('label', 'kind', 'offset', 'children')
+
+    def __init__(self, label: str, kind: str, offset: int):
+        self.label = label
+        self.kind = kind
+        self.offset = offset
+        self.children: List["OutlineNode"] = []
+
+
+class _OpenAPIOutline:
+    """Monta o outline OpenAPI a partir de (caminho de chaves, chave, offset)"""
+
+    def __init__(self):
+        self.root = OutlineNode("paths", "root", 0)
+        self.schemas = OutlineNode("components/schemas", "section", 0)
+        self._current_path: Optional[OutlineNode] = None
+        self._current_method: Optional[OutlineNode] = None
+
+    def on_key(self, path: List[Any], key: str, offset: int):
+        depth = len(path)
+        if depth == 1 and path[0] == 'paths':
+            self._current_path = OutlineNode(key, "path", offset)
+            self.root.children.append(self._current_path)
+        elif depth == 2 and path[0] == 'paths' and key in HTTP_METHODS and self._current_path:
+            self._current_method = OutlineNode(key.upper(), "operation", offset)
+            self._current_path.children.append(self._current_method)
+        elif depth == 4 and path[0] == 'paths' and path[3] == 'responses' and self._current_method:
+            self._current_method.children.append(OutlineNode(key, "response", offset))
+        elif depth == 2 and path[0] in ('components', 'definitions') and path[1] == 'schemas':
+            self.schemas.children.append(OutlineNode(key, "schema", offset))
+        elif depth == 1 and path[0] == 'definitions':
+            self.schemas.children.append(OutlineNode(key, "schema", offset))
+
+    def result(self) -> OutlineNode:
+        top = OutlineNode("", "document", 0)
+        if self.root.children:
+            top.children.append(self.root)
+        if self.schemas.children:
+            top.children.append(self.schemas)
+        return top
+
+
+def build_outline(file_path: str, cancel: Optional[threading.Event] = None) -> OutlineNode:
+    """Varre o arquivo uma única vez e retorna a raiz do outline"""
+    with open(file_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return OutlineNode("", "document", 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = re.search(rb'\S', mm[:4096])
+            if first and first.group() in (b'{', b'['):
+                return _scan_json(mm, cancel)
+            return _scan_yaml(mm, cancel)
+
+
+def _decode_string(token: bytes) -> str:
+    if b'\\' in token:
+        return json.loads(token)
+    return token[1:-1].decode('utf-8', errors='replace')
+
+
+def _scan_json(mm: mmap.mmap, cancel: Optional[threading.Event]) -> OutlineNode:
+    openapi = _OpenAPIOutline()
+    postman_root = OutlineNode("Collection", "root", 0)
+
+    # Tipo do documento pelas chaves da raiz: openapi/swagger ou info._postman_id/info.schema
+    is_openapi = is_postman = False
+
+    # Cada frame: [tipo, chave_no_pai, chave_atual, esperando_chave, nó_postman]
+    stack: List[list] = []
+    path: List[Any] = []
+
+    for count, match in enumerate(JSON_TOKEN_PATTERN.finditer(mm)):
+        if cancel is not None and count % 65536 == 0 and cancel.is_set():
+            break
+
+        token = match.group()
+        char = token[:1]
+
+        if char == b'"':
+            frame = stack[-1] if stack else None
+            if frame is not None and frame[0] == '{' and frame[3]:
+                key = _decode_string(token)
+                frame[2] = key
+                frame[3] = False
+                openapi.on_key(path, key, match.start())
+                if not path and key in ('openapi', 'swagger'):
+                    is_openapi = True
+                elif path == ['info'] and key in ('_postman_id', 'schema'):
+                    is_postman = True
+            elif frame is not None and frame[4] is not None and frame[2] == 'name':
+                frame[4].label = _decode_string(token)
+        elif char in (b'{', b'['):
+            parent = stack[-1] if stack else None
+            parent_key = None
+            postman_node = None
+            if parent is not None:
+                parent_key = parent[2]
+                path.append(parent_key)
+                # Objeto no array "item" da raiz ou de uma pasta do Postman: pasta ou request
+                if (char == b'{' and parent[0] == '[' and parent[1] == 'item'
+                        and (path == ['item', parent[2]] or stack[-2][4] is not None)):
+                    owner = stack[-2][4] if stack[-2][4] is not None else postman_root
+                    postman_node = OutlineNode("(sem nome)", "request", match.start())
+                    owner.children.append(postman_node)
+            stack.append([char.decode(), parent_key, 0 if char == b'[' else None, char == b'{', postman_node])
+        elif char in (b'}', b']'):
+            if stack:
+                closed = stack.pop()
+                if closed[4] is not None and closed[4].children:
+                    closed[4].kind = "folder"
+            if path:
+                path.pop()
+        elif char == b',':
+            frame = stack[-1] if stack else None
+            if frame is not None:
+                if frame[0] == '{':
+                    frame[3] = True
+                else:
+                    frame[2] += 1
+
+    if postman_root.children and (is_postman or not is_openapi):
+        top = OutlineNode("", "document", 0)
+        top.children.append(postman_root)
+        return top
+    return openapi.result()
+
+
+def _scan_yaml(mm: mmap.mmap, cancel: Optional[threading.Event]) -> OutlineNode:
+    openapi = _OpenAPIOutline()
+    stack: List[tuple] = []  # (indentação, chave)
+    block_indent: Optional[int] = None
+    pos = 0
+    size = len(mm)
+    count = 0
+
+    while pos < size:
+        end = mm.find(b'\n', pos)
+        end = size if end < 0 else end + 1
+        raw = mm[pos:end]
+        offset = pos
+        pos = end
+
+        count += 1
+        if cancel is not None and count % 65536 == 0 and cancel.is_set():
+            break
+
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        stripped = line.lstrip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(stripped)
+
+        if block_indent is not None:
+            if indent > block_indent:
+                continue
+            block_indent = None
+
+        match = YAML_KEY_PATTERN.match(line)
+        if not match:
+            continue
+
+        key_indent = indent + (len(match.group(2)) if match.group(2) else 0)
+        key = match.group(3).strip()
+        if key[:1] in ('"', "'"):
+            key = key[1:-1].replace("''", "'") if key[0] == "'" else json.loads(key)
+
+        while stack and stack[-1][0] >= key_indent:
+            stack.pop()
+
+        openapi.on_key([k for _, k in stack], key, offset + len(raw[:indent]))
+        stack.append((key_indent, key))
+
+        value = (match.group(4) or '').strip()
+        if YAML_BLOCK_SCALAR.match(value):
+            block_indent = key_indent
+
+    return openapi.result()
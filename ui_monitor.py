@@ -0,0 +1,180 @@
+"""
+Monitor de responsividade da GUI
+Mede o atraso do event loop do Tk (quanto um root.after agendado dispara
+depois do previsto) e a duração dos handlers do main thread. Um watchdog em
+outro thread registra a pilha do main thread quando ele fica travado além
+do limite
+"""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+
+HEARTBEAT_MS = 100
+STALL_THRESHOLD_MS = 500
+WINDOW_SIZE = 600
+# Handlers mais rápidos que isso não são registrados (ruído)
+MIN_HANDLER_MS = 1.0
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por vizinho mais próximo (values já ordenados)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * (len(values) - 1)))))
+    return values[index]
+
+
+def summarize(samples: Deque[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 0.50),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+class UIMonitor:
+    """
+    Heartbeat no event loop + medição de handlers + watchdog de travamentos.
+
+    - Lag: a cada HEARTBEAT_MS um root.after mede o atraso real do disparo.
+    - Handlers: measure(nome) cronometra trechos do main thread.
+    - Watchdog: se o heartbeat está atrasado mais de stall_threshold_ms, a
+      pilha do main thread é registrada no log (uma vez por travamento).
+    """
+
+    def __init__(self, root: Any, heartbeat_ms: int = HEARTBEAT_MS,
+                 stall_threshold_ms: int = STALL_THRESHOLD_MS, window: int = WINDOW_SIZE,
+                 logger: Optional[logging.Logger] = None):
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lag: Deque[float] = deque(maxlen=window)
+        self._handlers: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+        self._main_thread_id = threading.get_ident()
+        self._expected: Optional[float] = None
+        self._current_handler = ""
+        self._stalls = 0
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    # --- Ciclo de vida ---
+
+    def start(self):
+        """Inicia o heartbeat e o watchdog (chamar no main thread)"""
+        self._main_thread_id = threading.get_ident()
+        self._schedule()
+        self._watchdog = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # --- Heartbeat ---
+
+    def _schedule(self):
+        with self._lock:
+            self._expected = time.monotonic() + self.heartbeat_ms / 1000
+        try:
+            self.root.after(self.heartbeat_ms, self._beat)
+        except Exception:
+            # Janela destruída
+            self._stop.set()
+
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._expected is not None:
+                self._lag.append(max(0.0, (now - self._expected) * 1000))
+        if not self._stop.is_set():
+            self._schedule()
+
+    # --- Handlers ---
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Cronometra um trecho do main thread sob o nome dado"""
+        previous, self._current_handler = self._current_handler, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self._current_handler = previous
+            if elapsed >= MIN_HANDLER_MS:
+                with self._lock:
+                    samples = self._handlers.get(name)
+                    if samples is None:
+                        samples = self._handlers[name] = deque(maxlen=self._window)
+                    samples.append(elapsed)
+
+    def wrap(self, name: str, callback: Callable) -> Callable:
+        """Versão cronometrada de um callback (ex.: comandos de botões)"""
+        def measured(*args, **kwargs):
+            with self.measure(name):
+                return callback(*args, **kwargs)
+        return measured
+
+    # --- Watchdog ---
+
+    def _watch(self):
+        interval = self.stall_threshold_ms / 2000
+        reported = None
+        while not self._stop.wait(interval):
+            with self._lock:
+                expected = self._expected
+            if expected is None:
+                continue
+            # Atraso em relação ao heartbeat que já deveria ter rodado
+            stalled_ms = (time.monotonic() - expected) * 1000
+            if stalled_ms < self.stall_threshold_ms or reported == expected:
+                continue
+            # Um registro por travamento: só volta a registrar após o próximo heartbeat
+            reported = expected
+            self._stalls += 1
+            self.logger.warning(
+                "Main thread travado há %.0f ms (handler: %s)\n%s",
+                stalled_ms, self._current_handler or "desconhecido", self.main_thread_stack()
+            )
+
+    def main_thread_stack(self) -> str:
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return "(pilha indisponível)"
+        return "".join(traceback.format_stack(frame))
+
+    # --- Métricas ---
+
+    def snapshot(self) -> Dict[str, Any]:
+        """{"lag": {...}, "handlers": {nome: {...}}, "stalls": n} em milissegundos"""
+        with self._lock:
+            lag = summarize(self._lag)
+            handlers = {name: summarize(samples) for name, samples in self._handlers.items()}
+        return {"lag": lag, "handlers": handlers, "stalls": self._stalls}
+
+    def status_text(self) -> str:
+        """Resumo curto para a barra de status"""
+        snapshot = self.snapshot()
+        lag = snapshot["lag"]
+        if not lag["count"]:
+            return ""
+        text = f"UI: atraso p50 {lag['p50']:.0f} ms · p99 {lag['p99']:.0f} ms · máx {lag['max']:.0f} ms"
+        slowest = max(snapshot["handlers"].items(), key=lambda item: item[1]["max"], default=None)
+        if slowest is not None:
+            text += f" | handler mais lento: {slowest[0]} ({slowest[1]['max']:.0f} ms)"
+        if snapshot["stalls"]:
+            text += f" | travamentos: {snapshot['stalls']}"
+        return text
@@ -10,9 +10,39 @@ import os
 import sys
 import logging
 import json
+import time
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from postman_converter import PostmanToOpenAPIConverter
+from typing import List, Optional, Dict, Any, Tuple
+from postman_converter import ConversionCancelled, ExampleLimits, PostmanToOpenAPIConverter
+from ref_resolver import RefResolver
+from openapi_validator import ValidationCache, ValidationResult, validate_document, validate_file
+from large_file_preview import LineIndex, PagedTextView
+from spec_outline import OutlineNode, build_outline
+from project_manifest import ManifestBuilder, ManifestError
+from run_history import RunHistory
+from metrics_export import exported_run
+from compile_cache import describe, enable_compile_cache, warm_up
+from memory_diagnostics import MemoryDiagnostics
+from gzip_sidecar import DEFAULT_LEVEL, SidecarWriter, gzip_level
+from post_render import post_process
+from archive_io import (
+    ArchiveRefResolver, ArchiveSet, ArchiveWriter, is_archive, is_member_path, join_member, prepare_member, stdout_markdown,
+    unique_name
+)
+from incremental_render import IncrementalRenderer, incremental_enabled, render_incremental
+from spec_merge import MERGED_OUTPUT, SpecMergeError, render_merged
+from spec_filter import apply_filters
+from progress_estimator import ProgressEstimator, estimate_costs, format_duration
+from file_discovery import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, discover_in_chunks, parse_patterns
+from ui_monitor import UIMonitor
+from batch_list import (
+    STATE_CACHED, STATE_CONVERTING, STATE_DONE, STATE_FAILED, STATE_RENDERING, BatchListModel, BatchListView
+)
+from render_pipeline import (
+    RenderProcess, build_command, find_widdershins, is_allowed_flag, prepare_spec, run_widdershins,
+    spec_source, staged_output, wait_with_usage, with_input
+)
 
 # Constantes de UI
 APP_TITLE = "DS = API Doc Generator"
@@ -52,8 +82,24 @@ class WiddershinsGUI:
         # Configurações e presets
         self.config_file = Path(__file__).parent / "config.json"
         
-        # Conversor Postman
-        self.postman_converter = PostmanToOpenAPIConverter()
+        # Collections convertidas em memória: caminho -> (mtime, limites dos exemplos, spec)
+        self.converted_specs: Dict[str, Tuple[float, Tuple[int, ...], Dict[str, Any]]] = {}
+        
+        # Resolvedor de $refs (cache compartilhado entre execuções e lotes)
+        self.ref_resolver = RefResolver()
+        
+        # Resultados de validação por hash do conteúdo
+        self.validation_cache = ValidationCache()
+        
+        # Histórico de execuções (SQLite) para detectar regressões
+        try:
+            self.run_history: Optional[RunHistory] = RunHistory()
+        except Exception as e:
+            self.logger.error(f"Histórico de execuções indisponível: {e}")
+            self.run_history = None
+        
+        # Sidecars .gz das saídas (thread de fundo)
+        self.sidecar_writer = SidecarWriter()
         self.presets = {
             "Básico": {
                 "opt_code": True,
@@ -91,12 +137,36 @@ class WiddershinsGUI:
         self.output_file = tk.StringVar()
         self.user_templates = tk.StringVar()
         self.environment_file = tk.StringVar()
+        self.metrics_file = tk.StringVar()
         self.other_flags = tk.StringVar()
         
+        # Filtros de subconjunto (listas separadas por vírgula)
+        self.filter_include_tags = tk.StringVar()
+        self.filter_exclude_tags = tk.StringVar()
+        self.filter_include_paths = tk.StringVar()
+        self.filter_exclude_paths = tk.StringVar()
+        self.filter_methods = tk.StringVar()
+        
         # Conversão em lote
         self.batch_mode = tk.BooleanVar(value=False)
-        self.batch_files = []
+        # Arquivos do lote com o estado de cada um (lista virtualizada)
+        self.batch_files = BatchListModel()
         self.batch_output_dir = tk.StringVar()
+        self.batch_include = tk.StringVar(value=", ".join(DEFAULT_INCLUDE))
+        self.batch_exclude = tk.StringVar(value=", ".join(DEFAULT_EXCLUDE))
+        # Combinar os arquivos do lote em um único documento
+        self.batch_merge = tk.BooleanVar(value=False)
+        # Progresso do lote ponderado pelo custo estimado de cada arquivo
+        self.batch_estimator: Optional[ProgressEstimator] = None
+        self.batch_progress_status = tk.StringVar()
+        # Carga/conversão do arquivo do modo individual (em background; um novo arquivo cancela a anterior)
+        self._input_load_cancel = threading.Event()
+        self._input_load_generation = 0
+        self.conversion_status = tk.StringVar()
+        
+        # Varreduras de pastas em andamento (a geração descarta blocos de varreduras canceladas)
+        self._discovery_cancel = threading.Event()
+        self._discovery_generation = 0
         
         # Linguagens de código (checkboxes)
         self.lang_curl = tk.BooleanVar(value=True)
@@ -114,10 +184,37 @@ class WiddershinsGUI:
         self.opt_omit_header = tk.BooleanVar(value=False)
         self.opt_raw = tk.BooleanVar(value=False)
         self.opt_resolve = tk.BooleanVar(value=False)
+        self.opt_dereference = tk.BooleanVar(value=False)
+        self.opt_gzip = tk.BooleanVar(value=False)
+        self.opt_split_pages = tk.BooleanVar(value=False)
+        self.opt_split_services = tk.BooleanVar(value=False)
+        self.opt_search_index = tk.BooleanVar(value=False)
+        self.opt_memory_diagnostics = tk.BooleanVar(value=False)
+        self.opt_incremental = tk.BooleanVar(value=False)
+        self.opt_exclude_deprecated = tk.BooleanVar(value=False)
+        self.opt_strip_extensions = tk.BooleanVar(value=False)
+        self.gzip_level = tk.IntVar(value=DEFAULT_LEVEL)
+        
+        # Limites dos exemplos copiados das collections do Postman (0 = sem limite)
+        self.example_max_kb = tk.IntVar(value=ExampleLimits.DEFAULT_MAX_BYTES // 1024)
+        self.example_max_items = tk.IntVar(value=ExampleLimits.DEFAULT_MAX_ITEMS)
+        self.example_max_depth = tk.IntVar(value=ExampleLimits.DEFAULT_MAX_DEPTH)
+        self.example_max_chars = tk.IntVar(value=ExampleLimits.DEFAULT_MAX_STRING)
 
+        # Atraso do event loop e duração dos handlers do main thread
+        self.ui_monitor = UIMonitor(self.root, logger=self.logger)
+        self.ui_status = tk.StringVar()
+        
+        # Sessão de tracemalloc (só liga com a opção "Diagnóstico de memória")
+        self.memory_diagnostics = MemoryDiagnostics()
+        self._memory_batches = 0
+        
         # Constru��o da UI
         self._create_widgets()
         
+        # Cache de compilação do Node compartilhado por todos os processos do Widdershins
+        enable_compile_cache()
+        
         # Verificar depend�ncias Node.js em background
         self._check_dependencies_async()
         
@@ -126,6 +223,9 @@ class WiddershinsGUI:
 
         # Inicia o "polling" da fila de logs
         self._poll_log_queue()
+        
+        self.ui_monitor.start()
+        self._refresh_ui_status()
 
     def _create_widgets(self):
         """Cria e posiciona todos os widgets na janela principal."""
@@ -154,7 +254,7 @@ class WiddershinsGUI:
         
         # Configurar drag and drop para o frame
         file_frame.drop_target_register(DND_FILES)
-        file_frame.dnd_bind('<<Drop>>', self._on_drop)
+        file_frame.dnd_bind('<<Drop>>', self.ui_monitor.wrap("on_drop", self._on_drop))
         
         # Modo de conversão
         mode_frame = ttk.Frame(file_frame)
@@ -169,19 +269,48 @@ class WiddershinsGUI:
         self._create_file_entry(self.single_frame, "📝 Arquivo Markdown:", self.output_file, self._browse_output_file, row=1)
         ttk.Button(self.single_frame, text="🔄 Auto-nomear saída", command=self._auto_name_output).grid(row=1, column=3, padx=5)
         
+        # Progresso da conversão de collections (visível apenas durante a conversão)
+        self.conversion_frame = ttk.Frame(self.single_frame)
+        self.conversion_progress = ttk.Progressbar(self.conversion_frame, mode="indeterminate", length=200)
+        self.conversion_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.conversion_frame, textvariable=self.conversion_status).pack(side=tk.LEFT, padx=5)
+        
         # Frame para modo lote (inicialmente oculto)
         self.batch_frame = ttk.Frame(file_frame)
         
         ttk.Label(self.batch_frame, text="📁 Pasta de saída:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         ttk.Entry(self.batch_frame, textvariable=self.batch_output_dir, width=50).grid(row=0, column=1, sticky=tk.EW, padx=5)
         ttk.Button(self.batch_frame, text="Procurar...", command=self._browse_batch_output).grid(row=0, column=2, padx=5)
+        ttk.Button(self.batch_frame, text="📦 Pacote...", command=self._browse_batch_output_archive).grid(row=0, column=3, padx=5)
         
         ttk.Button(self.batch_frame, text="📂 Selecionar Arquivos", command=self._browse_batch_files).grid(row=1, column=0, padx=5, pady=5)
         ttk.Button(self.batch_frame, text="🗑️ Limpar Lista", command=self._clear_batch_files).grid(row=1, column=1, padx=5, pady=5)
+        ttk.Button(self.batch_frame, text="📋 Build por Manifesto", command=self._build_from_manifest).grid(row=1, column=2, padx=5, pady=5)
+        ttk.Button(self.batch_frame, text="📁 Adicionar Pasta", command=self._browse_batch_directory).grid(row=1, column=3, padx=5, pady=5)
+        
+        # Globs usados ao varrer pastas (arrastadas ou adicionadas)
+        globs_frame = ttk.Frame(self.batch_frame)
+        globs_frame.grid(row=2, column=0, columnspan=4, sticky=tk.EW, padx=5)
+        ttk.Label(globs_frame, text="Incluir:").pack(side=tk.LEFT)
+        ttk.Entry(globs_frame, textvariable=self.batch_include, width=25).pack(side=tk.LEFT, padx=5)
+        ttk.Label(globs_frame, text="Excluir:").pack(side=tk.LEFT)
+        ttk.Entry(globs_frame, textvariable=self.batch_exclude).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        # Lista de arquivos em lote (só as linhas visíveis são desenhadas)
+        self.batch_view = BatchListView(self.batch_frame, self.batch_files, height=6)
+        self.batch_view.grid(row=3, column=0, columnspan=4, sticky=tk.EW, padx=5, pady=5)
         
-        # Lista de arquivos em lote
-        self.batch_listbox = tk.Listbox(self.batch_frame, height=4)
-        self.batch_listbox.grid(row=2, column=0, columnspan=3, sticky=tk.EW, padx=5, pady=5)
+        # Todos os arquivos em um documento (componentes e tags por serviço, uma renderização)
+        merge_frame = ttk.Frame(self.batch_frame)
+        merge_frame.grid(row=4, column=0, columnspan=4, sticky=tk.EW, padx=5)
+        self._create_checkbox(merge_frame, self.batch_merge, "🔗 Combinar em um documento", "Gera combined_docs.md na pasta de saída com todos os arquivos (conflitos de nomes recebem o prefixo do serviço)").pack(side=tk.LEFT)
+        self._create_checkbox(merge_frame, self.opt_split_services, "Página por serviço", "Também dividir o documento combinado em uma página por serviço").pack(side=tk.LEFT, padx=10)
+        
+        # Progresso e ETA do lote (visível a partir do primeiro lote)
+        self.batch_progress_frame = ttk.Frame(self.batch_frame)
+        self.batch_progress = ttk.Progressbar(self.batch_progress_frame, mode="determinate", maximum=1000, length=300)
+        self.batch_progress.pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.batch_progress_frame, textvariable=self.batch_progress_status).pack(side=tk.LEFT, padx=5)
         
         self.batch_frame.grid_columnconfigure(1, weight=1)
         file_frame.grid_columnconfigure(0, weight=1)
@@ -227,28 +356,80 @@ class WiddershinsGUI:
         # Opções avançadas simplificadas
         self._create_checkbox(advanced_frame, self.opt_omit_header, "Omitir cabeçalho", "Gerar MD puro sem YAML").grid(row=0, column=0, sticky=tk.W, pady=5)
         self._create_checkbox(advanced_frame, self.opt_raw, "Modo raw", "Não processar Markdown").grid(row=0, column=1, sticky=tk.W, padx=10, pady=5)
+        self._create_checkbox(advanced_frame, self.opt_dereference, "Desreferenciar tudo", "Com 'Resolver $refs': incorporar também as referências internas").grid(row=0, column=2, sticky=tk.W, padx=10, pady=5)
         
         self._create_file_entry(advanced_frame, "📁 Templates customizados:", self.user_templates, self._browse_templates_dir, row=1)
         self._create_file_entry(advanced_frame, "🌍 Arquivo environment:", self.environment_file, self._browse_env_file, row=2)
         
         self._create_text_entry(advanced_frame, "🔧 Flags extras:", self.other_flags, 3, 
                                 help_text="(Ex: --maxHeadingDepth 3 --shallow)")
+        
+        self._create_checkbox(advanced_frame, self.opt_gzip, "Gerar .gz", "Sidecar pré-comprimido ao lado de cada saída (só quando a saída muda)").grid(row=5, column=0, sticky=tk.W, pady=5)
+        gzip_level_frame = ttk.Frame(advanced_frame)
+        gzip_level_frame.grid(row=5, column=1, sticky=tk.W, padx=10, pady=5)
+        ttk.Label(gzip_level_frame, text="Nível:").pack(side=tk.LEFT)
+        ttk.Spinbox(gzip_level_frame, from_=1, to=9, width=3, textvariable=self.gzip_level).pack(side=tk.LEFT, padx=5)
+        self._create_checkbox(advanced_frame, self.opt_split_pages, "Várias páginas", "Também dividir a saída em uma página por tag, com índice e manifesto JSON").grid(row=5, column=2, sticky=tk.W, padx=10, pady=5)
+        self._create_checkbox(advanced_frame, self.opt_search_index, "Índice de busca", "Índice invertido pré-construído (JSON em shards por prefixo) ao lado da saída").grid(row=6, column=0, sticky=tk.W, pady=5)
+        self._create_checkbox(advanced_frame, self.opt_memory_diagnostics, "Diagnóstico de memória", "tracemalloc na conversão e em cada arquivo do lote: pico/retido por arquivo, maiores alocações e snapshots em memory_snapshots/").grid(row=6, column=1, sticky=tk.W, padx=10, pady=5)
+        self._create_checkbox(advanced_frame, self.opt_incremental, "Incremental", "Renderiza só as operações e schemas alterados desde a última geração e atualiza suas seções na saída existente").grid(row=6, column=2, sticky=tk.W, padx=10, pady=5)
+        
+        # Subconjunto do spec: filtros aplicados antes do Widdershins (também no modo lote)
+        filter_frame = ttk.LabelFrame(advanced_frame, text="🔍 Filtrar operações", padding="5")
+        filter_frame.grid(row=7, column=0, columnspan=3, sticky=tk.EW, pady=5)
+        filter_fields = [
+            ("Incluir tags:", self.filter_include_tags, "Excluir tags:", self.filter_exclude_tags),
+            ("Incluir paths:", self.filter_include_paths, "Excluir paths:", self.filter_exclude_paths),
+        ]
+        for row, (include_label, include_var, exclude_label, exclude_var) in enumerate(filter_fields):
+            ttk.Label(filter_frame, text=include_label).grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+            ttk.Entry(filter_frame, textvariable=include_var).grid(row=row, column=1, sticky=tk.EW, padx=5)
+            ttk.Label(filter_frame, text=exclude_label).grid(row=row, column=2, sticky=tk.W, padx=5, pady=2)
+            ttk.Entry(filter_frame, textvariable=exclude_var).grid(row=row, column=3, sticky=tk.EW, padx=5)
+        ttk.Label(filter_frame, text="Métodos:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=2)
+        ttk.Entry(filter_frame, textvariable=self.filter_methods).grid(row=2, column=1, sticky=tk.EW, padx=5)
+        self._create_checkbox(filter_frame, self.opt_exclude_deprecated, "Excluir deprecated", "Omitir operações marcadas como deprecated").grid(row=2, column=2, sticky=tk.W, padx=5)
+        self._create_checkbox(filter_frame, self.opt_strip_extensions, "Remover extensões x-", "Remover extensões x- do spec (exceto as usadas pelo Widdershins, como x-code-samples)").grid(row=2, column=3, sticky=tk.W, padx=5)
+        ttk.Label(filter_frame, text="(Separar por vírgula. Paths aceitam globs: /pets*, /v1/*/items. Componentes não usados são descartados)",
+                  font=("TkDefaultFont", 8, "italic")).grid(row=3, column=0, columnspan=4, sticky=tk.W, padx=5)
+        filter_frame.grid_columnconfigure(1, weight=1)
+        filter_frame.grid_columnconfigure(3, weight=1)
+        
+        # Exemplos grandes das collections são reduzidos na conversão
+        examples_frame = ttk.LabelFrame(advanced_frame, text="✂️ Exemplos do Postman (0 = sem limite)", padding="5")
+        examples_frame.grid(row=8, column=0, columnspan=3, sticky=tk.EW, pady=5)
+        example_limits = [
+            ("Máx. KB:", self.example_max_kb, 100000),
+            ("Itens por lista:", self.example_max_items, 100000),
+            ("Profundidade:", self.example_max_depth, 1000),
+            ("Caracteres por texto:", self.example_max_chars, 1000000),
+        ]
+        for column, (label, var, maximum) in enumerate(example_limits):
+            ttk.Label(examples_frame, text=label).grid(row=0, column=column * 2, sticky=tk.W, padx=5)
+            ttk.Spinbox(examples_frame, from_=0, to=maximum, width=7, textvariable=var).grid(row=0, column=column * 2 + 1, sticky=tk.W)
+        
+        # Métricas do lote para o textfile collector do node_exporter
+        self._create_file_entry(advanced_frame, "📊 Métricas (.prom):", self.metrics_file, self._browse_metrics_file, row=9)
 
         # --- Seção 4: Ação e Console ---
         action_frame = ttk.Frame(main_frame)
         action_frame.pack(fill=tk.X, pady=10)
         
-        self.generate_button = ttk.Button(action_frame, text="🚀 Gerar Documentação", command=self._start_generation_thread)
+        self.generate_button = ttk.Button(action_frame, text="🚀 Gerar Documentação", command=self.ui_monitor.wrap("gerar", self._start_generation_thread))
         self.generate_button.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=8)
         
-        ttk.Button(action_frame, text="👁️ Preview", command=self._preview_file).pack(side=tk.RIGHT, padx=(10,0))
-        ttk.Button(action_frame, text="✅ Validar", command=self._validate_openapi).pack(side=tk.RIGHT, padx=(5,0))
+        ttk.Button(action_frame, text="👁️ Preview", command=self.ui_monitor.wrap("preview", self._preview_file)).pack(side=tk.RIGHT, padx=(10,0))
+        ttk.Button(action_frame, text="✅ Validar", command=self.ui_monitor.wrap("validar", self._validate_openapi)).pack(side=tk.RIGHT, padx=(5,0))
+        ttk.Button(action_frame, text="📈 Histórico", command=self.ui_monitor.wrap("histórico", self._show_run_history)).pack(side=tk.RIGHT, padx=(5,0))
 
         console_frame = ttk.LabelFrame(main_frame, text="📋 Console de Saída", padding="5")
         console_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
         self.console_output = ScrolledText(console_frame, wrap=tk.WORD, height=12, state=tk.DISABLED, bg="#2b2b2b", fg="#f0f0f0", font=('Consolas', 9))
         self.console_output.pack(fill=tk.BOTH, expand=True)
+        
+        # Responsividade da UI (atualizado a cada segundo)
+        ttk.Label(main_frame, textvariable=self.ui_status, font=("TkDefaultFont", 8), foreground="#666666").pack(fill=tk.X)
 
     # --- Métodos de Criação de Widgets (Helpers) ---
 
@@ -287,26 +468,8 @@ class WiddershinsGUI:
                 filetypes=[("OpenAPI/Postman", "*.json *.yaml *.yml"), ("JSON", "*.json"), ("YAML", "*.yaml *.yml"), ("Todos", "*.*")]
             )
             if file and self._validate_file_path(file):
-                # Verificar se é Postman Collection
-                if self.postman_converter.is_postman_collection(file):
-                    self._log_to_console(f"📦 Postman Collection detectada: {Path(file).name}\n")
-                    self._log_to_console("🔄 Convertendo para OpenAPI...\n")
-                    
-                    # Criar arquivo temporário para conversão
-                    temp_file = Path(file).parent / f"{Path(file).stem}_openapi.json"
-                    
-                    if self.postman_converter.convert(file, str(temp_file)):
-                        self.input_file.set(str(temp_file))
-                        self._log_to_console(f"✅ Conversão concluída: {temp_file.name}\n")
-                        messagebox.showinfo("Conversão", f"Postman Collection convertida para OpenAPI!\nArquivo: {temp_file.name}")
-                    else:
-                        self._log_to_console("❌ Falha na conversão\n")
-                        messagebox.showerror("Erro", "Falha ao converter Postman Collection")
-                        return
-                else:
-                    self.input_file.set(file)
-                
-                self._auto_name_output()  # Auto-sugerir nome de saída
+                # Detecção e conversão de Postman Collection em background
+                self._load_single_input(file, notify=True)
         except Exception as e:
             self.logger.error(f"Erro ao selecionar arquivo de entrada: {e}")
             messagebox.showerror("Erro", f"Erro ao selecionar arquivo: {e}")
@@ -345,6 +508,19 @@ class WiddershinsGUI:
             self.logger.error(f"Erro ao selecionar arquivo de environment: {e}")
             messagebox.showerror("Erro", f"Erro ao selecionar arquivo: {e}")
 
+    def _browse_metrics_file(self):
+        try:
+            file = filedialog.asksaveasfilename(
+                title="Arquivo de Métricas do Lote",
+                filetypes=[("Prometheus", "*.prom"), ("Todos", "*.*")],
+                defaultextension=".prom"
+            )
+            if file:
+                self.metrics_file.set(file)
+        except Exception as e:
+            self.logger.error(f"Erro ao selecionar arquivo de métricas: {e}")
+            messagebox.showerror("Erro", f"Erro ao selecionar arquivo: {e}")
+
     # --- Lógica de Geração (Threading e Subprocess) ---
 
     def _start_generation_thread(self):
@@ -362,9 +538,11 @@ class WiddershinsGUI:
                 self._set_console_state(tk.DISABLED)
                 
                 self.generate_button.config(text="Processando Lote...", state=tk.DISABLED)
+                self.batch_files.reset_states()
                 
                 threading.Thread(
-                    target=self._run_batch_process,
+                    target=self._run_merge_process if self.batch_merge.get() else self._run_batch_process,
+                    args=(self._collect_options(),),
                     daemon=True
                 ).start()
             else:
@@ -383,7 +561,7 @@ class WiddershinsGUI:
                 
                 threading.Thread(
                     target=self._run_widdershins_process,
-                    args=(command,),
+                    args=(command, self._collect_options()),
                     daemon=True
                 ).start()
 
@@ -398,60 +576,12 @@ class WiddershinsGUI:
         
         try:
             # Usar Widdershins local se disponível, senão global
-            widdershins_path = self._get_widdershins_path()
-            command = [widdershins_path]
-
-            # Arquivos (validados)
-            input_file = self.input_file.get().strip()
-            output_file = self.output_file.get().strip()
-            
-            if not input_file or not output_file:
-                raise ValueError("Arquivos de entrada e saída são obrigatórios")
-            
-            command.append(input_file)
-            command.extend(['-o', output_file])
-
-            # Opções booleanas (seguras)
-            boolean_options = {
-                self.opt_code.get(): '--code',
-                self.opt_summary.get(): '--summary',
-                self.opt_omit_header.get(): '--omitHeader',
-                self.opt_raw.get(): '--raw',
-                self.opt_resolve.get(): '--resolve'
-            }
-            
-            for condition, flag in boolean_options.items():
-                if condition:
-                    command.append(flag)
-
-            # Campos de texto (validados)
-            if self.user_templates.get().strip():
-                templates_path = self.user_templates.get().strip()
-                if self._validate_directory_path(templates_path):
-                    command.extend(['--user_templates', templates_path])
-                    
-            if self.environment_file.get().strip():
-                env_file = self.environment_file.get().strip()
-                if self._validate_file_path(env_file):
-                    command.extend(['--environment', env_file])
-
-            # Language Tabs (baseado nos checkboxes)
-            lang_tabs = self._build_language_tabs()
-            if lang_tabs:
-                command.append('--language_tabs')
-                command.extend(lang_tabs)
-
-            # Outras flags (parsing seguro)
-            other_flags = self.other_flags.get().strip()
-            if other_flags:
-                try:
-                    parsed_flags = shlex.split(other_flags)
-                    # Validar flags permitidas
-                    for flag in parsed_flags:
-                        if self._validate_flag(flag):
-                            command.append(flag)
-                except ValueError as e:
-                    self.logger.warning(f"Erro ao processar flags adicionais: {e}")
+            command = build_command(
+                self._get_widdershins_path(),
+                self.input_file.get().strip(),
+                self.output_file.get().strip(),
+                self._collect_options()
+            )
 
             self._log_to_console(f"Comando Executado:\n{' '.join(shlex.quote(c) for c in command)}\n{'-'*30}\n")
             return command
@@ -460,13 +590,41 @@ class WiddershinsGUI:
             self.logger.error(f"Erro ao construir comando: {e}")
             raise
 
-    def _run_widdershins_process(self, command: List[str]):
+    def _run_widdershins_process(self, command: List[str], options: Dict[str, Any]):
         """
         Executa o processo 'widdershins' (roda no thread de trabalho).
         Envia a saída (stdout/stderr) para a fila (self.log_queue).
         """
         process = None
+        spec_stack = ExitStack()
         try:
+            input_file, output_file = command[1], command[3]
+            # Spec em memória (Postman convertido ou $refs resolvidos), sem arquivos temporários
+            spec = self._converted_spec_for(command[1], options)
+            if spec is not None:
+                spec = apply_filters(spec, options, log=self.log_queue.put)
+            else:
+                spec, _ = prepare_spec(command[1], options, self.ref_resolver, log=self.log_queue.put)
+            # Só as operações alteradas desde a última geração, quando a saída permite
+            incremental = None
+            if incremental_enabled(options):
+                incremental = IncrementalRenderer(command, spec, input_file, log=self.log_queue.put)
+                result = incremental.patch()
+                if result is not None:
+                    self._record_run("single", input_file, output_file, options, result)
+                    if result.output_changed is False:
+                        self.log_queue.put("\nSaída idêntica à existente: arquivo mantido (mtime preservado).")
+                    sidecar = self._post_process(output_file, result.output_changed, options, input_file, spec)
+                    if sidecar is not None:
+                        sidecar.add_done_callback(self._log_sidecar_result)
+                    self.log_queue.put("\n--- SUCESSO! Geração concluída. ---")
+                    return
+            source, pass_fds = spec_stack.enter_context(spec_source(spec, command[1]))
+            if spec is not None:
+                command = with_input(command, source, spec)
+            # Gera em um temporário irmão; a saída só é substituída se o conteúdo mudou
+            command, publish_output = spec_stack.enter_context(staged_output(command))
+
             # Configuração para ocultar a janela do console no Windows
             startupinfo = None
             if sys.platform == "win32":
@@ -475,6 +633,7 @@ class WiddershinsGUI:
                 startupinfo.wShowWindow = subprocess.SW_HIDE
 
             # Configurações de segurança para subprocess
+            started = time.perf_counter()
             process = subprocess.Popen(
                 command,
                 stdout=subprocess.PIPE,
@@ -483,6 +642,7 @@ class WiddershinsGUI:
                 encoding='utf-8',
                 errors='replace',
                 startupinfo=startupinfo,
+                pass_fds=pass_fds,
                 shell=False,  # Importante para segurança
                 cwd=None,     # Não herdar diretório de trabalho
                 env=None      # Usar ambiente limpo
@@ -510,19 +670,29 @@ class WiddershinsGUI:
                 if process.stderr:
                     process.stderr.close()
 
-            # Aguardar conclusão com timeout
+            # Aguardar conclusão com timeout (pico de memória via rusage quando disponível)
             try:
-                return_code = process.wait(timeout=300)  # 5 minutos timeout
+                peak_memory_kb = wait_with_usage(process, timeout=300)  # 5 minutos timeout
+                return_code = process.returncode
+                output_changed = publish_output() if return_code == 0 else None
+                self._record_run("single", input_file, output_file, options, RenderProcess(
+                    command, return_code, None, None, time.perf_counter() - started, peak_memory_kb, output_changed
+                ))
                 
                 if return_code == 0:
+                    if incremental is not None:
+                        incremental.record()
+                    if output_changed is False:
+                        self.log_queue.put("\nSaída idêntica à existente: arquivo mantido (mtime preservado).")
+                    sidecar = self._post_process(output_file, output_changed, options, input_file, spec)
+                    if sidecar is not None:
+                        sidecar.add_done_callback(self._log_sidecar_result)
                     self.log_queue.put("\n--- SUCESSO! Geração concluída. ---")
                 else:
                     self.log_queue.put(f"\n--- ERRO! Processo finalizou com código {return_code} ---")
                     
             except subprocess.TimeoutExpired:
                 self.log_queue.put("\n--- TIMEOUT! Processo cancelado por exceder tempo limite. ---")
-                process.kill()
-                process.wait()
 
         except FileNotFoundError:
             self.logger.error("Comando widdershins não encontrado")
@@ -552,8 +722,181 @@ class WiddershinsGUI:
                     process.wait(timeout=5)
                 except:
                     pass
+            spec_stack.close()
             self.log_queue.put("DONE")  # Sinaliza o fim para a GUI
 
+    def _load_single_input(self, file_path: str, notify: bool = False):
+        """Detecta/converte o arquivo do modo individual em um thread de trabalho.
+        Só o resultado da carga mais recente é aplicado; as anteriores são canceladas."""
+        self._input_load_cancel.set()
+        self._input_load_cancel = cancel = threading.Event()
+        self._input_load_generation += 1
+        generation = self._input_load_generation
+        options = self._collect_options()
+        limits = ExampleLimits.from_options(options)
+        diagnose = self._memory_diagnostics_enabled(options)
+        
+        self.conversion_status.set(f"Lendo {Path(file_path).name}...")
+        self.conversion_progress.configure(mode="indeterminate")
+        self.conversion_progress.start(15)
+        self.conversion_frame.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+        
+        last_post = [0.0]
+        
+        def on_progress(done: int, total: int, folder: str):
+            # Limita as atualizações da barra a ~10 por segundo
+            now = time.perf_counter()
+            if done == total or now - last_post[0] >= 0.1:
+                last_post[0] = now
+                self._post_to_ui(self._update_conversion_progress, generation, done, total, folder)
+        
+        def run():
+            entry, is_collection = None, False
+            try:
+                collection = PostmanToOpenAPIConverter().load_collection(file_path)
+                if cancel.is_set():
+                    return
+                if collection is not None:
+                    is_collection = True
+                    self.log_queue.put(f"📦 Postman Collection detectada: {Path(file_path).name}\n")
+                    self.log_queue.put("🔄 Convertendo para OpenAPI...\n")
+                    entry = self._convert_collection(file_path, collection, limits, on_progress, cancel, diagnose)
+                    if diagnose:
+                        for line in self.memory_diagnostics.checkpoint(f"conversao_{Path(file_path).stem}"):
+                            self.log_queue.put(line + "\n")
+            except ConversionCancelled:
+                self.log_queue.put(f"⏹️ Conversão de {Path(file_path).name} cancelada\n")
+                return
+            self._post_to_ui(self._finish_single_input, generation, file_path, is_collection, entry, notify)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _update_conversion_progress(self, generation: int, done: int, total: int, folder: str):
+        if generation != self._input_load_generation:
+            return
+        if str(self.conversion_progress.cget("mode")) != "determinate":
+            self.conversion_progress.stop()
+            self.conversion_progress.configure(mode="determinate", maximum=max(1, total))
+        self.conversion_progress.configure(value=done)
+        where = f" — {folder}" if folder else ""
+        self.conversion_status.set(f"Convertendo {done}/{total} requests{where}")
+    
+    def _show_batch_progress(self, estimator: ProgressEstimator):
+        """Exibe a barra do lote e inicia as atualizações periódicas (main thread)."""
+        self.batch_estimator = estimator
+        self.batch_progress.configure(value=0)
+        self.batch_progress_frame.grid(row=5, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+        self._tick_batch_progress(estimator)
+    
+    def _tick_batch_progress(self, estimator: ProgressEstimator):
+        # O ETA muda com o tempo mesmo sem arquivos concluídos
+        if estimator is not self.batch_estimator:
+            return
+        snapshot = estimator.snapshot()
+        self.batch_progress.configure(value=snapshot.fraction * 1000)
+        self.batch_progress_status.set(snapshot.describe())
+        try:
+            self.root.after(500, self._tick_batch_progress, estimator)
+        except tk.TclError:
+            # Janela foi fechada
+            pass
+    
+    def _finish_batch_progress(self):
+        """Última leitura do lote concluído; a barra fica com o resultado."""
+        estimator, self.batch_estimator = self.batch_estimator, None
+        if estimator is None:
+            return
+        snapshot = estimator.snapshot()
+        self.batch_progress.configure(value=snapshot.fraction * 1000)
+        self.batch_progress_status.set(snapshot.describe())
+    
+    def _finish_single_input(self, generation: int, file_path: str, is_collection: bool,
+                             entry: Optional[Tuple[float, Tuple[int, ...], Dict[str, Any]]], notify: bool):
+        """Aplica o resultado da carga (main thread), se ainda for a mais recente."""
+        if generation != self._input_load_generation:
+            return
+        self.conversion_progress.stop()
+        self.conversion_frame.grid_remove()
+        
+        if is_collection:
+            if entry is None:
+                self._log_to_console("❌ Falha na conversão\n")
+                if notify:
+                    messagebox.showerror("Erro", "Falha ao converter Postman Collection")
+                return
+            self.converted_specs = {file_path: entry}
+            self._log_to_console("✅ Conversão concluída (em memória)\n")
+            if notify:
+                messagebox.showinfo("Conversão", f"Postman Collection convertida para OpenAPI!\nArquivo: {Path(file_path).name}")
+        
+        self.input_file.set(file_path)
+        self._auto_name_output()
+        self._log_to_console(f"Arquivo carregado: {Path(file_path).name}\n")
+    
+    def _convert_collection(self, file_path: str, collection: Dict[str, Any], limits: ExampleLimits,
+                            progress=None, cancel: Optional[threading.Event] = None, diagnose: bool = False
+                            ) -> Optional[Tuple[float, Tuple[int, ...], Dict[str, Any]]]:
+        """Converte uma collection já carregada; retorna a entrada de converted_specs ou None.
+        ConversionCancelled é propagada."""
+        converter = PostmanToOpenAPIConverter(limits)
+        try:
+            with self._memory_tracked(f"Conversão de {Path(file_path).name}", diagnose):
+                spec = converter.convert_data(collection, progress=progress, cancel=cancel)
+            mtime = os.path.getmtime(file_path)
+        except ConversionCancelled:
+            raise
+        except Exception as e:
+            self.logger.error(f"Erro na conversão: {e}")
+            return None
+        
+        if converter.trim_report:
+            # Pode rodar no thread de trabalho: o relatório vai pela fila
+            self.log_queue.put(converter.trim_summary() + "\n")
+        return (mtime, limits.key(), spec)
+    
+    def _memory_diagnostics_enabled(self, options: Dict[str, Any]) -> bool:
+        """Diagnóstico de memória ligado nas opções; desligá-lo encerra a sessão do tracemalloc."""
+        if options.get("opt_memory_diagnostics"):
+            return True
+        if self.memory_diagnostics.active:
+            self.memory_diagnostics.stop()
+        return False
+    
+    def _memory_tracked(self, label: str, enabled: bool):
+        """Mede pico/retido do trecho com tracemalloc (registro vai para o console)."""
+        if not enabled:
+            return nullcontext()
+        return self.memory_diagnostics.track(
+            label, on_record=lambda record: self.log_queue.put(f"  🧠 {record.label}: {record.summary()}\n")
+        )
+    
+    def _replace_converted_spec(self, file_path: str, previous: Tuple[float, Tuple[int, ...], Dict[str, Any]],
+                                entry: Tuple[float, Tuple[int, ...], Dict[str, Any]]):
+        """Guarda a reconversão (main thread), se o arquivo carregado ainda for o mesmo."""
+        if self.converted_specs.get(file_path) is previous:
+            self.converted_specs = {file_path: entry}
+
+    def _converted_spec_for(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Spec convertido em memória para a collection (reconverte se o arquivo
+        ou os limites de exemplos mudaram). Roda no thread de geração: a
+        reconversão só é guardada via main thread."""
+        entry = self.converted_specs.get(file_path)
+        if entry is None:
+            return None
+        
+        mtime, limits_key, spec = entry
+        limits = ExampleLimits.from_options(options) if options is not None else ExampleLimits(*limits_key)
+        try:
+            if os.path.getmtime(file_path) != mtime or limits.key() != limits_key:
+                collection = PostmanToOpenAPIConverter().load_collection(file_path)
+                converted = self._convert_collection(file_path, collection, limits) if collection is not None else None
+                if converted is not None:
+                    spec = converted[2]
+                    self._post_to_ui(self._replace_converted_spec, file_path, entry, converted)
+        except OSError:
+            pass
+        return spec
+
     # --- Métodos de Atualização da GUI (Thread-safe) ---
 
     def _poll_log_queue(self):
@@ -562,22 +905,28 @@ class WiddershinsGUI:
             processed_items = 0
             max_items_per_poll = 10  # Limitar processamento por ciclo
             
-            while processed_items < max_items_per_poll:
-                try:
-                    line = self.log_queue.get_nowait()
-                    processed_items += 1
-                    
-                    if line == "DONE":
-                        self._handle_process_completion()
-                        break
-                    elif line == "BATCH_DONE":
-                        self._handle_batch_completion()
-                        break
-                    else:
-                        self._log_to_console(line)
+            with self.ui_monitor.measure("poll_log_queue"):
+                while processed_items < max_items_per_poll:
+                    try:
+                        line = self.log_queue.get_nowait()
+                        processed_items += 1
                         
-                except queue.Empty:
-                    break
+                        if isinstance(line, tuple):
+                            # Callback enviado por um thread de trabalho
+                            callback, args = line
+                            with self.ui_monitor.measure(getattr(callback, "__name__", "callback")):
+                                callback(*args)
+                        elif line == "DONE":
+                            self._handle_process_completion()
+                            break
+                        elif line == "BATCH_DONE":
+                            self._handle_batch_completion()
+                            break
+                        else:
+                            self._log_to_console(line)
+                            
+                    except queue.Empty:
+                        break
                     
             # Força atualização da UI de forma segura
             try:
@@ -597,6 +946,19 @@ class WiddershinsGUI:
                 # Widget foi destruído
                 pass
 
+    def _refresh_ui_status(self):
+        """Atualiza a leitura de responsividade (p50/p99/máx do atraso do event loop)."""
+        try:
+            self.ui_status.set(self.ui_monitor.status_text())
+            self.root.after(1000, self._refresh_ui_status)
+        except tk.TclError:
+            # Janela foi fechada
+            pass
+
+    def _post_to_ui(self, callback: callable, *args):
+        """Agenda a execução de um callback no main thread (via fila de logs)."""
+        self.log_queue.put((callback, args))
+
     def _set_console_state(self, state: str):
         """Habilita/Desabilita o console de saída."""
         try:
@@ -760,21 +1122,7 @@ class WiddershinsGUI:
     def _validate_flag(self, flag: str) -> bool:
         """Valida uma flag adicional."""
         try:
-            # Lista de flags permitidas (whitelist)
-            allowed_flags = {
-                '--maxHeadingDepth', '--shallow', '--verbose', '--help',
-                '--version', '--theme', '--search', '--includes'
-            }
-            
-            # Verificar se é uma flag conhecida ou um valor
-            if flag.startswith('--'):
-                flag_name = flag.split('=')[0]  # Remover valor se houver
-                return flag_name in allowed_flags
-            else:
-                # Valores devem ser seguros
-                dangerous_chars = {'&', '|', ';', '`', '$', '(', ')', '<', '>'}
-                return not any(char in flag for char in dangerous_chars)
-                
+            return is_allowed_flag(flag)
         except Exception:
             return False
     
@@ -791,6 +1139,7 @@ class WiddershinsGUI:
                 # Verificação rápida com cache
                 if deps_check.exists() and widdershins_bin.exists():
                     self.log_queue.put("✅ Widdershins pronto para uso\n")
+                    self._warm_up_widdershins_async()
                     return
                 
                 # Verificar se precisa instalar
@@ -809,6 +1158,7 @@ class WiddershinsGUI:
                         self.log_queue.put("📦 Instalando automaticamente...\n")
                         if self._install_node_dependencies():
                             deps_check.touch()
+                            self._warm_up_widdershins_async()
                     else:
                         self.log_queue.put("❌ npm não encontrado. Instale manualmente:\n")
                         self.log_queue.put("1. Instale Node.js de https://nodejs.org\n")
@@ -817,6 +1167,7 @@ class WiddershinsGUI:
                 else:
                     self.log_queue.put("✅ Dependências Node.js OK\n")
                     deps_check.touch()
+                    self._warm_up_widdershins_async()
                     
             except Exception as e:
                 self.logger.error(f"Erro ao verificar dependências: {e}")
@@ -830,10 +1181,23 @@ class WiddershinsGUI:
         if deps_check.exists() and widdershins_bin.exists():
             # Dependências já verificadas
             self._log_to_console("✅ Widdershins pronto\n")
+            self._warm_up_widdershins_async()
         else:
             # Precisa verificar
             threading.Thread(target=check_deps, daemon=True).start()
     
+    def _warm_up_widdershins_async(self):
+        """Renderização descartável em background: aquece o cache de compilação do Node e mede a primeira renderização."""
+        def warm():
+            try:
+                message = describe(warm_up(self._get_widdershins_path()))
+                self.logger.info(message.strip())
+                self.log_queue.put(message)
+            except Exception as e:
+                self.logger.error(f"Erro no aquecimento do Widdershins: {e}")
+        
+        threading.Thread(target=warm, daemon=True).start()
+    
     def _find_npm_command(self) -> Optional[str]:
         """Encontra o comando npm no sistema."""
         npm_commands = ["npm", "npm.cmd", "npm.exe"]
@@ -912,18 +1276,12 @@ class WiddershinsGUI:
     def _get_widdershins_path(self) -> str:
         """Determina o caminho para o executável Widdershins."""
         try:
-            # Primeiro, tentar Widdershins local
-            local_path = Path(__file__).parent / "node_modules" / ".bin" / "widdershins"
-            if sys.platform == "win32":
-                local_path = local_path.with_suffix(".cmd")
-            
-            if local_path.exists():
-                self.logger.info(f"Usando Widdershins local: {local_path}")
-                return str(local_path)
-            
-            # Fallback para Widdershins global
-            self.logger.info("Usando Widdershins global")
-            return "widdershins"
+            path = find_widdershins()
+            if path == "widdershins":
+                self.logger.info("Usando Widdershins global")
+            else:
+                self.logger.info(f"Usando Widdershins local: {path}")
+            return path
             
         except Exception as e:
             self.logger.error(f"Erro ao determinar caminho do Widdershins: {e}")
@@ -955,6 +1313,7 @@ class WiddershinsGUI:
     def _handle_batch_completion(self):
         """Manipula a conclusão do processamento em lote."""
         try:
+            self._finish_batch_progress()
             self.generate_button.config(text="🚀 Processar Lote", state=tk.NORMAL)
             
             # Verificar resultado
@@ -983,40 +1342,15 @@ class WiddershinsGUI:
             files = self.root.tk.splitlist(event.data)
             
             if self.batch_mode.get():
-                # Modo lote: adicionar todos os arquivosà lista
-                added_count = 0
-                for file_path in files:
-                    if self._validate_file_path(file_path) and file_path not in self.batch_files:
-                        self.batch_files.append(file_path)
-                        self.batch_listbox.insert(tk.END, Path(file_path).name)
-                        added_count += 1
-                
-                if added_count > 0:
-                    self._log_to_console(f"Adicionados {added_count} arquivos ao lote via drag & drop.\n")
+                # Modo lote: arquivos e pastas (varridas recursivamente) entram na lista
+                self._add_batch_paths(files, "drag & drop")
             else:
                 # Modo individual: usar apenas o primeiro arquivo
                 if files:
                     file_path = files[0]
                     if self._validate_file_path(file_path):
-                        # Verificar se é Postman Collection
-                        if self.postman_converter.is_postman_collection(file_path):
-                            self._log_to_console(f"📦 Postman Collection detectada: {Path(file_path).name}\n")
-                            self._log_to_console("🔄 Convertendo para OpenAPI...\n")
-                            
-                            # Criar arquivo temporário para conversão
-                            temp_file = Path(file_path).parent / f"{Path(file_path).stem}_openapi.json"
-                            
-                            if self.postman_converter.convert(file_path, str(temp_file)):
-                                self.input_file.set(str(temp_file))
-                                self._log_to_console(f"✅ Conversão concluída: {temp_file.name}\n")
-                            else:
-                                self._log_to_console("❌ Falha na conversão\n")
-                                return
-                        else:
-                            self.input_file.set(file_path)
-                        
-                        self._auto_name_output()
-                        self._log_to_console(f"Arquivo carregado: {Path(file_path).name}\n")
+                        # Detecção e conversão em background; um novo drop cancela a anterior
+                        self._load_single_input(file_path)
         except Exception as e:
             self.logger.error(f"Erro no drag and drop: {e}")
     
@@ -1026,34 +1360,109 @@ class WiddershinsGUI:
             input_path = self.input_file.get().strip()
             if input_path:
                 input_file = Path(input_path)
-                output_name = input_file.stem + "_docs.md"
+                # Collections convertidas mantêm o nome de antes (<nome>_openapi_docs.md)
+                stem = input_file.stem + ("_openapi" if input_path in self.converted_specs else "")
+                output_name = stem + "_docs.md"
                 output_path = input_file.parent / output_name
                 self.output_file.set(str(output_path))
         except Exception as e:
             self.logger.error(f"Erro ao auto-nomear saída: {e}")
     
-    def _build_language_tabs(self) -> List[str]:
-        """Constrói a lista de language tabs baseada nos checkboxes."""
-        tabs = []
-        
-        if self.lang_curl.get():
-            tabs.append("'shell:cURL'")
-        if self.lang_javascript.get():
-            tabs.append("'javascript:Node.js'")
-        if self.lang_python.get():
-            tabs.append("'python:Python'")
-        if self.lang_java.get():
-            tabs.append("'java:Java'")
-        if self.lang_go.get():
-            tabs.append("'go:Go'")
-        if self.lang_php.get():
-            tabs.append("'php:PHP'")
-        if self.lang_ruby.get():
-            tabs.append("'ruby:Ruby'")
-        if self.lang_csharp.get():
-            tabs.append("'csharp:C#'")
-            
-        return tabs
+    def _collect_options(self) -> Dict[str, Any]:
+        """Opções de geração atuais (mesmas chaves do config.json)."""
+        return {
+            "opt_code": self.opt_code.get(),
+            "opt_summary": self.opt_summary.get(),
+            "opt_omit_header": self.opt_omit_header.get(),
+            "opt_raw": self.opt_raw.get(),
+            "opt_resolve": self.opt_resolve.get(),
+            "opt_dereference": self.opt_dereference.get(),
+            "opt_gzip": self.opt_gzip.get(),
+            "opt_split_pages": self.opt_split_pages.get(),
+            "opt_split_services": self.opt_split_services.get(),
+            "opt_search_index": self.opt_search_index.get(),
+            "opt_memory_diagnostics": self.opt_memory_diagnostics.get(),
+            "opt_incremental": self.opt_incremental.get(),
+            "opt_exclude_deprecated": self.opt_exclude_deprecated.get(),
+            "opt_strip_extensions": self.opt_strip_extensions.get(),
+            "filter_include_tags": self.filter_include_tags.get().strip(),
+            "filter_exclude_tags": self.filter_exclude_tags.get().strip(),
+            "filter_include_paths": self.filter_include_paths.get().strip(),
+            "filter_exclude_paths": self.filter_exclude_paths.get().strip(),
+            "filter_methods": self.filter_methods.get().strip(),
+            "gzip_level": self._get_gzip_level(),
+            "example_max_kb": self._get_int(self.example_max_kb, ExampleLimits.DEFAULT_MAX_BYTES // 1024),
+            "example_max_items": self._get_int(self.example_max_items, ExampleLimits.DEFAULT_MAX_ITEMS),
+            "example_max_depth": self._get_int(self.example_max_depth, ExampleLimits.DEFAULT_MAX_DEPTH),
+            "example_max_chars": self._get_int(self.example_max_chars, ExampleLimits.DEFAULT_MAX_STRING),
+            "lang_curl": self.lang_curl.get(),
+            "lang_javascript": self.lang_javascript.get(),
+            "lang_python": self.lang_python.get(),
+            "lang_java": self.lang_java.get(),
+            "lang_go": self.lang_go.get(),
+            "lang_php": self.lang_php.get(),
+            "lang_ruby": self.lang_ruby.get(),
+            "lang_csharp": self.lang_csharp.get(),
+            "user_templates": self.user_templates.get().strip(),
+            "environment_file": self.environment_file.get().strip(),
+            "metrics_file": self.metrics_file.get().strip(),
+            "other_flags": self.other_flags.get().strip()
+        }
+    
+    def _get_gzip_level(self) -> int:
+        """Nível de compressão do Spinbox (o campo aceita texto livre)."""
+        try:
+            return min(9, max(1, int(self.gzip_level.get())))
+        except (tk.TclError, ValueError):
+            return DEFAULT_LEVEL
+    
+    def _get_int(self, var: tk.IntVar, default: int) -> int:
+        """Valor inteiro não negativo de um Spinbox (o campo aceita texto livre)."""
+        try:
+            return max(0, int(var.get()))
+        except (tk.TclError, ValueError):
+            return default
+    
+    def _apply_options(self, config: Dict[str, Any]):
+        """Aplica opções de geração vindas de um config.json."""
+        self.opt_code.set(config.get("opt_code", True))
+        self.opt_summary.set(config.get("opt_summary", True))
+        self.opt_omit_header.set(config.get("opt_omit_header", False))
+        self.opt_raw.set(config.get("opt_raw", False))
+        self.opt_resolve.set(config.get("opt_resolve", False))
+        self.opt_dereference.set(config.get("opt_dereference", False))
+        self.opt_gzip.set(config.get("opt_gzip", False))
+        self.opt_split_pages.set(config.get("opt_split_pages", False))
+        self.opt_split_services.set(config.get("opt_split_services", False))
+        self.opt_search_index.set(config.get("opt_search_index", False))
+        self.opt_memory_diagnostics.set(config.get("opt_memory_diagnostics", False))
+        self.opt_incremental.set(config.get("opt_incremental", False))
+        self.opt_exclude_deprecated.set(config.get("opt_exclude_deprecated", False))
+        self.opt_strip_extensions.set(config.get("opt_strip_extensions", False))
+        for key in ("filter_include_tags", "filter_exclude_tags", "filter_include_paths",
+                    "filter_exclude_paths", "filter_methods"):
+            value = config.get(key, "")
+            getattr(self, key).set(", ".join(value) if isinstance(value, list) else value)
+        self.gzip_level.set(config.get("gzip_level", DEFAULT_LEVEL))
+        self.example_max_kb.set(config.get("example_max_kb", ExampleLimits.DEFAULT_MAX_BYTES // 1024))
+        self.example_max_items.set(config.get("example_max_items", ExampleLimits.DEFAULT_MAX_ITEMS))
+        self.example_max_depth.set(config.get("example_max_depth", ExampleLimits.DEFAULT_MAX_DEPTH))
+        self.example_max_chars.set(config.get("example_max_chars", ExampleLimits.DEFAULT_MAX_STRING))
+        
+        # Linguagens
+        self.lang_curl.set(config.get("lang_curl", True))
+        self.lang_javascript.set(config.get("lang_javascript", True))
+        self.lang_python.set(config.get("lang_python", True))
+        self.lang_java.set(config.get("lang_java", False))
+        self.lang_go.set(config.get("lang_go", False))
+        self.lang_php.set(config.get("lang_php", False))
+        self.lang_ruby.set(config.get("lang_ruby", False))
+        self.lang_csharp.set(config.get("lang_csharp", False))
+        
+        self.user_templates.set(config.get("user_templates", ""))
+        self.environment_file.set(config.get("environment_file", ""))
+        self.metrics_file.set(config.get("metrics_file", ""))
+        self.other_flags.set(config.get("other_flags", ""))
     
     def _apply_preset(self, event=None):
         """Aplica um preset de configuração."""
@@ -1098,22 +1507,8 @@ class WiddershinsGUI:
                 "output_file": self.output_file.get(),
                 "batch_mode": self.batch_mode.get(),
                 "batch_output_dir": self.batch_output_dir.get(),
-                "opt_code": self.opt_code.get(),
-                "opt_summary": self.opt_summary.get(),
-                "opt_omit_header": self.opt_omit_header.get(),
-                "opt_raw": self.opt_raw.get(),
-                "opt_resolve": self.opt_resolve.get(),
-                "lang_curl": self.lang_curl.get(),
-                "lang_javascript": self.lang_javascript.get(),
-                "lang_python": self.lang_python.get(),
-                "lang_java": self.lang_java.get(),
-                "lang_go": self.lang_go.get(),
-                "lang_php": self.lang_php.get(),
-                "lang_ruby": self.lang_ruby.get(),
-                "lang_csharp": self.lang_csharp.get(),
-                "user_templates": self.user_templates.get(),
-                "environment_file": self.environment_file.get(),
-                "other_flags": self.other_flags.get()
+                "batch_merge": self.batch_merge.get(),
+                **self._collect_options()
             }
             
             with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -1135,25 +1530,8 @@ class WiddershinsGUI:
                 self.output_file.set(config.get("output_file", ""))
                 self.batch_mode.set(config.get("batch_mode", False))
                 self.batch_output_dir.set(config.get("batch_output_dir", ""))
-                self.opt_code.set(config.get("opt_code", True))
-                self.opt_summary.set(config.get("opt_summary", True))
-                self.opt_omit_header.set(config.get("opt_omit_header", False))
-                self.opt_raw.set(config.get("opt_raw", False))
-                self.opt_resolve.set(config.get("opt_resolve", False))
-                
-                # Carregar configurações de linguagem
-                self.lang_curl.set(config.get("lang_curl", True))
-                self.lang_javascript.set(config.get("lang_javascript", True))
-                self.lang_python.set(config.get("lang_python", True))
-                self.lang_java.set(config.get("lang_java", False))
-                self.lang_go.set(config.get("lang_go", False))
-                self.lang_php.set(config.get("lang_php", False))
-                self.lang_ruby.set(config.get("lang_ruby", False))
-                self.lang_csharp.set(config.get("lang_csharp", False))
-                
-                self.user_templates.set(config.get("user_templates", ""))
-                self.environment_file.set(config.get("environment_file", ""))
-                self.other_flags.set(config.get("other_flags", ""))
+                self.batch_merge.set(config.get("batch_merge", False))
+                self._apply_options(config)
                 
                 # Aplicar modo lote se necessário
                 if self.batch_mode.get():
@@ -1177,25 +1555,8 @@ class WiddershinsGUI:
                 self.output_file.set(config.get("output_file", ""))
                 self.batch_mode.set(config.get("batch_mode", False))
                 self.batch_output_dir.set(config.get("batch_output_dir", ""))
-                self.opt_code.set(config.get("opt_code", True))
-                self.opt_summary.set(config.get("opt_summary", True))
-                self.opt_omit_header.set(config.get("opt_omit_header", False))
-                self.opt_raw.set(config.get("opt_raw", False))
-                self.opt_resolve.set(config.get("opt_resolve", False))
-                
-                # Linguagens
-                self.lang_curl.set(config.get("lang_curl", True))
-                self.lang_javascript.set(config.get("lang_javascript", True))
-                self.lang_python.set(config.get("lang_python", True))
-                self.lang_java.set(config.get("lang_java", False))
-                self.lang_go.set(config.get("lang_go", False))
-                self.lang_php.set(config.get("lang_php", False))
-                self.lang_ruby.set(config.get("lang_ruby", False))
-                self.lang_csharp.set(config.get("lang_csharp", False))
-                
-                self.user_templates.set(config.get("user_templates", ""))
-                self.environment_file.set(config.get("environment_file", ""))
-                self.other_flags.set(config.get("other_flags", ""))
+                self.batch_merge.set(config.get("batch_merge", False))
+                self._apply_options(config)
                 
                 # Aplicar modo lote se necessário
                 if self.batch_mode.get():
@@ -1229,19 +1590,62 @@ class WiddershinsGUI:
         try:
             files = filedialog.askopenfilenames(
                 title="Selecionar Arquivos OpenAPI/Postman",
-                filetypes=[("OpenAPI/Postman", "*.json *.yaml *.yml"), ("JSON", "*.json"), ("YAML", "*.yaml *.yml"), ("Todos", "*.*")]
+                filetypes=[("OpenAPI/Postman", "*.json *.yaml *.yml"), ("JSON", "*.json"), ("YAML", "*.yaml *.yml"),
+                           ("Compactados", "*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz"), ("Todos", "*.*")]
             )
             
-            for file in files:
-                if self._validate_file_path(file) and file not in self.batch_files:
-                    self.batch_files.append(file)
-                    self.batch_listbox.insert(tk.END, Path(file).name)
-            
-            self._log_to_console(f"Adicionados {len(files)} arquivos ao lote.\n")
+            if files:
+                self._add_batch_paths(files, "seleção")
         except Exception as e:
             self.logger.error(f"Erro ao selecionar arquivos em lote: {e}")
             messagebox.showerror("Erro", f"Erro ao selecionar arquivos: {e}")
     
+    def _browse_batch_directory(self):
+        """Adiciona ao lote os specs de uma pasta (recursivo, com os globs de inclusão/exclusão)."""
+        try:
+            directory = filedialog.askdirectory(title="Selecionar Pasta com Specs")
+            if directory:
+                self._add_batch_paths([directory], "pasta")
+        except Exception as e:
+            self.logger.error(f"Erro ao selecionar pasta do lote: {e}")
+            messagebox.showerror("Erro", f"Erro ao selecionar pasta: {e}")
+    
+    def _add_batch_paths(self, paths: List[str], origin: str):
+        """Varre arquivos/pastas em um thread de trabalho; os resultados chegam em blocos."""
+        include = parse_patterns(self.batch_include.get()) or list(DEFAULT_INCLUDE)
+        exclude = parse_patterns(self.batch_exclude.get())
+        
+        cancel, generation = self._discovery_cancel, self._discovery_generation
+        counter = {"added": 0}
+        self._log_to_console(f"🔎 Procurando specs ({origin})...\n")
+        
+        def run():
+            try:
+                valid = [path for path in paths
+                         if self._validate_file_path(path) or self._validate_directory_path(path)]
+                found = discover_in_chunks(
+                    valid, lambda chunk: self._post_to_ui(self._add_discovered_chunk, generation, chunk, counter),
+                    include, exclude, cancel
+                )
+            except Exception as e:
+                self.logger.error(f"Erro ao procurar specs: {e}")
+                found = 0
+            self._post_to_ui(self._finish_discovery, generation, found, counter)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _add_discovered_chunk(self, generation: int, chunk: List[Tuple[str, str]], counter: Dict[str, int]):
+        """Adiciona um bloco da varredura (main thread): deduplicação O(1); a lista redesenha só a área visível."""
+        if generation != self._discovery_generation:
+            return
+        counter["added"] += len(self.batch_files.extend(chunk))
+    
+    def _finish_discovery(self, generation: int, found: int, counter: Dict[str, int]):
+        if generation != self._discovery_generation:
+            return
+        self._log_to_console(f"Adicionados {counter['added']} arquivos ao lote "
+                             f"({found} encontrados, total: {len(self.batch_files)}).\n")
+    
     def _browse_batch_output(self):
         """Seleciona pasta de saída para conversão em lote."""
         try:
@@ -1252,10 +1656,26 @@ class WiddershinsGUI:
             self.logger.error(f"Erro ao selecionar pasta de saída: {e}")
             messagebox.showerror("Erro", f"Erro ao selecionar pasta: {e}")
     
+    def _browse_batch_output_archive(self):
+        """Seleciona um pacote .zip/.tar como saída do lote."""
+        try:
+            file = filedialog.asksaveasfilename(
+                title="Salvar Documentação em Pacote",
+                defaultextension=".zip",
+                filetypes=[("ZIP", "*.zip"), ("TAR.GZ", "*.tar.gz"), ("TAR", "*.tar")]
+            )
+            if file:
+                self.batch_output_dir.set(file)
+        except Exception as e:
+            self.logger.error(f"Erro ao selecionar pacote de saída: {e}")
+            messagebox.showerror("Erro", f"Erro ao selecionar arquivo: {e}")
+    
     def _clear_batch_files(self):
         """Limpa a lista de arquivos em lote."""
+        self._discovery_cancel.set()
+        self._discovery_cancel = threading.Event()
+        self._discovery_generation += 1
         self.batch_files.clear()
-        self.batch_listbox.delete(0, tk.END)
         self._log_to_console("Lista de arquivos limpa.\n")
     
     def _validate_batch_inputs(self) -> bool:
@@ -1270,8 +1690,10 @@ class WiddershinsGUI:
                 messagebox.showerror("Erro", "Selecione uma pasta de saída para o lote.")
                 return False
             
-            # Criar pasta se não existir
+            # Criar pasta se não existir (para um pacote de saída, a pasta onde ele fica)
             output_path = Path(output_dir)
+            if is_archive(output_dir):
+                output_path = output_path.parent
             if not output_path.exists():
                 try:
                     output_path.mkdir(parents=True, exist_ok=True)
@@ -1285,66 +1707,147 @@ class WiddershinsGUI:
             messagebox.showerror("Erro", f"Erro ao validar lote: {e}")
             return False
     
-    def _run_batch_process(self):
+    def _run_batch_process(self, options: Dict[str, Any]):
         """Executa conversão em lote."""
         try:
-            total_files = len(self.batch_files)
+            # Cópia: a lista pode continuar crescendo enquanto o lote roda
+            batch_files = list(self.batch_files)
+            total_files = len(batch_files)
             success_count = 0
+            unchanged_count = 0
             error_count = 0
+            output_dir = Path(self.batch_output_dir.get())
+            # Pasta de saída terminada em .zip/.tar(.gz): tudo vai direto para um único pacote
+            archive_output = is_archive(str(output_dir))
             
             self.log_queue.put(f"Processando {total_files} arquivos...\n")
+            self.sidecar_writer.begin()
+            if archive_output and (options.get("opt_split_pages") or options.get("opt_search_index") or options.get("opt_gzip")):
+                self.log_queue.put("⚠️ Páginas, índice de busca e .gz não são gerados na saída compactada\n")
             
-            for i, input_file in enumerate(self.batch_files, 1):
-                try:
-                    self.log_queue.put(f"[{i}/{total_files}] Processando: {Path(input_file).name}\n")
+            diagnose = self._memory_diagnostics_enabled(options)
+            with ExitStack() as archive_stack, exported_run(options.get("metrics_file"), "batch", queued=total_files, log=self.log_queue.put) as metrics:
+                # Membros de pacotes são lidos sob demanda, sem extração
+                archives = archive_stack.enter_context(ArchiveSet())
+                member_resolver = ArchiveRefResolver(archives)
+                writer = archive_stack.enter_context(ArchiveWriter(str(output_dir))) if archive_output else None
+                # Nomes já usados na pasta de saída neste lote (o pacote controla os próprios)
+                output_names = set()
+                # Custo de cada arquivo (tamanho, operações, Postman e histórico) para a barra e o ETA
+                estimator = ProgressEstimator(estimate_costs(batch_files, self.run_history, options, archives))
+                estimated = estimator.snapshot().eta
+                self._post_to_ui(self._show_batch_progress, estimator)
+                self.log_queue.put(f"⏱️ Tempo estimado: ~{format_duration(estimated)}\n")
+                for i, input_file in enumerate(batch_files, 1):
+                    with metrics.active(), self._memory_tracked(Path(input_file).name, diagnose):
+                        errors_before = error_count
+                        started = time.perf_counter()
+                        estimator.start(input_file)
+                        try:
+                            self.log_queue.put(f"[{i}/{total_files}] Processando: {Path(input_file).name}\n")
+                            self.batch_files.post(input_file, STATE_CONVERTING)
                     
-                    # Verificar se é Postman Collection
-                    processed_file = input_file
-                    if self.postman_converter.is_postman_collection(input_file):
-                        self.log_queue.put(f"  📦 Convertendo Postman Collection...\n")
-                        temp_file = Path(input_file).parent / f"{Path(input_file).stem}_openapi.json"
-                        
-                        if self.postman_converter.convert(input_file, str(temp_file)):
-                            processed_file = str(temp_file)
-                            self.log_queue.put(f"  ✅ Conversão concluída\n")
-                        else:
-                            self.log_queue.put(f"  ❌ Falha na conversão\n")
-                            error_count += 1
-                            continue
+                            # Postman convertido em memória / $refs resolvidos (cache compartilhado pelo lote)
+                            try:
+                                with metrics.timed("conversion_seconds"), self._memory_tracked("conversão", diagnose):
+                                    if is_member_path(input_file):
+                                        spec, output_stem = prepare_member(input_file, options, archives, member_resolver, log=self.log_queue.put)
+                                    else:
+                                        spec, output_stem = prepare_spec(input_file, options, self.ref_resolver, log=self.log_queue.put)
+                            except Exception as e:
+                                self.log_queue.put(f"  ❌ Falha na conversão: {e}\n")
+                                self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, str(e))
+                                error_count += 1
+                                continue
                     
-                    # Gerar nome de saída
-                    output_name = Path(processed_file).stem + "_docs.md"
-                    output_file = Path(self.batch_output_dir.get()) / output_name
+                            # Pular arquivos inválidos antes de iniciar o Node (resultado em cache)
+                            if spec is not None:
+                                validation = validate_document(spec, input_file)
+                            else:
+                                validation = validate_file(input_file, self.validation_cache)
+                            if not validation.is_valid:
+                                self.log_queue.put(f"  ❌ Spec inválido ({len(validation.errors)} erros), ignorado:\n")
+                                for issue in validation.errors[:5]:
+                                    self.log_queue.put(f"     - {issue}\n")
+                                self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, "spec inválido")
+                                error_count += 1
+                                continue
                     
-                    # Construir comando
-                    command = self._build_batch_command(processed_file, str(output_file))
+                            # Gerar nome de saída (pastas varridas repetem nomes: svc-a/openapi.yaml, svc-b/openapi.yaml)
+                            output_name = output_stem + "_docs.md"
+                            if writer is None:
+                                output_name = unique_name(output_name, output_names)
+                                if output_name != output_stem + "_docs.md":
+                                    self.log_queue.put(f"  ⚠️ Nome de saída repetido no lote, gravando como {output_name}\n")
+                            output_file = output_dir / output_name
                     
-                    # Executar widdershins
-                    result = subprocess.run(
-                        command,
-                        capture_output=True,
-                        text=True,
-                        timeout=120,
-                        shell=False
-                    )
+                            # Executar widdershins (spec em memória quando houver)
+                            self.batch_files.post(input_file, STATE_RENDERING)
+                            command = self._build_batch_command(input_file, None if writer else str(output_file), options)
+                            with metrics.timed("render_seconds"):
+                                if incremental_enabled(options) and writer is None:
+                                    result = render_incremental(command, spec, input_file, log=self.log_queue.put)
+                                else:
+                                    result = run_widdershins(command, spec)
+                            if writer is not None and result.returncode == 0:
+                                # Markdown do stdout direto para o pacote, sem arquivo intermediário
+                                requested_name = output_name
+                                output_name = writer.add(output_name, stdout_markdown(result.stdout))
+                                if output_name != requested_name:
+                                    self.log_queue.put(f"  ⚠️ Nome de saída repetido no lote, gravando como {output_name}\n")
+                                output_file = Path(join_member(str(output_dir), output_name))
+                                result.output_changed = True
+                            self._record_run("batch", input_file, str(output_file), options, result)
                     
-                    if result.returncode == 0:
-                        self.log_queue.put(f"  ✅ Sucesso: {output_name}\n")
-                        success_count += 1
-                    else:
-                        self.log_queue.put(f"  ❌ Erro: {result.stderr}\n")
-                        error_count += 1
+                            if result.returncode == 0:
+                                if result.output_changed is False:
+                                    self.log_queue.put(f"  ✅ Sucesso (inalterado): {output_name}\n")
+                                    unchanged_count += 1
+                                    metrics.inc("cache_hits_total")
+                                else:
+                                    self.log_queue.put(f"  ✅ Sucesso: {output_name}\n")
+                                if writer is None:
+                                    self._post_process(str(output_file), result.output_changed, options, input_file, spec)
+                                state = STATE_CACHED if result.output_changed is False else STATE_DONE
+                                self.batch_files.post(input_file, state, time.perf_counter() - started)
+                                success_count += 1
+                            else:
+                                self.log_queue.put(f"  ❌ Erro: {result.stderr}\n")
+                                self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, result.stderr.strip())
+                                error_count += 1
                         
-                except Exception as e:
-                    self.log_queue.put(f"  ❌ Erro: {e}\n")
-                    error_count += 1
+                        except Exception as e:
+                            self.log_queue.put(f"  ❌ Erro: {e}\n")
+                            self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, str(e))
+                            error_count += 1
+                        finally:
+                            # Falhas não recalibram as estimativas
+                            estimator.finish(input_file, time.perf_counter() - started, measured=error_count == errors_before)
+                            metrics.inc("files_processed_total")
+                            metrics.inc("failures_total", error_count - errors_before)
             
             # Relatório final
             self.log_queue.put(f"\n{'-'*30}\n")
             self.log_queue.put(f"RELATÓRIO FINAL:\n")
             self.log_queue.put(f"Total: {total_files} arquivos\n")
+            self.log_queue.put(f"Tempo: {format_duration(estimator.snapshot().elapsed)} (estimado: ~{format_duration(estimated)})\n")
             self.log_queue.put(f"Sucessos: {success_count}\n")
+            self.log_queue.put(f"Inalterados: {unchanged_count}\n")
+            if writer is not None:
+                self.log_queue.put(f"📦 {writer.count} documentos gravados em {output_dir.name}\n")
+            if gzip_level(options) is not None:
+                sidecars = self.sidecar_writer.wait()
+                self.log_queue.put(f"Sidecars .gz gravados: {sidecars['written']}\n")
+                for error in sidecars["errors"]:
+                    self.log_queue.put(f"  ⚠️ Falha no sidecar: {error}\n")
             self.log_queue.put(f"Erros: {error_count}\n")
+            if options.get("opt_resolve"):
+                stats = self.ref_resolver.stats
+                self.log_queue.put(f"Cache de $refs: {stats['cache_hits']} acertos, {stats['documents_loaded']} documentos lidos\n")
+            if diagnose:
+                self._memory_batches += 1
+                for line in self.memory_diagnostics.checkpoint(f"lote_{self._memory_batches}"):
+                    self.log_queue.put(line + "\n")
             
             if error_count == 0:
                 self.log_queue.put("\n✅ LOTE PROCESSADO COM SUCESSO!\n")
@@ -1357,96 +1860,394 @@ class WiddershinsGUI:
         finally:
             self.log_queue.put("BATCH_DONE")
     
-    def _build_batch_command(self, input_file: str, output_file: str) -> List[str]:
-        """Constrói comando para um arquivo do lote."""
+    def _run_merge_process(self, options: Dict[str, Any]):
+        """Combina os arquivos do lote e renderiza um único documento."""
         try:
-            widdershins_path = self._get_widdershins_path()
-            command = [widdershins_path, input_file, '-o', output_file]
+            batch_files = list(self.batch_files)
+            if is_archive(self.batch_output_dir.get()):
+                self.log_queue.put("\n❌ ERRO CRÍTICO NO LOTE: combinar em um documento requer uma pasta de saída\n")
+                return
+            output_file = Path(self.batch_output_dir.get()) / MERGED_OUTPUT
+            started = time.perf_counter()
+            failed = []
             
-            # Aplicar mesmas opções do modo individual
-            boolean_options = {
-                self.opt_code.get(): '--code',
-                self.opt_summary.get(): '--summary',
-                self.opt_omit_header.get(): '--omitHeader',
-                self.opt_raw.get(): '--raw',
-                self.opt_resolve.get(): '--resolve'
-            }
+            def on_file(input_file: str, error: Optional[str]):
+                if error is not None:
+                    failed.append(input_file)
+                    self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, error)
+                else:
+                    self.batch_files.post(input_file, STATE_RENDERING)
             
-            for condition, flag in boolean_options.items():
-                if condition:
-                    command.append(flag)
+            self.log_queue.put(f"Combinando {len(batch_files)} arquivos em {output_file.name}...\n")
+            result = render_merged(batch_files, str(output_file), options, self._get_widdershins_path(),
+                                   self.ref_resolver, self.log_queue.put,
+                                   split_services=options.get("opt_split_services", False),
+                                   on_file=on_file, sidecars=self.sidecar_writer)
+            self._record_run("merge", batch_files[0], str(output_file), options, result)
             
-            # Language tabs
-            lang_tabs = self._build_language_tabs()
-            if lang_tabs:
-                command.append('--language_tabs')
-                command.extend(lang_tabs)
+            merged = [input_file for input_file in batch_files if input_file not in failed]
+            if result.returncode != 0:
+                self.log_queue.put(f"  ❌ Erro: {result.stderr}\n")
+                for input_file in merged:
+                    self.batch_files.post(input_file, STATE_FAILED, time.perf_counter() - started, result.stderr.strip())
+                self.log_queue.put("\n⚠️ LOTE CONCLUÍDO COM ERROS\n")
+                return
             
-            return command
+            state = STATE_CACHED if result.output_changed is False else STATE_DONE
+            for input_file in merged:
+                self.batch_files.post(input_file, state, time.perf_counter() - started)
+            self.log_queue.put(f"  ✅ Sucesso{' (inalterado)' if result.output_changed is False else ''}: {output_file.name}\n")
+            if failed:
+                self.log_queue.put(f"\n⚠️ LOTE CONCLUÍDO COM {len(failed)} ERROS\n")
+            else:
+                self.log_queue.put("\n✅ LOTE PROCESSADO COM SUCESSO!\n")
+        
+        except SpecMergeError as e:
+            self.log_queue.put(f"\n❌ ERRO CRÍTICO NO LOTE: {e}\n")
+        except Exception as e:
+            self.logger.error(f"Erro ao combinar specs: {e}")
+            self.log_queue.put(f"\n❌ ERRO CRÍTICO NO LOTE: {e}\n")
+        finally:
+            self.log_queue.put("BATCH_DONE")
+    
+    def _build_from_manifest(self):
+        """Seleciona um manifesto de projeto e reconstrói apenas os alvos desatualizados."""
+        try:
+            manifest_file = filedialog.askopenfilename(
+                title="Selecionar Manifesto do Projeto",
+                filetypes=[("Manifesto", "*.json *.yaml *.yml"), ("Todos", "*.*")]
+            )
+            if not manifest_file or not self._validate_file_path(manifest_file):
+                return
+
+            self._set_console_state(tk.NORMAL)
+            self.console_output.delete("1.0", tk.END)
+            self._log_to_console(f"Build por manifesto: {Path(manifest_file).name}\n{'-'*30}\n")
+            self._set_console_state(tk.DISABLED)
+
+            self.generate_button.config(text="Processando Manifesto...", state=tk.DISABLED)
+
+            threading.Thread(
+                target=self._run_manifest_build,
+                args=(manifest_file,),
+                daemon=True
+            ).start()
+        except Exception as e:
+            self.logger.error(f"Erro ao iniciar build por manifesto: {e}")
+            messagebox.showerror("Erro", f"Erro ao iniciar build: {e}")
+
+    def _run_manifest_build(self, manifest_file: str):
+        """Executa o build do manifesto (thread de trabalho)."""
+        try:
+            builder = ManifestBuilder(manifest_file, log=self.log_queue.put, widdershins_path=self._get_widdershins_path(),
+                                      history=self.run_history,
+                                      on_progress=lambda estimator: self._post_to_ui(self._show_batch_progress, estimator))
+            summary = builder.run()
+
+            if summary["failed"] == 0:
+                self.log_queue.put("\n✅ LOTE PROCESSADO COM SUCESSO!\n")
+            else:
+                self.log_queue.put(f"\n⚠️ LOTE CONCLUÍDO COM {summary['failed']} ERROS\n")
+
+        except (ManifestError, OSError, ValueError) as e:
+            self.log_queue.put(f"\n❌ ERRO CRÍTICO NO LOTE: {e}\n")
+        except Exception as e:
+            self.logger.error(f"Erro no build por manifesto: {e}")
+            self.log_queue.put(f"\n❌ ERRO CRÍTICO NO LOTE: {e}\n")
+        finally:
+            self.log_queue.put("BATCH_DONE")
+
+    def _post_process(self, output_file: str, output_changed: Optional[bool], options: Dict[str, Any],
+                      input_file: str, spec: Optional[Dict[str, Any]]):
+        """Páginas, índice de busca e sidecar .gz da saída (thread de trabalho)."""
+        try:
+            return post_process(output_file, output_changed, options, input_file, spec,
+                                log=self.log_queue.put, sidecars=self.sidecar_writer)
+        except Exception as e:
+            self.logger.error(f"Erro no pós-processamento: {e}")
+            self.log_queue.put(f"  ⚠️ Falha no pós-processamento da saída: {e}\n")
+            return None
+
+    def _log_sidecar_result(self, future):
+        """Loga o sidecar gerado em background (chamado no thread do executor)."""
+        try:
+            self.log_queue.put(f"\n🗜️ Sidecar gravado: {Path(future.result()).name}\n")
+        except OSError as e:
+            self.log_queue.put(f"\n⚠️ Falha ao gravar sidecar .gz: {e}\n")
+
+    def _record_run(self, mode: str, input_file: str, output_file: str, options: Dict[str, Any], result: RenderProcess):
+        """Registra a execução no histórico (falhas no registro não afetam a geração)."""
+        if self.run_history is None:
+            return
+        try:
+            self.run_history.record_run(mode, input_file, output_file, options, self._get_widdershins_path(), result)
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar execução no histórico: {e}")
+
+    def _show_run_history(self):
+        """Mostra o relatório de regressões e as últimas execuções."""
+        if self.run_history is None:
+            messagebox.showwarning("Histórico", "O histórico de execuções não está disponível.")
+            return
+        
+        try:
+            report = self.run_history.report()
+        except Exception as e:
+            self.logger.error(f"Erro ao gerar relatório do histórico: {e}")
+            messagebox.showerror("Erro", f"Erro ao ler o histórico: {e}")
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("📈 Histórico de Execuções")
+        window.geometry("800x450")
+        
+        text = ScrolledText(window, wrap=tk.NONE, font=('Consolas', 9))
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert("1.0", report)
+        text.configure(state=tk.DISABLED)
+
+    def _build_batch_command(self, input_file: str, output_file: Optional[str], options: Dict[str, Any]) -> List[str]:
+        """Constrói comando para um arquivo do lote (mesmas opções do modo individual).
+        Sem output_file o Markdown vai para o stdout (saída compactada)."""
+        try:
+            return build_command(self._get_widdershins_path(), input_file, output_file, options)
         except Exception as e:
             self.logger.error(f"Erro ao construir comando do lote: {e}")
             raise
     
     def _preview_file(self):
-        """Mostra preview do arquivo OpenAPI."""
+        """Mostra preview paginado do arquivo OpenAPI (mmap + índice de linhas)."""
         try:
             input_file = self.input_file.get().strip()
             if not input_file or not Path(input_file).exists():
                 messagebox.showwarning("Aviso", "Selecione um arquivo OpenAPI válido primeiro.")
                 return
             
+            # Índice de linhas construído em background
+            index = LineIndex(input_file)
+            index.start()
+            
             # Janela de preview
             preview_window = tk.Toplevel(self.root)
             preview_window.title(f"Preview: {Path(input_file).name}")
-            preview_window.geometry("600x400")
+            preview_window.geometry("1000x600")
             
-            text_widget = ScrolledText(preview_window, wrap=tk.WORD)
-            text_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            toolbar = ttk.Frame(preview_window, padding="5")
+            toolbar.pack(fill=tk.X)
             
-            # Ler e mostrar conteúdo
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Limitar a 10000 caracteres para performance
-                if len(content) > 10000:
-                    content = content[:10000] + "\n\n... (arquivo truncado para preview)"
-                text_widget.insert(tk.END, content)
+            line_var = tk.StringVar()
+            search_var = tk.StringVar()
+            status_var = tk.StringVar()
             
-            text_widget.config(state=tk.DISABLED)
+            panes = ttk.PanedWindow(preview_window, orient=tk.HORIZONTAL)
+            panes.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+            
+            # Outline (paths/métodos ou pastas/requests), expandido sob demanda
+            outline_tree = ttk.Treeview(panes, show="tree", selectmode="browse")
+            outline_tree.insert("", tk.END, text="⏳ Indexando outline...")
+            panes.add(outline_tree, weight=1)
+            
+            view = PagedTextView(panes, index, font=('Consolas', 9))
+            panes.add(view, weight=3)
+            
+            outline_nodes: Dict[str, OutlineNode] = {}
+            outline_cancel = threading.Event()
+            outline_tree.bind("<<TreeviewOpen>>", lambda e: self._expand_outline_node(outline_tree, outline_nodes))
+            outline_tree.bind("<<TreeviewSelect>>", lambda e: self._outline_jump(outline_tree, outline_nodes, view, status_var))
+            threading.Thread(
+                target=self._build_preview_outline,
+                args=(input_file, outline_tree, outline_nodes, outline_cancel),
+                daemon=True
+            ).start()
+            
+            ttk.Label(toolbar, text="Linha:").pack(side=tk.LEFT)
+            line_entry = ttk.Entry(toolbar, textvariable=line_var, width=10)
+            line_entry.pack(side=tk.LEFT, padx=5)
+            ttk.Button(toolbar, text="Ir", command=lambda: self._preview_goto_line(view, line_var)).pack(side=tk.LEFT)
+            
+            ttk.Label(toolbar, text="Buscar:").pack(side=tk.LEFT, padx=(15, 0))
+            search_entry = ttk.Entry(toolbar, textvariable=search_var, width=30)
+            search_entry.pack(side=tk.LEFT, padx=5)
+            search_state = {"offset": 0, "generation": 0}
+            ttk.Button(toolbar, text="Próximo", command=lambda: self._preview_search(view, search_var, search_state, status_var)).pack(side=tk.LEFT)
+            
+            ttk.Label(toolbar, textvariable=status_var).pack(side=tk.RIGHT)
+            
+            line_entry.bind("<Return>", lambda e: self._preview_goto_line(view, line_var))
+            search_entry.bind("<Return>", lambda e: self._preview_search(view, search_var, search_state, status_var))
+            
+            def update_status():
+                try:
+                    if index.complete:
+                        status_var.set(f"{index.line_count:,} linhas")
+                    else:
+                        percent = index.indexed_bytes * 100 // max(1, index.size)
+                        status_var.set(f"Indexando... {percent}% ({index.line_count:,} linhas)")
+                        preview_window.after(250, update_status)
+                except tk.TclError:
+                    pass
+            
+            def on_close():
+                outline_cancel.set()
+                index.close()
+                preview_window.destroy()
+            
+            preview_window.protocol("WM_DELETE_WINDOW", on_close)
+            update_status()
             
         except Exception as e:
             self.logger.error(f"Erro no preview: {e}")
             messagebox.showerror("Erro", f"Erro ao mostrar preview: {e}")
     
+    def _build_preview_outline(self, input_file: str, tree: ttk.Treeview, nodes: Dict[str, OutlineNode], cancel: threading.Event):
+        """Varre o arquivo e monta o índice do outline (roda no thread de trabalho)."""
+        try:
+            root = build_outline(input_file, cancel)
+        except Exception as e:
+            self.logger.error(f"Erro ao montar outline: {e}")
+            root = OutlineNode("", "document", 0)
+        if not cancel.is_set():
+            self._post_to_ui(self._populate_outline, tree, nodes, root)
+    
+    def _populate_outline(self, tree: ttk.Treeview, nodes: Dict[str, OutlineNode], root: OutlineNode):
+        """Insere o primeiro nível do outline (main thread)."""
+        try:
+            tree.delete(*tree.get_children())
+            if not root.children:
+                tree.insert("", tk.END, text="(nenhuma operação encontrada)")
+                return
+            for child in root.children:
+                self._insert_outline_node(tree, nodes, "", child)
+        except tk.TclError:
+            # Janela de preview já foi fechada
+            pass
+    
+    def _insert_outline_node(self, tree: ttk.Treeview, nodes: Dict[str, OutlineNode], parent: str, node: OutlineNode):
+        """Insere um nó; os filhos só são criados quando ele é expandido."""
+        label = f"{node.label} ({len(node.children)})" if node.kind in ("root", "section", "folder") else node.label
+        iid = tree.insert(parent, tk.END, text=label)
+        nodes[iid] = node
+        if node.children:
+            tree.insert(iid, tk.END, text="...")  # Marcador para exibir a seta de expansão
+    
+    def _expand_outline_node(self, tree: ttk.Treeview, nodes: Dict[str, OutlineNode]):
+        """Cria os filhos de um nó a partir do índice ao expandi-lo."""
+        iid = tree.focus()
+        node = nodes.get(iid)
+        children = tree.get_children(iid)
+        if node is None or not children or children[0] in nodes:
+            return
+        tree.delete(*children)
+        for child in node.children:
+            self._insert_outline_node(tree, nodes, iid, child)
+    
+    def _outline_jump(self, tree: ttk.Treeview, nodes: Dict[str, OutlineNode], view: PagedTextView, status_var: tk.StringVar):
+        """Posiciona o preview no offset do nó selecionado."""
+        selection = tree.selection()
+        node = nodes.get(selection[0]) if selection else None
+        if node is None or node.kind in ("root", "section", "document"):
+            return
+        line = view.index.line_of_offset(node.offset)
+        if line is None:
+            status_var.set("Trecho ainda não indexado, aguarde...")
+            return
+        view.goto_line(line)
+    
+    def _preview_goto_line(self, view: PagedTextView, line_var: tk.StringVar):
+        """Pula para uma linha (base 1) do preview."""
+        try:
+            line = int(line_var.get().strip())
+        except ValueError:
+            return
+        view.goto_line(max(0, min(line - 1, view.index.line_count - 1)))
+    
+    def _preview_search(self, view: PagedTextView, search_var: tk.StringVar, state: Dict[str, int], status_var: tk.StringVar):
+        """Busca a próxima ocorrência no arquivo inteiro (sem carregá-lo, em thread de trabalho)."""
+        text = search_var.get()
+        if not text:
+            return
+        
+        # Uma busca nova descarta o resultado da anterior
+        state["generation"] += 1
+        generation = state["generation"]
+        start_offset = state["offset"]
+        status_var.set(f"Buscando '{text}'...")
+        
+        def run():
+            offset = view.index.find(text, start_offset)
+            self._post_to_ui(self._show_preview_search_result, view, text, offset, generation, state, status_var)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _show_preview_search_result(self, view: PagedTextView, text: str, offset: int, generation: int,
+                                    state: Dict[str, int], status_var: tk.StringVar):
+        """Posiciona o preview na ocorrência encontrada (main thread)."""
+        if generation != state["generation"]:
+            return
+        try:
+            if offset < 0:
+                status_var.set(f"'{text}' não encontrado")
+                return
+            
+            line = view.index.line_of_offset(offset)
+            if line is None:
+                status_var.set("Ocorrência além do trecho já indexado, aguarde...")
+                return
+            
+            state["offset"] = offset + 1
+            status_var.set(f"'{text}' na linha {line + 1:,}")
+            view.goto_line(line)
+        except tk.TclError:
+            # Janela de preview foi fechada
+            pass
+    
     def _validate_openapi(self):
-        """Valida o arquivo OpenAPI."""
+        """Valida o arquivo OpenAPI em background."""
         try:
             input_file = self.input_file.get().strip()
             if not input_file or not Path(input_file).exists():
                 messagebox.showwarning("Aviso", "Selecione um arquivo OpenAPI válido primeiro.")
                 return
             
-            # Validação básica de JSON/YAML
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            try:
-                if input_file.endswith('.json'):
-                    json.loads(content)
-                    messagebox.showinfo("Validação", "✅ Arquivo JSON válido!")
-                elif input_file.endswith(('.yaml', '.yml')):
-                    # Validação básica para YAML
-                    if 'openapi:' in content or 'swagger:' in content:
-                        messagebox.showinfo("Validação", "✅ Arquivo YAML aparenta ser válido!")
-                    else:
-                        messagebox.showwarning("Validação", "⚠️ Arquivo pode não ser um OpenAPI válido.")
-                else:
-                    messagebox.showwarning("Validação", "⚠️ Formato de arquivo não reconhecido.")
-            except json.JSONDecodeError as e:
-                messagebox.showerror("Validação", f"❌ Erro no JSON: {e}")
+            self._log_to_console(f"🔍 Validando {Path(input_file).name}...\n")
+            threading.Thread(
+                target=self._run_validation,
+                args=(input_file, self._converted_spec_for(input_file)),
+                daemon=True
+            ).start()
                 
         except Exception as e:
             self.logger.error(f"Erro na validação: {e}")
             messagebox.showerror("Erro", f"Erro ao validar arquivo: {e}")
+    
+    def _run_validation(self, input_file: str, spec: Optional[Dict[str, Any]] = None):
+        """Executa a validação estrutural (roda no thread de trabalho)."""
+        try:
+            if spec is not None:
+                result = validate_document(spec)
+            else:
+                result = validate_file(input_file, self.validation_cache)
+            self._post_to_ui(self._show_validation_result, input_file, result)
+        except Exception as e:
+            self.logger.error(f"Erro na validação: {e}")
+            self._post_to_ui(messagebox.showerror, "Erro", f"Erro ao validar arquivo: {e}")
+    
+    def _show_validation_result(self, input_file: str, result: ValidationResult):
+        """Mostra o resultado da validação (main thread)."""
+        for issue in result.errors:
+            self._log_to_console(f"  ❌ {issue}\n")
+        for issue in result.warnings:
+            self._log_to_console(f"  ⚠️ {issue}\n")
+        
+        name = Path(input_file).name
+        if not result.is_valid:
+            summary = "\n".join(f"- {issue}" for issue in result.errors[:10])
+            more = f"\n... e mais {len(result.errors) - 10}" if len(result.errors) > 10 else ""
+            messagebox.showerror("Validação", f"❌ {name}: {len(result.errors)} erros\n\n{summary}{more}")
+        elif result.warnings:
+            messagebox.showwarning("Validação", f"⚠️ {name} é válido, com {len(result.warnings)} avisos (veja o console).")
+        else:
+            messagebox.showinfo("Validação", f"✅ {name} é um OpenAPI válido!")
 
 
 # --- Ponto de Entrada (Main) ---